@@ -30,7 +30,10 @@ A few critical notes for using:
 
 1) I wrote this code intending for it to be loaded and used in an interactive python
 environment such as IPython or Jupyter Notebooks.  I don't know how it will behave 
-outside of these, but it should be amenable to scripting.
+outside of these, but it should be amenable to scripting.  The figure functions draw
+their figures off screen and return them; to get a window as well, pass show=True, e.g.
+
+	>> cumu_det_plot(full_list,show=True)
 
 2) It is in Python 3; it *should* work in Python 2.7, I think, but no promises.
 
@@ -46,7 +49,10 @@ an individual molecule or source.
 	
 where y is a molecule tag or source tag.  If a source is a line of sight
 source, add LOS to the end of the standard source tag.  For example, Sgr B2 is SgrB2 and
-the line of sight to Sgr B2 is SgrB2LOS.
+the line of sight to Sgr B2 is SgrB2LOS.  The same lookups (and queries, exports, and
+figures) can be run from a terminal without starting Python first; see main(), e.g.
+
+	$ ./census summary CH3CN
 
 5) There is also a utility function for writing out summaries to ascii text files:
 
@@ -60,7 +66,8 @@ ascii version of the database uploaded as supplementary information.
 6) Many additional properties of molecules are under development, and should not be
 considered exhaustive/comprehensive.  For example, detected isotopologues are being added,
 but the absence of an isotopologue from the list should not be considered a non-detection.
-Similarly, isomers are being compiled.  In other words, there is a lot of infrastructure 
+Similarly, isomers are being compiled (census.get_isomers() groups the molecules into
+isomer families by composition and charge).  In other words, there is a lot of infrastructure 
 in place for future development.
 
 7) Notification of any discovered typographical, bookkeeping, or content errors to 
@@ -78,26 +85,75 @@ calculated by the database curators themselves.
 
 '''
 
-import os, sys, argparse, math
-import numpy as np
+import os, sys, re, csv, argparse, math, pickle, json, hashlib, inspect, itertools, threading, signal, tempfile, shutil, sqlite3, marshal, copy, weakref, contextlib, functools, importlib
 from operator import itemgetter
 from math import ceil
 from datetime import date
-from matplotlib.ticker import AutoMinorLocator
-import matplotlib.pyplot as plt
-import matplotlib
-import matplotlib.ticker as ticker
-from matplotlib.ticker import FormatStrFormatter
-import matplotlib.gridspec as gridspec
-import periodictable as pt
-import matplotlib.patches as patches
-from colour import Color
-import seaborn as sns
-from scipy.stats import gaussian_kde as gkde
-from scipy.interpolate import make_interp_spline, BSpline
-
-matplotlib.rc('text', usetex = True)
-matplotlib.rc('text.latex',preamble=r'\usepackage{cmbright}\usepackage[version=4]{mhchem}')
+from urllib.parse import urlsplit, parse_qs, unquote
+
+class LazyImport(object):
+
+	'''
+	Stands in for a module, or for something from a module, under the name alias in this module, until it's first used.  Only then is it imported, and the stand-in replaces itself with the real thing, so after that there's no difference at all.
+	'''
+
+	def __init__(self,alias,module,name=None):
+	
+		self.__dict__['_lazy'] = (alias,module,name)
+		
+		return
+		
+	def _load(self):
+	
+		alias, module, name = self._lazy
+		
+		value = importlib.import_module(module)
+		
+		if name is not None:
+		
+			value = getattr(value,name)
+			
+		globals()[alias] = value
+		
+		return value
+		
+	def __getattr__(self,attr):
+	
+		return getattr(self._load(),attr)
+		
+	def __call__(self,*args,**kwargs):
+	
+		return self._load()(*args,**kwargs)
+		
+#the plotting and analysis packages take much longer to import than the census takes to load, so that loading it just to look something up (e.g. from the command line) stays quick.  None of them are imported until something uses them.
+
+np = LazyImport('np','numpy')
+asyncio = LazyImport('asyncio','asyncio')
+ThreadPoolExecutor = LazyImport('ThreadPoolExecutor','concurrent.futures','ThreadPoolExecutor')
+ProcessPoolExecutor = LazyImport('ProcessPoolExecutor','concurrent.futures','ProcessPoolExecutor')
+matplotlib = LazyImport('matplotlib','matplotlib')
+plt = LazyImport('plt','matplotlib.pyplot')
+ticker = LazyImport('ticker','matplotlib.ticker')
+gridspec = LazyImport('gridspec','matplotlib.gridspec')
+patches = LazyImport('patches','matplotlib.patches')
+AutoMinorLocator = LazyImport('AutoMinorLocator','matplotlib.ticker','AutoMinorLocator')
+FormatStrFormatter = LazyImport('FormatStrFormatter','matplotlib.ticker','FormatStrFormatter')
+Figure = LazyImport('Figure','matplotlib.figure','Figure')
+FigureCanvasAgg = LazyImport('FigureCanvasAgg','matplotlib.backends.backend_agg','FigureCanvasAgg')
+PatchCollection = LazyImport('PatchCollection','matplotlib.collections','PatchCollection')
+PathCollection = LazyImport('PathCollection','matplotlib.collections','PathCollection')
+TextPath = LazyImport('TextPath','matplotlib.textpath','TextPath')
+FontProperties = LazyImport('FontProperties','matplotlib.font_manager','FontProperties')
+Path = LazyImport('Path','matplotlib.path','Path')
+Bbox = LazyImport('Bbox','matplotlib.transforms','Bbox')
+pt = LazyImport('pt','periodictable')
+Color = LazyImport('Color','colour','Color')
+sns = LazyImport('sns','seaborn')
+gkde = LazyImport('gkde','scipy.stats','gaussian_kde')
+sparse = LazyImport('sparse','scipy.sparse')
+cKDTree = LazyImport('cKDTree','scipy.spatial','cKDTree')
+make_interp_spline = LazyImport('make_interp_spline','scipy.interpolate','make_interp_spline')
+BSpline = LazyImport('BSpline','scipy.interpolate','BSpline')
 
 #Python version check
 
@@ -113,6 +169,8 @@ version = 2.0
 
 class Telescope(object):
 
+	defined = [] #every telescope made while the module loads, so that check_census can find any that were defined but never listed
+
 	def __init__(self,name,shortname,type=None,wavelength=None,latitude=None,longitude=None,diameter=None,built=None,decommissioned=None,notes=None):
 	
 		self.name = name
@@ -127,6 +185,10 @@ class Telescope(object):
 		self.notes = notes
 		self.ndetects = None
 		self.mol_list = None
+		
+		if Telescope.defined is not None:
+		
+			Telescope.defined.append(self)
 	
 		return
 		
@@ -262,6 +324,8 @@ scopes_list = [
 
 class Source(object):
 
+	defined = []
+
 	def __init__(self,name,type=None,ra=None,dec=None,detects=0,mols=None,simbad_url=None):
 	
 		self.name = name
@@ -271,6 +335,10 @@ class Source(object):
 		self.detects = detects
 		self.mols = mols
 		self.simbad_url = simbad_url
+		
+		if Source.defined is not None:
+		
+			Source.defined.append(self)
 					
 		return	
 		
@@ -377,7 +445,6 @@ W49LOS = Source("W49 LOS",type='LOS Cloud',ra='19:10:19.6',dec='+09:07:42',simba
 W51 = Source("W51",type='SFR',ra='19:23:50',dec='+14:06:0',simbad_url='http://simbad.u-strasbg.fr/simbad/sim-id?Ident=W51')
 W51LOS = Source("W51 LOS",type='LOS Cloud',ra='19:23:50',dec='+14:06:0',simbad_url='http://simbad.u-strasbg.fr/simbad/sim-id?Ident=W51')
 XiPerLOS = Source("Xi Per LOS",type='LOS Cloud',ra='03:58:57.9',dec='+35:47:27.74',simbad_url='http://simbad.u-strasbg.fr/simbad/sim-id?Ident=Xi+Per')
-rhoOphA = Source("rho Oph A",type='SFR',ra='16:25:35.14',dec='-23:26:49.9',simbad_url='http://simbad.u-strasbg.fr/simbad/sim-id?Ident=Rho+Oph+A')
 
 source_list = [
 	AFGL890LOS,
@@ -443,7 +510,6 @@ source_list = [
 	W51,
 	W51LOS,
 	XiPerLOS,
-	rhoOphA,
 	]
 
 
@@ -451,8 +517,76 @@ source_list = [
 #						Molecule Class 						#
 #############################################################
 
+class Isotopologue(object):
+
+	'''
+	One isotopologue of a molecule: its formula, the parent Molecule, the environment it was detected in ('ism', or 'ppd' for protoplanetary disks), its detection reference, and the isotopes substituted into it.  The year is taken from the reference, or is the parent's if the reference doesn't have one.
+	'''
+
+	def __init__(self,formula,parent,environment='ism',ref=None):
+	
+		self.formula = formula
+		self.parent = parent
+		self.environment = environment
+		self.ref = ref
+		self.isotopes = isotopes_of(formula)
+		
+		year = re.search(r'(?<![\d./])(19|20)\d\d(?![\d.])',ref) if ref is not None else None
+		
+		self.year = int(year.group(0)) if year is not None else parent.year
+		
+		return
+		
+def isotopes_of(formula):
+
+	'''
+	Returns a list of the isotopes substituted into formula: mass-numbered ones like '13C' or '26Al' (written right before their element), and a 'D' for every deuterium.
+	'''
+	
+	isotopes = []
+	
+	for mass, element, count in re.findall(r'(\d{2,3}(?=[A-Z]))?([A-Z][a-z]?)(\d?)(?!\d)',formula):
+	
+		if mass != '':
+		
+			isotopes += ['{}{}' .format(mass,element)]*int(count or 1)
+			
+		elif element == 'D':
+		
+			isotopes += ['D']*int(count or 1)
+			
+	return isotopes
+	
+def parse_isotopologues(isos,refs,parent,environment='ism'):
+
+	'''
+	Parses a comma-separated string of isotopologues and the matching reference string (made up of '[formula] reference' entries) into a list of Isotopologue records.  If the references aren't tagged by formula, the whole string goes with every isotopologue.
+	'''
+	
+	if isos is None:
+	
+		return []
+		
+	tagged = {}
+	
+	if refs is not None and '[' in refs:
+	
+		for x in refs.split('[')[1:]:
+		
+			formula, _, ref = x.partition(']')
+			
+			tagged[formula.strip()] = ref.strip()
+			
+	elif refs is not None:
+	
+		tagged = None
+		
+	return [Isotopologue(x.strip(),parent,environment,tagged.get(x.strip()) if tagged is not None else refs.strip()) for x in isos.split(',') if x.strip() != '']
+	
 class Molecule(object):
 
+	defined = []
+
 	def __init__(self,name,formula,year,label,sources,telescopes,wavelengths,other_names='',neutral=False,cation=False,anion=False,radical=False,cyclic=False,fullerene=False,pah=False,mass=0,du=0,natoms=0,Acon=None,Bcon=None,Ccon=None,mua=None,mub=None,muc=None,kappa=None,H=0,He=0,C=0,O=0,N=0,S=0,P=0,Si=0,Cl=0,F=0,Mg=0,Na=0,Al=0,K=0,Fe=0,Ti=0,Ar=0,V=0,Ca=0,d_ref=None,lab_ref=None,notes=None,ice=False,ice_d_ref=None,ice_l_ref=None,ppd=None,exgal=None,exo=None,isos=None,isomers=None,ppd_isos=None,ppd_d_ref=None,ppd_l_ref=None,ppd_isos_ref=None,exgal_d_ref=None,exgal_l_ref=None,exo_d_ref=None,exo_l_ref=None,exgal_sources=None,isos_d_ref=None,isos_l_ref=None):
 	
 		self.name = name
@@ -522,9 +656,14 @@ class Molecule(object):
 		self.isos_l_ref = isos_l_ref
 		self.notes = notes
 		self.maxdu = None
+		self._isotopologues = None
 		
 		self.update_stats()
 		
+		if Molecule.defined is not None:
+		
+			Molecule.defined.append(self)
+		
 		return
 		
 	def update_stats(self):
@@ -566,6 +705,18 @@ class Molecule(object):
 				
 		return
 		
+	def get_isotopologues(self):
+	
+		'''
+		Returns the isotopologues of this molecule (from isos and isos_d_ref, and ppd_isos and ppd_isos_ref) as Isotopologue records, which are parsed the first time they're asked for.
+		'''
+		
+		if self._isotopologues is None:
+		
+			self._isotopologues = parse_isotopologues(self.isos,self.isos_d_ref,self,'ism') + parse_isotopologues(self.ppd_isos,self.ppd_isos_ref,self,'ppd')
+			
+		return self._isotopologues
+		
 CH = Molecule('methylidyne','CH',1937,'CH',[LOSCloud],[MtWilson],['UV', 'Vis'],neutral=True,H=1,C=1,d_ref='Dunham 1937 PASP 49, 26; Swings & Rosenfeld 1937 ApJ 86, 483; McKellar 1940 PASP 52, 187',lab_ref='Jevons 1932 Phys Soc. pp 177-179; Brazier & Brown 1983 JCP 78, 1608',notes='*First radio in Rydbeck et al. 1973 Nature 246, 466',exgal=True,exgal_d_ref='Whiteoak et al. 1980 MNRAS 190, 17',exgal_sources='LMC, NGC 4945, NGC 5128',Bcon=425476,mua=1.5)
 CN = Molecule('cyano radical','CN',1940,'CN',[LOSCloud],[MtWilson],['UV'],radical=True,neutral=True,C=1,N=1,d_ref='McKellar 1940 PASP 52, 187',lab_ref='Poletto and Rigutti 1965 Il Nuovo Cimento 39, 519; Dixon & Woods 1977 JCP 67, 3956; Thomas & Dalby 1968 Can. J. Phys. 46, 2815',notes='*First radio in Jefferts et al. 1970 ApJ 161, L87',ppd=True,ppd_d_ref='Kastner et al. 1997 Science 277, 67; Dutrey et al. 1997 A&A 317, L55',ppd_isos='C15N',ppd_isos_ref='[C15N] Hily-Blant et al. 2017 A&A 603, L6',exgal=True,exgal_d_ref='Henkel et al. 1988 A&A 201, L23',exgal_sources='M82, NGC 253, IC 342',Bcon=56693,mua=1.5)
 CHp = Molecule('methylidyne cation','CH+',1941,'CH+',[LOSCloud],[MtWilson],['UV', 'Vis'],cation=True,H=1,C=1,d_ref='Douglas & Herzberg 1941 ApJ 94, 381; Dunham 1937 PASP 49, 26',lab_ref='Douglas & Herzberg 1941 ApJ 94, 381',notes=None,ppd=True,ppd_d_ref='Thi et al. 2011 A&A 530, L2',exgal=True,exgal_d_ref='Magain & Gillet 1987 A&A 184, L5',exgal_sources='LMC',Bcon=417617,mua=1.7)
@@ -1138,6 +1289,7 @@ full_list = [
 	HCCO,
 	CNCN,
 	HONO,
+	MgCCH,
 	HC3N,
 	HCOOH,
 	CH2NH,
@@ -1227,6 +1379,7 @@ full_list = [
 	CH3C6H,
 	C2H5OCHO,
 	CH3COOCH3,
+	CH3COCH2OH,
 	C6H6,
 	nC3H7CN,
 	iC3H7CN,
@@ -1248,6 +1401,100 @@ full_list = [
 	]
 
 
+#############################################################
+#						Integrity Checks					#
+#############################################################
+
+def check_census(mol_list,source_list,scopes_list,defined=None):
+
+	'''
+	Checks a set of lists for the problems that would otherwise silently throw off every count: the same object listed twice, two molecules with the same label (or the same formula and name), two sources or telescopes with the same name, and molecules that refer to sources or telescopes that aren't in source_list or scopes_list.  If defined (a list of every object that was made) is given, it also finds anything that was defined but never listed, which is usually one definition shadowing another or a molecule left out of full_list.  
+	
+	Everything is a lookup in a hash set, so it's a single pass over the lists.  Returns a list of strings describing any problems.
+	'''
+	
+	problems = []
+	
+	listed = {}
+	
+	for my_list, list_name, keys in [
+		(scopes_list,'scopes_list',[('shortname',lambda x: x.shortname)]),
+		(source_list,'source_list',[('name',lambda x: x.name)]),
+		(mol_list,'full_list',[('label',lambda x: x.label),('formula and name',lambda x: (x.formula,x.name))]),
+		]:
+		
+		ids = set()
+		
+		seen = {x[0] : set() for x in keys}
+		
+		for x in my_list:
+		
+			if id(x) in ids:
+			
+				problems.append('{} appears more than once in {}' .format(getattr(x,'label',x.name),list_name))
+				
+				continue
+				
+			ids.add(id(x))
+			
+			for key, get_key in keys:
+			
+				value = get_key(x)
+			
+				if value in seen[key]:
+				
+					problems.append('more than one entry in {} has the {} {}' .format(list_name,key,value))
+					
+				seen[key].add(value)
+				
+		listed[list_name] = ids
+		
+	#molecules pointing at sources or telescopes that aren't listed
+	
+	for mol in mol_list:
+	
+		for x in mol.sources:
+		
+			if id(x) not in listed['source_list']:
+			
+				problems.append('{} refers to the source {}, which is not in source_list' .format(mol.label,x.name))
+				
+		for x in mol.telescopes:
+		
+			if id(x) not in listed['scopes_list']:
+			
+				problems.append('{} refers to the telescope {}, which is not in scopes_list' .format(mol.label,x.shortname))
+				
+	#and anything that was made but never listed
+	
+	if defined is not None:
+	
+		for x in defined:
+		
+			if isinstance(x,Molecule) and id(x) not in listed['full_list']:
+			
+				problems.append('the molecule {} was defined but is not in full_list' .format(x.label))
+				
+			elif isinstance(x,Source) and id(x) not in listed['source_list']:
+			
+				problems.append('the source {} was defined but is not in source_list' .format(x.name))
+				
+			elif isinstance(x,Telescope) and id(x) not in listed['scopes_list']:
+			
+				problems.append('the telescope {} was defined but is not in scopes_list' .format(x.shortname))
+	
+	return problems
+	
+for x in check_census(full_list,source_list,scopes_list,defined=Telescope.defined+Source.defined+Molecule.defined):
+
+	print('Warning: {}' .format(x))
+	
+#everything in the module has been checked, so stop keeping track of new objects
+	
+Telescope.defined = None
+Source.defined = None
+Molecule.defined = None
+
 #############################################################
 #				     Do Some Loop Updates	 				#
 #############################################################
@@ -1261,1082 +1508,2887 @@ for x in source_list:
 	x.update_stats(full_list)	
 
 #############################################################
-#						Functions	 						#
-#############################################################	
+#						Census Class						#
+#############################################################
 
-def update_plots(list):
+class DetectionCube(object):
 
 	'''
-	A meta function that, when run, will call every plot command and generate new plots based on the input list using default parameters.  Useful for rapidly re-generating all figures.
-	'''
-	cumu_det_plot(full_list)
-	cumu_det_natoms_plot(full_list)
-	det_per_year_per_atoms(full_list)
-	facility_shares(scopes_list, full_list)
-	cumu_det_facility(full_list)
-	periodic_heatmap(full_list)
-	mass_by_wavelengths(full_list)
-	mols_waves_by_atoms(full_list)
-	du_histogram(full_list)
-	type_pie_chart(full_list)
-	source_pie_chart(full_list)
-	mol_type_by_source_type(full_list)
-	du_by_source_type(full_list)
-	rel_du_by_source_type(full_list)
-	mass_by_source_type(full_list)
-	waves_by_source_type(full_list)
+	Counts of detected molecules over year x natoms x kind x wavelength x source type x facility, built in a single pass over a list of molecules.  Kind is 'molecule', 'pah', or 'fullerene'.  
 	
-	return
-
-def summary(y):
-
-	'''
-	Prints a summary of the information in the database for either a molecule or a source to the terminal.  Requires the variable name (usually intuitive, but if not, do a plain text search...).
+	A molecule has exactly one year, natoms, and kind, but can have several wavelengths, source types, and facilities.  Each of those three axes therefore has an extra 'any' slot that every molecule is counted in exactly once, so that leaving an axis out of a query counts molecules rather than (molecule, facility) pairs.  Only the occupied cells are stored, so the cube stays small however sparse it is.
 	
+	Everything else is a slice and a sum, e.g.:
+	
+		cube.counts(['year'])									detections per year
+		cube.counts(['year','natoms'],kind='molecule')			detections per year per number of atoms
+		cube.counts(['facility'])								total detections per facility
+		cube.cumulative(np.arange(1965,2021),facility='GBT')		cumulative GBT detections by year
 	'''
+
+	axes = ['year','natoms','kind','wavelength','source_type','facility']
+	multi = ['wavelength','source_type','facility']
+
+	def __init__(self,mol_list,scopes_list=None,eyear=None):
 	
-	if isinstance(y,Molecule):
+		#start the label lists off in the usual orders; anything new that turns up gets added on the end
 	
-		n_dash = len(y.name) + len(y.formula) +3 
+		lookup = {
+			'kind'			:	{'molecule' : 0, 'pah' : 1, 'fullerene' : 2},
+			'wavelength'	:	{x : i for i, x in enumerate(['cm','mm','sub-mm','IR','Vis','UV'])},
+			'source_type'	:	{},
+			'facility'		:	{x.shortname : i for i, x in enumerate(scopes_list)} if scopes_list is not None else {},
+			}
+			
+		waves = lookup['wavelength']
+		types = lookup['source_type']
+		scopes = lookup['facility']
 	
-		dashes = '-' * n_dash
-
-		print('\n' + dashes)
-		print('{} ({})' .format(y.name,y.formula))
-		print(dashes + '\n')
-		print('Atoms:\t{}' .format(y.natoms))
-		print('Mass:\t{} amu' .format(y.mass))
-		print('Year Detected:\t{}' .format(y.year))
-		sources = [x.name for x in y.sources]
-		sources_str = ', '.join(sources)		
-		print('Source(s):\t{}' .format(sources_str))
-		scopes = [x.shortname for x in y.telescopes]
-		scopes_str = ', '.join(scopes)
-		print('Telescope(s) Used:\t{}' .format(scopes_str))
+		#one pass through the molecules, writing out a row for every combination of the multi-valued axes, including the 'any' slots (-1 for now)
 	
-		attr_str = ''
+		rows = []
 	
-		if y.neutral == True:
+		for mol in mol_list:
 		
-			attr_str += 'Neutral, '
+			kind = 2 if mol.fullerene is True else 1 if mol.pah is True else 0
 		
-		if y.cation == True:
-	
-			attr_str += 'Cation, '
+			my_waves = [waves.setdefault(x,len(waves)) for x in set(mol.wavelengths)] + [-1]
+			my_types = [types.setdefault(x,len(types)) for x in set([y.type for y in mol.sources])] + [-1]
+			my_scopes = [scopes.setdefault(x,len(scopes)) for x in set([y.shortname for y in mol.telescopes])] + [-1]
+			
+			for w in my_waves:
+			
+				for s in my_types:
+				
+					for f in my_scopes:
+					
+						rows.append((mol.year,mol.natoms,kind,w,s,f))
+						
+		rows = np.array(rows,dtype=np.int64).reshape(-1,len(self.axes))
 		
-		if y.anion == True:
-	
-			attr_str += 'Anion, '
+		#now that we know how long each axis is, put the years on an index and point the 'any' slots at the end of their axes
 		
-		if y.cyclic == True:
-	
-			attr_str += 'Cyclic'
+		self.syear = int(rows[:,0].min()) if len(rows) > 0 else date.today().year
+		self.eyear = max(int(rows[:,0].max()) if len(rows) > 0 else self.syear,eyear if eyear is not None else date.today().year)
 		
-		if y.radical == True:
-	
-			attr_str += 'Radical, '
-	
-		attr_str = attr_str.strip(' ').strip(',')
-	
-		print('Attributes:\t{}\n' .format(attr_str))
+		rows[:,0] -= self.syear
 		
-		if y.isos != None:
+		lookup['year'] = {x : x - self.syear for x in range(self.syear,self.eyear+1)}
+		lookup['natoms'] = {x : x for x in range(int(rows[:,1].max())+1 if len(rows) > 0 else 1)}
 		
-			print('Known Isotopologues:\t{}\n' .format(y.isos))
+		self.lookup = lookup
+		self.labels = {x : sorted(lookup[x],key=lookup[x].get) for x in self.axes}
+		self.any_index = {x : len(self.labels[x]) for x in self.multi}
 		
-		other_envs = [y.ice,y.ppd,y.exgal,y.exo]
+		for x in self.multi:
 		
-		if any(other_envs) == True:
+			i = self.axes.index(x)
 		
-			other_str = ''
-			
-			if y.ice == True:
-			
-				other_str += 'Ices, '
-				
-			if y.ice == 'Tentative':
+			rows[rows[:,i] == -1,i] = self.any_index[x]
 			
-				other_str += 'Ices (Tentative), '	
-				
-			if y.ppd == True:
+		#and collapse the rows down to the occupied cells and their counts
 			
-				other_str += 'Protoplanetary Disks, '
-				
-			if y.ppd == 'Tentative':
+		self.shape = tuple([len(self.labels[x]) + (1 if x in self.multi else 0) for x in self.axes])
+		
+		cells, self.values = np.unique(np.ravel_multi_index(rows.T,self.shape),return_counts=True)
+		
+		self.coords = np.array(np.unravel_index(cells,self.shape)).T
+		
+		self._cache = {}
+		
+		return
+		
+	def counts(self,keep=['year'],**fixed):
+	
+		'''
+		Returns an array of molecule counts over the axes in keep (in that order), for the molecules matching fixed, e.g. counts(['year','natoms'],kind='molecule',facility='GBT').  Fixed values can be a single label or a list of labels.  
+		
+		Wavelength, source type, and facility axes that are neither kept nor fixed count each molecule once.  If one of them is kept, or fixed to a list, each molecule is counted once for each of its entries along it.
+		'''
+		
+		key = (tuple(keep),tuple(sorted([(x,tuple(fixed[x]) if isinstance(fixed[x],(list,tuple)) else fixed[x]) for x in fixed])))
+		
+		if key in self._cache:
+		
+			return self._cache[key].copy()
+	
+		for x in list(keep) + [y for y in fixed]:
+		
+			if x not in self.axes:
 			
-				other_str += 'Protoplanetary Disks (Tentative), '				
-				
-			if y.exgal == True:
+				raise KeyError('{} is not an axis of the cube' .format(x))
+	
+		mask = np.ones(len(self.values),dtype=bool)
+		
+		for i, axis in enumerate(self.axes):
+		
+			if axis in fixed:
 			
-				other_str += 'External Galaxies, '
+				wanted = fixed[axis] if isinstance(fixed[axis],(list,tuple)) else [fixed[axis]]
 				
-			if y.exgal == 'Tentative':
-			
-				other_str += 'External Galaxies (Tentative), '				
+				mask &= np.isin(self.coords[:,i],[self.lookup[axis][x] for x in wanted if x in self.lookup[axis]])
 				
-			if y.exo == True:
+			elif axis in self.multi and axis in keep:
 			
-				other_str += 'Exoplanetary Atmospheres, '
+				mask &= self.coords[:,i] != self.any_index[axis]
 				
-			if y.exo == 'Tentative':
+			elif axis in self.multi:
 			
-				other_str += 'Exoplanetary Atmospheres (Tentative), '				
+				mask &= self.coords[:,i] == self.any_index[axis]
 				
-			other_str = other_str.strip().strip(',') + '\n'
+		shape = [len(self.labels[x]) for x in keep]
 		
-			print('Also Detected In:\t{}' .format(other_str))
+		if len(keep) == 0:
+		
+			result = np.array(self.values[mask].sum())
 			
-		if y.exgal == True or y.exgal == 'Tentative':
+		else:
 		
-			print('Sources of External Galaxy Detections:\t{}\n' .format(y.exgal_sources))	
-
-		if y.ppd_isos != None:
+			flat = np.ravel_multi_index([self.coords[mask,self.axes.index(x)] for x in keep],shape)
 		
-			print('Isotopologues Also Detected in Protoplanetary Disks:\t{}\n' .format(y.ppd_isos))	
-			
-
-	
-		refs(y)
+			result = np.bincount(flat,weights=self.values[mask],minlength=int(np.prod(shape))).astype(np.int64).reshape(shape)
 		
-	elif isinstance(y,Source):
+		self._cache[key] = result
+		
+		return result.copy()
+		
+	def per_year(self,years,keep=[],**fixed):
 	
-		n_dash = len(y.name)
+		'''
+		Like counts(['year']+keep,**fixed), but lined up with an arbitrary array of years (zero for any years outside the cube).
+		'''
 		
-		dashes = '-' * n_dash
+		dets = self.counts(['year']+keep,**fixed)
 		
-		print('\n' + dashes)
-		print('{}' .format(y.name))
-		print(dashes + '\n')
-
-		print('RA (J2000):\t{}' .format(y.ra))
-		print('DEC (J2000):\t{}\n' .format(y.dec))
+		idx = np.asarray(years) - self.syear
 		
-		print('Generalized Type:\t{}\n' .format(y.type))
+		ok = (idx >= 0) & (idx < dets.shape[0])
 		
-		print('Number of Detections:\t{}\n' .format(y.detects))
+		result = np.zeros((len(idx),)+dets.shape[1:],dtype=dets.dtype)
 		
-		print('Simbad URL:\t{}' .format(y.simbad_url))
-			
-		mol_str = 'Molecules Detected in {}' .format(y.name)
+		result[ok] = dets[idx[ok]]
 		
-		dashes = '-' * len(mol_str)
-			
-		print('\n' + dashes)	
-		print(mol_str)
-		print(dashes)
+		return result
 		
-		print('{}' .format(mols_in_source(y.name)).replace("'",'').strip(']').strip('['))
-	
-def refs(y):
-
-	'''
-	
-	Prints a nicely formatted list of references and notes for a molecule to the terminal.
-	
-	'''
-
-	lab_refs = y.lab_ref.split(';')
-	d_refs = y.d_ref.split(';')
-	
-	if y.notes != None:
-		notes = y.notes.strip('*')
+	def prefix(self,keep=[],**fixed):
 	
-	print('Detection Reference(s)')
-	
-	for x in range(len(d_refs)):
-	
-		print('[{}] {}' .format(x+1,d_refs[x].strip()))
+		'''
+		Returns the cumulative year array for counts(['year']+keep,**fixed), with a leading row of zeros, so that row i is the number of detections before self.syear + i.  These are cached, since everything windowed is built on them.
+		'''
 		
-	print('\nLaboratory Reference(s)')	
-	
-	for x in range(len(lab_refs)):
-	
-		print('[{}] {}' .format(x+1,lab_refs[x].strip()))	
+		key = ('prefix',tuple(keep),tuple(sorted([(x,tuple(fixed[x]) if isinstance(fixed[x],(list,tuple)) else fixed[x]) for x in fixed])))
 		
-	if y.notes!= None:
-		print('\nNotes')
-		print(notes)
+		if key not in self._cache:
 		
-	if y.isos != None:
-	
-		iso_d_refs = y.isos_d_ref.split('[')
+			dets = np.cumsum(self.counts(['year']+keep,**fixed),axis=0)
 		
-		#Not implemented yet
-		#iso_l_refs = y.isos_l_ref.split('[')
+			self._cache[key] = np.concatenate([np.zeros((1,)+dets.shape[1:],dtype=dets.dtype),dets])
+			
+		return self._cache[key]
 		
-		del iso_d_refs[0]
-		#del iso_l_refs[0]
+	def cumulative(self,years,keep=[],**fixed):
 	
-		print('\nIsotopologue Detection Reference(s)')
+		'''
+		Returns the cumulative number of detections up to and including each of years, over the axes in keep, for the molecules matching fixed.
+		'''
 		
-		for x in iso_d_refs:
+		dets = self.prefix(keep,**fixed)
 		
-			print('[' + x.strip())
+		idx = np.clip(np.asarray(years) - self.syear + 1,0,len(dets)-1)
 		
-		#print('\nIsotopologue Laboratory Reference(s)')	
-			
-		#for x in iso_l_refs:
+		return dets[idx]
 		
-			#print('[' + x.strip())	
-
-	if y.ice == True or y.ice == 'Tentative':
+	def window(self,syear,eyear,keep=[],**fixed):
 	
-		print('\nIce Reference(s)')
+		'''
+		Returns the number of detections from syear to eyear (inclusive), over the axes in keep, for the molecules matching fixed.  Each total is two lookups in the cumulative year array, and syear and eyear can be arrays to get any number of windows at once.
+		'''
 		
-		print('[Det] {}' .format(y.ice_d_ref))
-		print('[Lab] {}' .format(y.ice_l_ref))
-
-	if y.ppd == True or y.ppd == 'Tentative':
+		dets = self.prefix(keep,**fixed)
+		
+		s = np.clip(np.asarray(syear) - self.syear,0,len(dets)-1)
+		e = np.clip(np.asarray(eyear) - self.syear + 1,0,len(dets)-1)
+		
+		return dets[np.maximum(s,e)] - dets[s]
+		
+	def facility_windows(self,facilities,syear,eyear):
 	
-		print('\nProtoplanetary Disks Reference(s)')
+		'''
+		Returns two arrays, the number of detections made by each of facilities (shortnames) from syear to eyear, and the total number of detections over the same windows.  syear and eyear can be single years or arrays with one window per facility, e.g. their operating lifetimes, or the years before and after a receiver upgrade.
+		'''
 		
-		print('[{}] {}' .format(y.formula,y.ppd_d_ref))
+		dets = self.prefix(['facility'])
 		
+		idx = np.array([self.lookup['facility'].get(x,-1) for x in facilities],dtype=int)
 		
-		#to be enabled later if lab references are cataloged.
-		#print('[Lab] {}' .format(y.ppd_l_ref))	
+		s = np.broadcast_to(np.clip(np.asarray(syear) - self.syear,0,len(dets)-1),idx.shape)
+		e = np.broadcast_to(np.clip(np.asarray(eyear) - self.syear + 1,0,len(dets)-1),idx.shape)
+		e = np.maximum(s,e)
 		
-		if y.ppd_isos != None:
+		ndetects = np.where(idx >= 0,dets[e,idx] - dets[s,idx],0)
+		
+		return ndetects, self.window(s + self.syear,e + self.syear - 1)
+		
+	def fit_sums(self,keep=[],**fixed):
+	
+		'''
+		Returns prefix sums of 1, t, t^2, y, and t*y, where t is the year (counted from self.syear) and y the cumulative detections over the axes in keep for the molecules matching fixed.  Any linear least-squares fit over a range of years can be done from these in constant time.
+		'''
+		
+		key = ('fit',tuple(keep),tuple(sorted([(x,tuple(fixed[x]) if isinstance(fixed[x],(list,tuple)) else fixed[x]) for x in fixed])))
 		
-			ppd_isos_refs = y.ppd_isos_ref.split('[')
-			del ppd_isos_refs[0]
+		if key not in self._cache:
+		
+			y = self.prefix(keep,**fixed)[1:].astype(float)
+			
+			t = np.arange(len(y),dtype=float).reshape((-1,)+(1,)*(y.ndim-1))
 			
-			for x in ppd_isos_refs:
+			sums = []
 			
-				print('[' + x.strip())
+			for x in [np.ones_like(y),t*np.ones_like(y),t*t*np.ones_like(y),y,t*y]:
+			
+				sums.append(np.concatenate([np.zeros((1,)+y.shape[1:]),np.cumsum(x,axis=0)]))
+				
+			self._cache[key] = sums
 			
-	if y.exgal == True or y.exgal == 'Tentative':
+		return self._cache[key]
+		
+	def rate(self,syear,eyear,keep=[],**fixed):
 	
-		print('\nExternal Galaxies Reference(s)')
+		'''
+		Returns the detection rate (detections/year), the slope of a linear least-squares fit to the cumulative detections from syear to eyear (inclusive), over the axes in keep, for the molecules matching fixed.  syear and eyear can be arrays to get many windows at once; windows are clipped to the years in the cube, and come back as nan if they're less than two years long.
+		'''
+		
+		sums = self.fit_sums(keep,**fixed)
 		
-		print('[{}] {}' .format(y.formula,y.exgal_d_ref))
+		ny = len(sums[0]) - 1
 		
-		#to be enabled later if lab references are cataloged.
-		#print('[Lab] {}' .format(y.exgal_l_ref))		
+		s = np.clip(np.asarray(syear) - self.syear,0,ny)
+		e = np.clip(np.asarray(eyear) - self.syear + 1,0,ny)
+		e = np.maximum(s,e)
 		
-	if y.exo == True or y.exo == 'Tentative':
+		n, St, Stt, Sy, Sty = [x[e] - x[s] for x in sums]
+		
+		den = n*Stt - St**2
+		
+		with np.errstate(divide='ignore',invalid='ignore'):
+		
+			slope = np.where(den > 0,(n*Sty - St*Sy)/den,np.nan)
+		
+		return slope[()]
+		
+	def rate_matrix(self,keep=[],**fixed):
 	
-		print('\nExoplanetary Atmospheres Reference(s)')
+		'''
+		Returns the years in the cube and the detection rate for every start and end year at once, as an array where [i,j] is the rate from years[i] to years[j] (nan unless j > i), followed by the axes in keep.  rate_matrix(['facility'])[1][:,-1] is the rate since each year for every facility, for instance, and [:,:,k] can go straight into imshow as a heatmap.
+		'''
 		
-		print('[{}] {}' .format(y.formula,y.exo_d_ref))
+		years = np.arange(self.syear,self.eyear+1)
 		
-def output_summary(y,filename=None):
+		return years, self.rate(years[:,None],years[None,:],keep,**fixed)
+		
+class FacilityIndex(object):
 
 	'''
-	Writes out an ascii file containing the output of summary(y) for molecule y or a list of molecules y.  A filename can optionally be specified.
+	An interval index over the operating lifetimes of a list of telescopes, from the year they were built to the year they were decommissioned (or eyear, this year by default, if they're still running).  
 	
+	The years where the set of operating facilities changes split time into segments, and each segment keeps the indices of the facilities operating through it, so finding what was operating in a year is a binary search plus the facilities themselves.
 	'''
-
-	#if we're using a default filename and only one molecule has been specified, name the output file that molecules formula
-
-	if filename == None and type(y) != list:
-	
-		filename = y.formula + '.txt'
-		
-	elif filename == None and type(y) == list:
-	
-		filename = 'summary.txt'
 	
-	if type(y) != list:
+	def __init__(self,scopes_list,eyear=None):
 	
-		y = [y]
+		self.scopes_list = scopes_list
+		self.names = [x.shortname for x in scopes_list]
+		self.lookup = {x : i for i, x in enumerate(self.names)}
 		
-	with open(filename,'w') as output:
-	
-		for x in y:
+		eyear = date.today().year if eyear is None else eyear
 		
-			out_list = summary_list(x)
-			
-			for z in out_list:
+		self.starts = np.array([x.built for x in scopes_list],dtype=np.int64)
+		self.ends = np.array([x.decommissioned if x.decommissioned is not None else max(eyear,x.built) for x in scopes_list],dtype=np.int64)
+		
+		#segment i runs from breaks[i] up to (but not including) breaks[i+1]
+		
+		self.breaks = np.unique(np.concatenate([self.starts,self.ends+1]))
+		
+		self.active = []
+		
+		for x in self.breaks[:-1]:
+		
+			self.active.append(np.nonzero((self.starts <= x) & (self.ends >= x))[0])
 			
-				output.write(z + '\n')	
-
-def cumu_det_plot(list,syear=None,eyear=None):
-
-	'''
-	Makes a plot of the cumulative detections by year using 'list', which is usually 'full_list'.  The start year and end year are defined by default to be the earliest year in the list and the current year, but these are overridable. 
-	
-	'''
-	
-	#Close an old figure if it exists and initialize a new figure
-	
-	plt.close('Cumulative Detections')
+		return
+		
+	def operating(self,year):
 	
-	fig = plt.figure(num='Cumulative Detections',figsize=(10,8))
+		'''
+		Returns the telescopes that were operating in year.
+		'''
+		
+		i = np.searchsorted(self.breaks,year,side='right') - 1
+		
+		if i < 0 or i >= len(self.active):
+		
+			return []
+			
+		return [self.scopes_list[x] for x in self.active[i]]
+		
+	def overlap(self,a,b):
 	
-	plt.ion()
+		'''
+		Returns the [start, end] years that telescopes a and b (shortnames) were both operating, or None if they never were.
+		'''
+		
+		a = self.lookup[a]
+		b = self.lookup[b]
+		
+		start = max(self.starts[a],self.starts[b])
+		end = min(self.ends[a],self.ends[b])
+		
+		if start > end:
+		
+			return None
+			
+		return [int(start),int(end)]
+		
+	def activity(self,years):
 	
-	#set some font defaults
+		'''
+		Returns a boolean array of years x facilities that is True where the facility was operating that year.
+		'''
+		
+		years = np.asarray(years)[:,None]
+		
+		return (years >= self.starts[None,:]) & (years <= self.ends[None,:])
+		
+#frequency ranges (in MHz, like the rotational constants) of some common receiver bands, for LineIndex.band
+
+bands = {
+	'ALMA Band 1'	:	(35000.,50000.),
+	'ALMA Band 2'	:	(67000.,90000.),
+	'ALMA Band 3'	:	(84000.,116000.),
+	'ALMA Band 4'	:	(125000.,163000.),
+	'ALMA Band 5'	:	(163000.,211000.),
+	'ALMA Band 6'	:	(211000.,275000.),
+	'ALMA Band 7'	:	(275000.,373000.),
+	'ALMA Band 8'	:	(385000.,500000.),
+	'ALMA Band 9'	:	(602000.,720000.),
+	'ALMA Band 10'	:	(787000.,950000.),
+	'GBT L-band'	:	(1150.,1730.),
+	'GBT C-band'	:	(3950.,8000.),
+	'GBT X-band'	:	(8000.,10000.),
+	'GBT Ku-band'	:	(12000.,15400.),
+	'GBT K-band'	:	(18000.,26500.),
+	'GBT Ka-band'	:	(26000.,39500.),
+	'GBT Q-band'	:	(38200.,49800.),
+	'GBT W-band'	:	(67000.,93000.),
+	}
 	
-	fontparams = {'size':24, 'family':'sans-serif','sans-serif':['Helvetica']}
+#h/k in K/MHz, for upper state energies
+
+h_over_k = 4.799243e-5
+
+class LineIndex(object):
+
+	'''
+	The rotational transitions (J+1 <- J, for J up to jmax-1) of every linear molecule and symmetric top in a list of molecules, predicted as a rigid rotor at 2B(J+1) from Census.get_constants(), and held sorted by frequency so that finding everything in a band is two binary searches.  Molecules are counted as symmetric tops if their asymmetry parameter is within tolerance of -1 (prolate, using (B+C)/2) or +1 (oblate, using (A+B)/2); the default only takes the ones that are exactly symmetric.  Molecules given as having no dipole moment are left out.  
 	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')	
+	These are approximate: there's no centrifugal distortion or hyperfine structure, and the K components of symmetric tops all fall on the same frequency.  Frequencies are in MHz, like the constants, and upper state energies in K.  e.g.
 	
-	#get the starting and ending years, if they aren't set by the user
+		lines = census.get_lines()
+		lines.molecules(*bands['ALMA Band 3'])
+	'''
 	
-	if syear is None:
+	def __init__(self,mol_list,jmax=50,tolerance=0.,columns=None):
 	
-		#grab the earliest year in the list of molecules
+		columns = get_census(mol_list).get_constants() if columns is None else columns
 	
-		syear = min([x.year for x in list])
+		A, B, C, kappa = columns['Acon'], columns['Bcon'], columns['Ccon'], columns['kappa']
 		
-	if eyear is None:
-	
-		#grab the current year
-	
-		eyear = date.today().year
+		with np.errstate(invalid='ignore'):
 		
-	#make the x-axis array of years
-	
-	years = np.arange(syear,eyear+1)
+			linear = np.isnan(A) & np.isnan(C) & ~np.isnan(B)
+			prolate = ~linear & (kappa <= -1 + tolerance)
+			oblate = ~linear & (kappa >= 1 - tolerance)
 		
-	#make an array to hold the detections
-	
-	dets = np.copy(years)*0
+		beff = np.select([linear,prolate,oblate],[B,(B + C)/2.,(A + B)/2.],np.nan)
+		
+		#a dipole moment of 0 (and none bigger) means there's no rotational spectrum to predict; nothing given at all doesn't rule one out
+		
+		mu = np.stack([columns[x] for x in ['mua','mub','muc']],axis=1)
+		flagged = np.stack([columns[x+'_flag'] != '' for x in ['mua','mub','muc']],axis=1).any(axis=1)
+		
+		polar = flagged | ~(np.nan_to_num(mu) == 0).all(axis=1) | np.isnan(mu).all(axis=1)
+		
+		self.mol_list = mol_list
+		self.jmax = jmax
+		self.tolerance = tolerance
+		self.mols = np.nonzero(~np.isnan(beff) & (beff > 0) & polar)[0]
+		self.beff = beff[self.mols]
+		
+		#every line of every molecule at once, then sorted by frequency
+		
+		J = np.arange(jmax)
+		
+		freqs = (2*self.beff[:,None]*(J + 1)[None,:]).ravel()
+		
+		order = np.argsort(freqs,kind='stable')
+		
+		self.freqs = freqs[order]
+		self.mol_index = np.repeat(self.mols,jmax)[order]
+		self.J = np.tile(J,len(self.mols))[order]
+		self.eup = h_over_k*np.repeat(self.beff,jmax)[order]*(self.J + 1)*(self.J + 2)
+		
+		return
+		
+	def __len__(self):
 	
-	#loop through the years and the list and add everything up.  There's gotta be a better way to do this, but who cares, its fast enough.
+		'''
+		Returns the number of lines.
+		'''
 	
-	for x in range(len(dets)):
+		return len(self.freqs)
+		
+	def find(self,fmin,fmax):
 	
-		i = 0
+		'''
+		Returns the positions (as a slice) of the lines from fmin to fmax (in MHz, inclusive).  fmin and fmax can also be arrays, for many bands at once, in which case the starts and ends come back as arrays instead.
+		'''
 		
-		for mol in list:
+		start = np.searchsorted(self.freqs,fmin,side='left')
+		end = np.searchsorted(self.freqs,fmax,side='right')
 		
-			if mol.year < years[x]+1:
+		if np.ndim(start) == 0:
+		
+			return slice(int(start),int(end))
 			
-				i += 1
-				
-		dets[x] = i
+		return start, np.maximum(start,end)
 		
-	#get some year indicies for years we care about
+	def select(self,fmin,fmax,emax=None):
 	
-	def iyear(x):
+		'''
+		Returns the positions of the lines in any number of windows from fmin to fmax (single values or arrays, in MHz), e.g. the spectral windows of a setup, with upper state energies of no more than emax (in K), if it's given.  A line in two overlapping windows is only listed once.
+		'''
+		
+		start, end = self.find(np.atleast_1d(fmin),np.atleast_1d(fmax))
+		
+		#the positions in all of the windows, without a loop over them
+		
+		counts = end - start
+		
+		idx = np.repeat(start - np.concatenate([[0],np.cumsum(counts)[:-1]]),counts) + np.arange(counts.sum())
+		
+		idx = np.unique(idx)
+		
+		if emax is not None:
+		
+			idx = idx[self.eup[idx] <= emax]
+			
+		return idx
+		
+	def lines(self,fmin,fmax,emax=None):
 	
-		return np.argwhere(years==x)[0][0]
-
+		'''
+		Returns a list of (frequency, molecule, J of the lower state, upper state energy) for every line in the windows from fmin to fmax (see select), in order of frequency.
+		'''
+		
+		idx = self.select(fmin,fmax,emax)
+		
+		return [(float(f),self.mol_list[m],int(j),float(e)) for f, m, j, e in zip(self.freqs[idx],self.mol_index[idx],self.J[idx],self.eup[idx])]
+		
+	def molecules(self,fmin,fmax,emax=None):
 	
-	#do linear fits to the data for the two ranges we care about (1968-Present, 2005-Present)
-	#get the slope of the fit to detections since 1968 and since 2005
+		'''
+		Returns a dictionary of {molecule : number of lines} for the molecules with lines in the windows from fmin to fmax (see select), e.g. molecules(*bands['GBT K-band'],emax=50).
+		'''
+		
+		counts = np.bincount(self.mol_index[self.select(fmin,fmax,emax)],minlength=len(self.mol_list))
+		
+		return {self.mol_list[i] : int(counts[i]) for i in np.nonzero(counts)[0]}
+		
+	def band(self,name,emax=None):
 	
-	trend1968 = np.polynomial.polynomial.Polynomial.fit(years[iyear(1968):],dets[iyear(1968):],1).convert().coef[1]
-	trend2005 = np.polynomial.polynomial.Polynomial.fit(years[iyear(2005):],dets[iyear(2005):],1).convert().coef[1]
+		'''
+		Returns molecules() for one of the bands, by name, e.g. band('ALMA Band 3').
+		'''
+		
+		if name not in bands:
+		
+			raise KeyError('{} is not one of the bands ({})' .format(name,', '.join(bands)))
+			
+		return self.molecules(*bands[name],emax=emax)
+		
+def rotational_partition(columns,temps,nterms=20):
 
-	#load up an axis
-	
-	ax = fig.add_subplot(111)
+	'''
+	Returns an approximate rotational partition function for every molecule in columns (from Census.get_constants()) at every temperature in temps (in K), as a (molecules x temperatures) array, nan for the molecules without enough constants.
 	
-	#label the axes
+	Linear molecules are summed over their levels directly where hB/kT is large, and use the high temperature expansion kT/hB + 1/3 + hB/15kT + ... elsewhere, which is good to well under a part in a million by the time it takes over.  Everything else is treated as a rigid rotor in the classical limit, sqrt(pi/ABC)(kT/h)^(3/2), but never less than 1 (the ground state).  There's no symmetry number or nuclear spin statistics, and no vibrational contribution.
+	'''
 	
-	plt.xlabel('Year')
-	plt.ylabel('Cumulative Number of Detected Molecules')
+	T = np.atleast_1d(np.asarray(temps,dtype=np.float64))
 	
-	#customize tick marks
+	A, B, C = columns['Acon'], columns['Bcon'], columns['Ccon']
 	
-	ax.tick_params(axis='x', which='both', direction='in',length=15,width=1)
-	ax.tick_params(axis='y', which='both', direction='in',length=15,width=1)
+	Q = np.full((len(B),len(T)),np.nan)
 	
-	ax.yaxis.set_ticks_position('both')
-	ax.xaxis.set_ticks_position('both')
+	linear = np.isnan(A) & np.isnan(C) & (B > 0)
+	nonlinear = (A > 0) & (B > 0) & (C > 0)
 	
-	#plot it
+	x = h_over_k*B[linear,None]/T[None,:]
 	
-	ax.plot(years,dets,color='dodgerblue',linewidth=4)
+	Qlin = 1/x + 1/3. + x/15. + 4*x**2/315. + x**3/315.
 	
-	#add annotations
+	#where the expansion would be off, there are few enough levels to just add up
 	
-	#first, the detections per year
+	low = x >= 0.2
 	
-	args = {'ha' : 'left','size' : '24'}
+	J = np.arange(nterms)
 	
-	det_str = '\\noindent Since 1968: {:.1f} detections/year \\\\ Since 2005: {:.1f} detections/year' .format(trend1968,trend2005)
+	Qlin[low] = ((2*J + 1)*np.exp(-x[low][:,None]*(J*(J + 1))[None,:])).sum(axis=1)
 	
-	ax.annotate(det_str, xy=(0.05,0.85),xycoords='axes fraction',**args)
+	Q[linear] = Qlin
 	
-	#Now the total number of detections
-		
-	ax.annotate('Total: {}' .format(dets[iyear(eyear)]),xy=(eyear-2,dets[iyear(eyear)]),xycoords='data',va='center',ha='right',size=16)
+	Q[nonlinear] = np.maximum(np.sqrt(np.pi/(A*B*C)[nonlinear,None])*(T[None,:]/h_over_k)**1.5,1.)
 	
-	#Now the facilities
+	return Q
 	
-	args = {'size' : '16'}
+def column_density(nup,gup,eup,Q,temps):
+
+	'''
+	Returns total column densities from upper state column densities nup, assuming the level populations are in LTE at each of temps: N = nup*Q(T)*exp(eup/T)/gup, with eup in K and Q from rotational_partition.  nup, gup, and eup can be arrays with one entry per molecule (each molecule's line), so that the whole census at every temperature is one operation, e.g.
 	
-	arrowprops = {'arrowstyle' : '-|>', 'connectionstyle' : 'arc3', 'facecolor' : 'black'}
+		temps = np.geomspace(2.7,300,100)
+		N = column_density(nup,gup,eup,census.get_partition(temps),temps)
+	'''
 	
-	ax.annotate('NRAO 36-foot (1968)',xy=(1968,dets[iyear(1968)]+4),xycoords='data',xytext=(0,35),textcoords='offset points',rotation=90,arrowprops=arrowprops,va='bottom',ha='center',**args)
-	ax.annotate('',xy=(1982,dets[iyear(1982)]-4),xycoords='data',xytext=(0,-35),textcoords='offset points',rotation=0,arrowprops=arrowprops,va='bottom',ha='left',**args)
-	ax.annotate('Nobeyama (1982)',xy=(1982,dets[iyear(1982)]-31),xycoords='data',**args)
-	ax.annotate('IRAM (1984)',xy=(1984,dets[iyear(1984)]+4),xycoords='data',xytext=(0,35),textcoords='offset points',rotation=90,arrowprops=arrowprops,va='bottom',ha='center',**args)
-	ax.annotate('GBT (2001)',xy=(2001,dets[iyear(2001)]+4),xycoords='data',xytext=(0,35),textcoords='offset points',rotation=90,arrowprops=arrowprops,va='bottom',ha='center',**args)
-	ax.annotate('ALMA (2011)',xy=(2011,dets[iyear(2011)]-4),xycoords='data',xytext=(0,-35),textcoords='offset points',rotation=90,arrowprops=arrowprops,va='top',ha='center',**args)
-		
-	#show the plot
+	T = np.atleast_1d(np.asarray(temps,dtype=np.float64))
 	
-	plt.show()
+	nup, gup, eup = [np.asarray(x,dtype=np.float64) for x in [nup,gup,eup]]
 	
-	#write out the figure
+	if nup.ndim == 1:
 	
-	plt.savefig('cumulative_detections.pdf',format='pdf',transparent=True,bbox_inches='tight')
+		nup, gup, eup = nup[:,None], gup[:,None], eup[:,None]
 	
-	return
+	with np.errstate(over='ignore'):
 	
-def cumu_det_natoms_plot(list,syear=None,eyear=None):
+		return nup*Q*np.exp(eup/T[None,:])/gup
+		
+def composition(formula):
 
 	'''
-	Makes a plot of the cumulative detections (sorted by atoms) by year using 'list', which is usually 'full_list'.  The start year and end year are defined by default to be the earliest year in the list and the current year + 20 (to give room for labels), but these are overridable. 
-	
+	Returns the number of atoms of each element in a formula as written in the census, e.g. '(CH3)2CO' or 'l-C3H+', as a dictionary, along with its charge (from any trailing + or - signs).  Structural prefixes like 'c-' or 'n-' are ignored.
 	'''
-
-	#Close an old figure if it exists and initialize a new figure
-	
-	plt.close('Cumulative Detections By Atoms')
-	
-	fig = plt.figure(num='Cumulative Detections By Atoms',figsize=(10,8))
-	
-	plt.ion()
 	
-	#set some font defaults
+	formula = re.sub(r'^[a-z]+-','',formula)
 	
-	fontparams = {'size':24, 'family':'sans-serif','sans-serif':['Helvetica']}
+	body = formula.rstrip('+-')
 	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')	
+	charge = formula[len(body):].count('+') - formula[len(body):].count('-')
 	
-	#get the starting and ending years, if they aren't set by the user
+	#a stack of counts, one for each open parenthesis
 	
-	if syear is None:
+	stack = [{}]
 	
-		#grab the earliest year in the list of molecules
+	for open_, close, count, element, n in re.findall(r'(\()|(\))(\d*)|([A-Z][a-z]?)(\d*)',body):
 	
-		syear = min([x.year for x in list])
+		if open_ != '':
 		
-	if eyear is None:
-	
-		#grab the current year
-	
-		eyear = date.today().year
+			stack.append({})
+			
+		elif close != '':
 		
-	#make the x-axis array of years
-	
-	years = np.arange(syear,eyear+1)
-	
-	#now we make a dictionary of the different traces we're gonna want, loop through the list, and populate an array of detections for that number of atoms or special case
+			group = stack.pop()
+			
+			for x in group:
+			
+				stack[-1][x] = stack[-1].get(x,0) + group[x]*int(count or 1)
+				
+		else:
+		
+			stack[-1][element] = stack[-1].get(element,0) + int(n or 1)
+			
+	return stack[0], charge
 	
-	dets_dict = {}
+class IsomerIndex(object):
+
+	'''
+	Groups a list of molecules into isomer families, the molecules with the same number of atoms of each element and the same charge, e.g. the C2H4O2 family of methyl formate, acetic acid, and glycolaldehyde.  Families are keyed by hashing that composition, so building the index is one pass over the molecules, and finding a molecule's family is a dictionary lookup.  The first and last detection years and the number of members of every family are kept as arrays alongside.
+	'''
 	
-	for natoms in range(2,14):
+	els = ['H', 'He', 'C', 'O', 'N', 'S', 'P', 'Si', 'Cl', 'F', 'Mg', 'Na', 'Al', 'K', 'Fe', 'Ti', 'Ar', 'V', 'Ca']
 	
-		#fill it with an empty array
+	def __init__(self,mol_list):
 	
-		dets_dict[natoms] = np.copy(years)*0
+		self.mol_list = mol_list
 		
-		#loop through the years and the list and add everything up.  There's gotta be a better way to do this, but who cares, its fast enough.
-	
-		for x in range(len(dets_dict[natoms])):
-	
-			i = 0
+		#the positions in mol_list of the members of each family, and the number of each family (in the order they turn up), both by key
+		
+		self.families = {}
+		self.index = {}
 		
-			for mol in list:
+		ids = []
 		
-				if mol.year < years[x]+1 and mol.natoms == natoms:
+		for i, mol in enumerate(mol_list):
+		
+			key = self.key(mol)
+			
+			if key not in self.families:
 			
-					i += 1
+				self.families[key] = []
+				self.index[key] = len(self.index)
 				
-			dets_dict[natoms][x] = i
+			self.families[key].append(i)
+			
+			ids.append(self.index[key])
+			
+		self.keys = list(self.index)
+		self.family_of = np.array(ids,dtype=np.int64)
 		
-	#do the fullerenes and pahs
+		years = np.array([mol.year for mol in mol_list],dtype=np.int64)
+		
+		self.size = np.bincount(self.family_of,minlength=len(self.keys))
+		self.first_year = np.full(len(self.keys),np.iinfo(np.int64).max)
+		self.last_year = np.full(len(self.keys),np.iinfo(np.int64).min)
+		
+		np.minimum.at(self.first_year,self.family_of,years)
+		np.maximum.at(self.last_year,self.family_of,years)
+		
+		return
+		
+	def key(self,mol):
+	
+		'''
+		Returns the composition key of a molecule: the number of atoms of each of els, followed by its charge.  mol can also be a formula, e.g. 'C2H4O2' or 'HCO+', in which case None comes back if it has an element that isn't in els.
+		'''
+		
+		if isinstance(mol,str):
+		
+			counts, charge = composition(mol)
+			
+			if any(x not in self.els for x in counts):
+			
+				return None
+				
+			return tuple(counts.get(x,0) for x in self.els) + (charge,)
 	
-	dets_dict['fullerenes'] = np.copy(years)*0
+		return tuple(getattr(mol,x) for x in self.els) + (1 if mol.cation is True else -1 if mol.anion is True else 0,)
+		
+	def name(self,key):
 	
-	for x in range(len(dets_dict['fullerenes'])):
-
-		i = 0
+		'''
+		Returns the formula of a family, from its key, in Hill order (C, then H, then the rest alphabetically), with its charge, e.g. 'C2H4O2' or 'HCO+'.
+		'''
+		
+		counts = {x : n for x, n in zip(self.els,key) if n > 0}
+		
+		first = [x for x in ['C','H'] if x in counts] if 'C' in counts else []
+		
+		order = first + sorted([x for x in counts if x not in first])
+		
+		charge = key[-1]
+		
+		return ''.join(['{}{}' .format(x,counts[x] if counts[x] > 1 else '') for x in order]) + ('+' if charge > 0 else '-')*abs(charge)
+		
+	def family(self,mol):
 	
-		for mol in list:
+		'''
+		Returns the molecules in the family of mol (a molecule, or a formula like 'C2H4O2'), including mol itself, in the order of mol_list.
+		'''
+		
+		return [self.mol_list[i] for i in self.families.get(self.key(mol),[])]
+		
+	def isomers(self,mol):
 	
-			if mol.year < years[x]+1 and mol.fullerene is True:
+		'''
+		Returns the other molecules in the family of mol.
+		'''
 		
-				i += 1
-			
-		dets_dict['fullerenes'][x] = i	
+		return [x for x in self.family(mol) if x is not mol]
 		
-	dets_dict['pahs'] = np.copy(years)*0
+	def stats(self,min_size=2):
 	
-	for x in range(len(dets_dict['pahs'])):
+		'''
+		Returns a list of dictionaries, one for each family with at least min_size members, largest first (and then the earliest detected), of
+		
+			'formula'		:	the family's formula (see name)
+			'members'		:	the molecules in it
+			'ndetected'		:	how many of them have been detected
+			'first_year'	:	the year the first of them was detected
+			'last_year'		:	the year the most recent of them was detected
+		'''
+		
+		idx = np.nonzero(self.size >= min_size)[0]
+		
+		idx = idx[np.lexsort((self.first_year[idx],-self.size[idx]))]
+		
+		return [{'formula' : self.name(self.keys[i]), 'members' : [self.mol_list[j] for j in self.families[self.keys[i]]], 'ndetected' : int(self.size[i]), 'first_year' : int(self.first_year[i]), 'last_year' : int(self.last_year[i])} for i in idx]
+		
+#the rotational constants and dipole moments that Census.get_constants() keeps as columns
+
+spectroscopic_columns = ['Acon','Bcon','Ccon','mua','mub','muc']
+
+class Census(object):
+
+	'''
+	Holds a list of molecules along with the sources and telescopes they refer to, and the things derived from them (like the detection cube), which are built the first time they're asked for.  A census never changes the lists it's given, but it doesn't copy them either; for one that nothing else can change, take a snapshot from CensusSnapshots.
+	'''
 
-		i = 0
+	def __init__(self,mol_list,source_list,scopes_list):
 	
-		for mol in list:
+		self.mol_list = mol_list
+		self.source_list = source_list
+		self.scopes_list = scopes_list
+		self._cube = None
+		self._incidence = {}
+		self._coords = None
+		self._tree = None
+		self._facilities = None
+		self._isotopologues = None
+		self._environments = None
+		self._constants = None
+		self._lines = {}
+		self._partition = {}
+		self._isomers = None
+		self._hash = None
+		
+		#the caches are filled the first time they're asked for, under the lock so that threads sharing a census don't build them twice; once they're filled, reading them doesn't need it.  It's reentrant, since some caches are built from others
+		
+		self.lock = threading.RLock()
+		
+		return
+		
+	def get_hash(self):
 	
-			if mol.year < years[x]+1 and mol.pah is True:
+		'''
+		Returns a sha1 hex digest of every field of every molecule, source, and telescope in the census, so that two censuses with the same contents have the same hash and any edit to the data changes it.
+		'''
 		
-				i += 1
+		if self._hash is None:
+		
+			with self.lock:
+			
+				if self._hash is None:
+				
+					records = {kind : [to_record(x,kind) for x in y] for kind, y in [('molecules',self.mol_list),('sources',self.source_list),('telescopes',self.scopes_list)]}
+					
+					self._hash = hashlib.sha1(json.dumps(records,sort_keys=True,default=str).encode('utf-8')).hexdigest()
 			
-		dets_dict['pahs'][x] = i
+		return self._hash
 		
-	#load up an axis
+	def get_cube(self):
 	
-	ax = fig.add_subplot(111)
+		'''
+		Returns the DetectionCube for this census.
+		'''
 	
-	#label the axes
+		if self._cube is None:
+		
+			with self.lock:
+			
+				if self._cube is None:
+				
+					self._cube = DetectionCube(self.mol_list,self.scopes_list)
+			
+		return self._cube
+		
+	def check(self):
 	
-	plt.xlabel('Year')
-	plt.ylabel('Cumulative Number of Detected Molecules')
+		'''
+		Returns a list of any problems check_census finds in this census.
+		'''
+		
+		return check_census(self.mol_list,self.source_list,self.scopes_list)
+		
+	def get_incidence(self,axis='sources'):
 	
-	#customize tick marks
+		'''
+		Returns the incidence matrix of molecules against either 'sources' or 'telescopes', as a scipy.sparse CSR matrix with a 1 at [i,j] if self.mol_list[i] was detected in (or with) column j, along with the list of column names (source names or telescope shortnames).  Columns follow source_list or scopes_list, with anything a molecule refers to that isn't listed added on the end.
+		'''
+		
+		if axis not in ['sources','telescopes']:
+		
+			raise KeyError('axis must be sources or telescopes, not {}' .format(axis))
 	
-	ax.tick_params(axis='x', which='both', direction='in',length=15,width=1)
-	ax.tick_params(axis='y', which='both', direction='in',length=15,width=1)
-	
-	ax.yaxis.set_ticks_position('both')
-	ax.xaxis.set_ticks_position('both')		
-	ax.set_xticks([1940,1960, 1980,2000,2020])
-	
-	ax.set_xlim([syear,eyear+35])
-	
-	#plot the traces
-	
-	ax.plot(years,dets_dict[2],color='#000000')
-	ax.plot(years,dets_dict[3],color='#800000')
-	ax.plot(years,dets_dict[4],color='#f032e6')
-	ax.plot(years,dets_dict[5],color='#9A6324')
-	ax.plot(years,dets_dict[6],color='dodgerblue')
-	ax.plot(years,dets_dict[7],color='#e6194B')
-	ax.plot(years,dets_dict[8],color='#469990')
-	ax.plot(years,dets_dict[9],color='#f58231')
-	ax.plot(years,dets_dict[10],color='#42d4f4')
-	ax.plot(years,dets_dict[11],color='#ffe119')
-	ax.plot(years,dets_dict[12],color='#3cb44b')
-	ax.plot(years,dets_dict[13],color='#e6beff')
-	ax.plot(years,dets_dict['fullerenes'],color='#000075')
-	ax.plot(years,dets_dict['pahs'],color='#aaffc3')
-	
-	#add the annotations	
-	
-	ax.annotate(r'\textbf{2 atoms}',xy=(eyear+2,dets_dict[2][-1]),xycoords='data',size=16,color='#000000',va='top')
-	ax.annotate(r'\textbf{3 atoms}',xy=(eyear+2,dets_dict[3][-1]),xycoords='data',size=16,color='#800000',va='bottom')
-	ax.annotate(r'\textbf{4 atoms}',xy=(eyear+2,dets_dict[4][-1]),xycoords='data',size=16,color='#f032e6',va='center')
-	ax.annotate(r'\textbf{5 atoms}',xy=(eyear+2,dets_dict[5][-1]),xycoords='data',size=16,color='#9A6324',va='center')
-	ax.annotate(r'\textbf{6 atoms}',xy=(eyear+2,dets_dict[6][-1]),xycoords='data',size=16,color='dodgerblue',va='center')
-	ax.annotate(r'\textbf{7 atoms}',xy=(eyear+2,dets_dict[7][-1]),xycoords='data',size=16,color='#e6194B',va='center')
-	ax.annotate(r'\textbf{8 atoms}',xy=(eyear+2,dets_dict[8][-1]),xycoords='data',size=16,color='#469990',va='bottom')
-	ax.annotate(r'\textbf{9 atoms}',xy=(eyear+2,dets_dict[9][-1]),xycoords='data',size=16,color='#f58231',va='center')
-	ax.annotate(r'\textbf{10 \&}',xy=(eyear+2,dets_dict[10][-1]),xycoords='data',size=16,color='#42d4f4',va='bottom')
-	ax.annotate(r'\textbf{11 atoms}',xy=(eyear+11,dets_dict[11][-1]),xycoords='data',size=16,color='#ffe119',va='bottom')
-	ax.annotate(r'\textbf{12 atoms}',xy=(eyear+2,dets_dict[12][-1]),xycoords='data',size=16,color='#3cb44b',va='center')
-	ax.annotate(r'\textbf{13 atoms \& }',xy=(eyear+2,dets_dict[13][-1]),xytext=(eyear+2,dets_dict[13][-1]-0.5),xycoords='data',size=16,color='#e6beff',va='center')	
-	arrowprops = {'arrowstyle' : '-|>', 'connectionstyle' : 'arc3', 'facecolor' : '#000075'}
-	ax.annotate(r'\textbf{Fullerenes}',xy=(eyear+2,dets_dict['fullerenes'][-1]),xycoords='data',xytext=(eyear+17,dets_dict['fullerenes'][-1]),textcoords='data',arrowprops=arrowprops,size=16,color='#000075',va='center')
-	ax.annotate(r'\textbf{PAHs}',xy=(eyear+22,dets_dict['pahs'][-1]-0.5),xycoords='data',size=16,color='#aaffc3',va='center')
-
-	#show the plot
-	
-	plt.show()		
-	
-	#write out the figure
-	
-	plt.savefig('cumulative_by_atoms.pdf',format='pdf',transparent=True,bbox_inches='tight')
-	
-	return
-
-def change_color(color, amount=1.0):
-    """
-    Lightens the given color by multiplying (1-luminosity) by the given amount.
-    Input can be matplotlib color string, hex string, or RGB tuple.
-
-    Examples:
-    >> lighten_color('g', 0.3)
-    >> lighten_color('#F034A3', 0.6)
-    >> lighten_color((.3,.55,.1), 0.5)
-    """
-    import matplotlib.colors as mc
-    import colorsys
-    try:
-        c = mc.cnames[color]
-    except:
-        c = color
-    c = colorsys.rgb_to_hls(*mc.to_rgb(c))
-    return colorsys.hls_to_rgb(c[0], 1 - amount * (1 - c[1]), c[2])		
-	
-def det_per_year_per_atom(list):
-
-	'''
-	Makes a plot of the average number of detections per year (y) for a molecule with (x) atoms, starting in the year they were first detected.  Has the ability to plot PAHs and fullerenes, but doesn't.
-	'''
-
-	#Close an old figure if it exists and initialize a new figure
-	
-	plt.close('Detects Per Year Per Atom')
-	
-	fig = plt.figure(num='Detects Per Year Per Atom',figsize=(10,8))
-	
-	plt.ion()
-	
-	#set some font defaults
-	
-	fontparams = {'size':24, 'family':'sans-serif','sans-serif':['Helvetica']}
-	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')	
-	
-	#We're going to cheat later on and lump PAHs and Fullerenes together, but these need fake natoms.  They'll always be +2 and +4, respectively, beyond the maximum of 'normal' molecules, and we'll leave +1 blank for visual separation.  For now, though, time to make a list and loop through our molecules.
-	
-	natoms = np.arange(2,18)
-	
-	#and an array of the average number of detections
-	
-	avg_dets = np.copy(natoms)*0.0
-	n_dets = np.copy(natoms)*0.0
-	
-	#get the years that are being spanned
-	
-	eyear = max([x.year for x in list])
-	
-	for x in range(len(natoms)):
-	
-		i = 0
+		if axis not in self._incidence:
 		
-		years = []
-		
-		if natoms[x] < 14:
-		
-			for mol in list:
-			
-				if mol.natoms == natoms[x]:
-			
-					i += 1
-					
-					years.append(mol.year)
-			
-		elif natoms[x] == 15:
-		
-			for mol in list:
+			with self.lock:
 			
-				if mol.pah is True:		
+				if axis not in self._incidence:
 				
-					i += 1
+					columns = {}
+					names = []
 					
-					years.append(mol.year)
+					for x in (self.source_list if axis == 'sources' else self.scopes_list):
 					
-		elif natoms[x] == 17:
-		
-			for mol in list:
-			
-				if mol.fullerene is True:
-				
-					i += 1
+						if id(x) not in columns:
+						
+							columns[id(x)] = len(names)
+							names.append(x.name if axis == 'sources' else x.shortname)
+					
+					indptr = [0]
+					indices = []
+					
+					for mol in self.mol_list:
 					
-					years.append(mol.year)
+						for x in (mol.sources if axis == 'sources' else mol.telescopes):
+						
+							if id(x) not in columns:
 							
-		if i == 0:
-			
-			avg_dets[x] = np.NaN
-			
-		else:
-			
-			avg_dets[x] = i/(eyear-min(years)+1)
-			n_dets[x] = i
+								columns[id(x)] = len(names)
+								names.append(x.name if axis == 'sources' else x.shortname)
+								
+							indices.append(columns[id(x)])
+							
+						indptr.append(len(indices))
+						
+					matrix = sparse.csr_matrix((np.ones(len(indices),dtype=np.int32),np.array(indices,dtype=np.int32),np.array(indptr,dtype=np.int64)),shape=(len(self.mol_list),len(names)))
+					
+					#a molecule listing the same source twice still only counts once
+					
+					matrix.sum_duplicates()
+					matrix.data[:] = 1
+						
+					self._incidence[axis] = [matrix,names]
 			
-	n_dets[n_dets == 0] = np.nan		
+		return self._incidence[axis]
 		
-	#load up an axis
+	def shared_molecules(self,axis='sources'):
 	
-	ax = fig.add_subplot(111)
-	
-	#label the axes
-	
-	plt.xlabel('Number of Atoms')
-	plt.ylabel('Detections/Year*')
-	
-	#customize tick marks
-	
-	ax.tick_params(axis='x', which='both', direction='in',length=15,width=1)
-	ax.tick_params(axis='y', which='both', direction='in',length=15,width=1)
-	
-	ax.yaxis.set_ticks_position('both')
-	ax.xaxis.set_ticks_position('both')		
-	ax.set_xticks([2,4,6,8,10,12,15,17])
-	ax.set_xticklabels(['2','4','6','8','10','12','PAHs','Fullerenes'])
-	
-	ax.set_xlim([1,12.8])
-	ax.set_ylim([0,1.])
-	
-	#plot the data
-	
-	marker = 'o'		
-	mfc = 'dodgerblue'
-	mec = change_color(mfc,1.5)	
-	
-	sizes = np.copy(n_dets) * 200/np.nanmin(n_dets)
-	
-# 	sizes = [x*200/np.amin(n_dets) for x in sizes if x > 0]
-# 	
-# 	ddd
-	
-	ax.scatter(natoms,avg_dets,marker='o',c=mfc,edgecolors=mec,s=sizes)
-	
-	#add some annotations
-	
-	ax.annotate('*Since year of first detection',xy=(0.35,0.9),xycoords='axes fraction',ha='left')
-	ax.annotate('\\noindent Marker size proportional to\\\\ total \# of detections',xy=(0.05,0.1),xycoords='axes fraction',ha='left')
-	
-	for label in ax.get_xmajorticklabels():
+		'''
+		Returns a sparse matrix of the number of molecules each pair of sources (or telescopes) have in common, with the number each has on its own down the diagonal, along with the names.
+		'''
+		
+		matrix, names = self.get_incidence(axis)
+		
+		return (matrix.T @ matrix).tocsr(), names
+		
+	def similarity(self,axis='sources',measure='jaccard'):
 	
-		if label._text == 'Fullerenes' or label._text == 'PAHs':
+		'''
+		Returns a sparse matrix of the similarity of the chemical inventories of every pair of sources (or telescopes), along with the names.  measure is either 'jaccard' (shared molecules over the molecules in either) or 'overlap' (shared molecules over the molecules in the smaller of the two).  Pairs with nothing in common are left out of the matrix.
+		'''
 		
-			label.set_rotation(-45)
+		shared, names = self.shared_molecules(axis)
+		
+		sizes = shared.diagonal()
+		
+		shared = shared.tocoo()
+		
+		if measure == 'jaccard':
+		
+			norm = sizes[shared.row] + sizes[shared.col] - shared.data
 			
-	fig.tight_layout()		
-
-	#show the plot
-	
-	plt.show()
-	
-	#write out the figure
-	
-	plt.savefig('rate_by_atoms.pdf',format='pdf',transparent=True,bbox_inches='tight')	
-
-	return	
-	
-def facility_shares(scopes_list,mols_list):
-
-	'''
-	Generates a plot of the percentage share of yearly detections that a facility contributed over its operational lifetime for the top 9 facilities
-	'''
-
-	#Close an old figure if it exists and initialize a new figure
-	
-	plt.close('Facility Shares')
-	
-	fig,axs = plt.subplots(3,3,num='Facility Shares')
-	
-	plt.ion()
-	
-	#set some font defaults
-	
-	fontparams = {'size':14, 'family':'sans-serif','sans-serif':['Helvetica']}
-	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')	
-
-	#we need to generate the data now, which we'll store in a dictionary for each telescope.  Each entry will be [syear,eyear,ndetects,ntotal,shortname] for the start year, end year, number of detections, and total number of detections over those years
-	
-	detects = [x.ndetects for x in scopes_list]
-	
-	detects.sort(reverse=True)
-	
-	detects = detects[:9]
-	
-	min_allowed = min(detects)
-	
-	my_dict = {}
-	
-	for scope in scopes_list:
-	
-		ndetects = scope.ndetects #number of detections
+		elif measure == 'overlap':
 		
-		if ndetects >= min_allowed:
-			#print(ndetects,scope.shortname)
-			pass
+			norm = np.minimum(sizes[shared.row],sizes[shared.col])
 			
 		else:
 		
+			raise KeyError('measure must be jaccard or overlap, not {}' .format(measure))
 			
-			continue
+		return sparse.csr_matrix((shared.data/norm,(shared.row,shared.col)),shape=shared.shape), names
 		
-		syear = scope.built #year it was built
-		eyear = scope.decommissioned if scope.decommissioned is not None else date.today().year #year it was decommissioned or this year if it's still in operation
-
-		#now we go get the total number of detections in that time
+	def most_shared(self,name,axis='sources',n=10,measure=None):
+	
+		'''
+		Returns a list of [name, value] for the n sources (or telescopes) that share the most molecules with the one called name, most first.  If measure is 'jaccard' or 'overlap' they're ranked by that similarity instead of the raw number of shared molecules.
+		'''
 		
-		ntotal = 0
+		matrix, names = self.get_incidence(axis)
 		
-		for mol in mols_list:
+		if name not in names:
 		
-			if mol.year <= eyear and mol.year >= syear:
+			raise KeyError('{} is not in the census {}' .format(name,axis))
 			
-				ntotal += 1
+		i = names.index(name)
 		
-		my_dict[scope.shortname] = [syear,eyear,ndetects,ntotal,scope.shortname]
+		#only the one column of the product is needed
 		
-	my_list = [my_dict[x] for x in my_dict]	
-	
-	my_list.sort(key = lambda x: x[2]/x[3],reverse=True)
-	
-# 	for x in my_list:
-# 		print(x, x[2]/x[3])
-
-	#load some axes
-	
-	idx = 0
-	
-	for i in range(3):
+		shared = np.asarray((matrix.T @ matrix[:,i]).todense()).ravel().astype(float)
 		
-		for j in range(3)[::-1]:
+		sizes = np.asarray(matrix.sum(axis=0)).ravel()
 		
-			fracs = [my_list[idx][2]/my_list[idx][3],1.-my_list[idx][2]/my_list[idx][3]]
-			
-			label = '\\textbf' + '{' +'{}' .format(int(my_list[idx][2]/my_list[idx][3] * 100)) +'\%'
+		with np.errstate(divide='ignore',invalid='ignore'):
+		
+			if measure == 'jaccard':
 			
-			if my_list[idx][1] == date.today().year:
+				shared = shared/(sizes + sizes[i] - shared)
+				
+			elif measure == 'overlap':
 			
-				color = 'dodgerblue'
+				shared = shared/np.minimum(sizes,sizes[i])
 				
-			else:
+			elif measure is not None:
 			
-				color = '#F87070'
+				raise KeyError('measure must be jaccard or overlap, not {}' .format(measure))
+				
+		shared = np.nan_to_num(shared)
+				
+		shared[i] = -1
 		
-
-
-			if idx > 5:
-			
-				slices, labels = axs[i,j].pie(fracs, colors=[color,'#F5F6FF'], wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black'})
+		n = min(n,len(names)-1)
+		
+		top = np.argpartition(-shared,n-1)[:n] if n > 0 else np.array([],dtype=int)
+		
+		top = top[np.argsort(-shared[top],kind='stable')]
+		
+		return [[names[x],float(shared[x]) if measure is not None else int(shared[x])] for x in top if shared[x] > 0]
+		
+	def get_coords(self):
+	
+		'''
+		Returns the RA and Dec of every source in source_list as two float arrays in radians, parsed from the sexagesimal strings once.  Sources without coordinates are nan.
+		'''
+		
+		if self._coords is None:
+		
+			with self.lock:
 			
-				axs[i,j].annotate(my_list[idx][-1],xy=(0.5,1.08),xycoords='axes fraction',ha='center',size=12)
-				axs[i,j].annotate('{} - {}' .format(my_list[idx][0],my_list[idx][1]),xy=(0.5,.95),xycoords='axes fraction',ha='center',size=10)
+				if self._coords is None:
+				
+					self._coords = [np.array([parse_sexagesimal(x.ra,hours=True) for x in self.source_list]),np.array([parse_sexagesimal(x.dec) for x in self.source_list])]
 			
-				kw = dict(arrowprops=dict(arrowstyle="-"), zorder=0, va="center")
-				ang = (slices[0].theta2 - slices[0].theta1)/2. + slices[0].theta1
-				y = np.sin(np.deg2rad(ang))
-				x = np.cos(np.deg2rad(ang))
-				horizontalalignment = {-1: "right", 1: "left"}[int(np.sign(x))]
-				connectionstyle = "angle,angleA=0,angleB={}".format(ang)
-				kw["arrowprops"].update({"connectionstyle": connectionstyle})
-				axs[i,j].annotate(label, xy=(x, y), xytext=(1.1*np.sign(x), y),
-					horizontalalignment=horizontalalignment, size=10, **kw)
+		return self._coords
+		
+	def get_tree(self):
+	
+		'''
+		Returns a k-d tree (scipy cKDTree) of the unit vectors of every source with coordinates, and the indices in source_list those points belong to.
+		'''
+		
+		if self._tree is None:
+		
+			with self.lock:
+			
+				if self._tree is None:
+				
+					ra, dec = self.get_coords()
 					
-			else:
+					idx = np.nonzero(np.isfinite(ra) & np.isfinite(dec))[0]
+					
+					self._tree = [cKDTree(radec_to_xyz(ra[idx],dec[idx])),idx]
 			
-				my_labels = ['\\textbf' + '{' +'{}' .format(int(my_list[idx][2]/my_list[idx][3] * 100)) +'\%','']
+		return self._tree
+		
+	def cone_search(self,ra,dec,radius):
+	
+		'''
+		Returns the sources within radius degrees of a position, given as ra and dec in degrees or as sexagesimal strings (with ra in hours).  ra and dec can also be arrays or lists of positions, in which case a list of lists of sources comes back, one for each position.
+		'''
+		
+		tree, idx = self.get_tree()
+		
+		xyz = radec_to_xyz(*positions_to_radians(ra,dec))
+		
+		#search on the chord length that subtends the radius
+		
+		matches = tree.query_ball_point(xyz,2*np.sin(np.radians(min(radius,180.))/2))
+		
+		if np.ndim(xyz) == 1:
+		
+			return [self.source_list[idx[x]] for x in sorted(matches)]
 			
-				slices, labels = axs[i,j].pie(fracs, labels=my_labels, colors=[color,'#F5F6FF'], wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black'}, labeldistance=0.7)
+		return [[self.source_list[idx[x]] for x in sorted(y)] for y in matches]
+		
+	def nearest(self,ra,dec,k=1):
+	
+		'''
+		Returns the separations (in degrees) and the sources for the k nearest sources to a position or array of positions, given the same way as for cone_search.  For a single position and k=1 these are a float and a source; otherwise they're arrays and (nested) lists.
+		'''
+		
+		tree, idx = self.get_tree()
+		
+		xyz = radec_to_xyz(*positions_to_radians(ra,dec))
+		
+		dist, matches = tree.query(xyz,k=k)
+		
+		sep = np.degrees(2*np.arcsin(np.clip(dist/2,0,1)))
+		
+		sources = np.array(self.source_list + [None],dtype=object)[np.append(idx,len(self.source_list))[matches]]
+		
+		return sep, sources.tolist() if np.ndim(sources) > 0 else sources
+		
+	def get_facility_index(self):
+	
+		'''
+		Returns the FacilityIndex of the telescope lifetimes in this census.
+		'''
+		
+		if self._facilities is None:
+		
+			with self.lock:
 			
-				axs[i,j].annotate(my_list[idx][-1],xy=(0.5,1.08),xycoords='axes fraction',ha='center',size=12)
-				axs[i,j].annotate('{} - {}' .format(my_list[idx][0],my_list[idx][1]),xy=(0.5,.95),xycoords='axes fraction',ha='center',size=10)
+				if self._facilities is None:
 				
-				for label in labels:
+					self._facilities = FacilityIndex(self.scopes_list)
+			
+		return self._facilities
+		
+	def facility_years(self,syear=None,eyear=None):
+	
+		'''
+		Returns the years from syear to eyear (by default, the first and last years in the detection cube), the number of facilities operating each year, and the number of detections made by operating facilities each year per operating facility.
+		'''
+		
+		cube = self.get_cube()
+		index = self.get_facility_index()
+		
+		syear = cube.syear if syear is None else syear
+		eyear = cube.eyear if eyear is None else eyear
+		
+		years = np.arange(syear,eyear+1)
+		
+		active = index.activity(years)
+		
+		#line the cube's facilities up with the index's
+		
+		dets = cube.per_year(years,keep=['facility'])
+		dets = dets[:,[cube.lookup['facility'][x] for x in index.names if x in cube.lookup['facility']]]
+		active_dets = active[:,[i for i, x in enumerate(index.names) if x in cube.lookup['facility']]]
+		
+		n_active = active.sum(axis=1)
+		
+		with np.errstate(divide='ignore',invalid='ignore'):
+		
+			per_facility = np.where(n_active > 0,(dets*active_dets).sum(axis=1)/n_active,np.nan)
+		
+		return years, n_active, per_facility
+		
+	def get_isotopologues(self):
+	
+		'''
+		Returns every Isotopologue record in the census, along with an index of them by isotope (a dictionary of '13C', 'D', '15N', ... to arrays of positions in the records) and an array of their years.
+		'''
+		
+		if self._isotopologues is None:
+		
+			with self.lock:
+			
+				if self._isotopologues is None:
 				
-					label.set_horizontalalignment('center')
-					label.set_color('white')
-					label.set_fontsize(10)
+					records = [x for mol in self.mol_list for x in mol.get_isotopologues()]
+					
+					index = {}
+					
+					for i, x in enumerate(records):
+					
+						for y in set(x.isotopes):
+						
+							index.setdefault(y,[]).append(i)
+							
+					self._isotopologues = [records,{x : np.array(index[x]) for x in index},np.array([x.year for x in records],dtype=int)]
+			
+		return self._isotopologues
+		
+	def isotopologues(self,isotope=None,syear=None,eyear=None,environment=None):
+	
+		'''
+		Returns the isotopologues containing isotope (e.g. '13C' or 'D'), detected from syear to eyear, in environment ('ism' or 'ppd').  Anything left as None isn't filtered on, so isotopologues('D',syear=2011) is every deuterated species detected after 2010.
+		'''
+		
+		records, index, years = self.get_isotopologues()
+		
+		idx = np.arange(len(records)) if isotope is None else index.get(isotope,np.array([],dtype=int))
+		
+		if syear is not None:
+		
+			idx = idx[years[idx] >= syear]
+			
+		if eyear is not None:
+		
+			idx = idx[years[idx] <= eyear]
+			
+		return [records[x] for x in idx if environment is None or records[x].environment == environment]
+		
+	def get_environments(self):
+	
+		'''
+		Returns a dictionary of int8 columns, one for each of the environments ('ice', 'ppd', 'exgal', 'exo'), giving the detection_state of every molecule in mol_list there (0 absent, 1 tentative, 2 confirmed), plus a 'year' column of when each was detected in the ISM.
+		'''
+		
+		if self._environments is None:
+		
+			with self.lock:
+			
+				if self._environments is None:
 				
+					columns = {x : np.array([detection_state(getattr(mol,x)) for mol in self.mol_list],dtype=np.int8) for x in environments}
+					
+					columns['year'] = np.array([mol.year for mol in self.mol_list],dtype=int)
+					
+					self._environments = columns
 			
-			#draw a line around the outside of the pie
+		return self._environments
+		
+	def environment_fraction(self,env,min_state=1,cumulative=False):
+	
+		'''
+		Returns the years, the number of ISM detections in each year, and the fraction of them that have also been found in env (at least tentatively by default; min_state=2 for confirmed only).  If cumulative is True, the numbers are for everything detected up to and including each year instead.
+		'''
+		
+		columns = self.get_environments()
+		
+		syear = columns['year'].min()
+		
+		years = np.arange(syear,columns['year'].max()+1)
+		
+		total = np.bincount(columns['year'] - syear,minlength=len(years))
+		found = np.bincount(columns['year'] - syear,weights=columns[env] >= min_state,minlength=len(years))
+		
+		if cumulative is True:
+		
+			total = np.cumsum(total)
+			found = np.cumsum(found)
+			
+		with np.errstate(divide='ignore',invalid='ignore'):
+		
+			return years, total, np.where(total > 0,found/total,np.nan)
+			
+	def environment_crosstab(self,a,b):
+	
+		'''
+		Returns a 3 x 3 array of the number of molecules in each combination of detection states in environments a and b, so that e.g. environment_crosstab('ppd','ice')[2,2] is the number confirmed in both.
+		'''
+		
+		columns = self.get_environments()
+		
+		return np.bincount(3*columns[a].astype(int) + columns[b],minlength=9).reshape(3,3)
+		
+	def get_constants(self):
+	
+		'''
+		Returns a dictionary of columns of the rotational constants (in MHz) and dipole moments (in Debye) of every molecule in mol_list.  For each of spectroscopic_columns x there's
+		
+			x			float64, nan where there's no number
+			x_valid		True where there is one
+			x_flag		'' for a number or nothing, or the placeholder given instead of a number (e.g. '*' for the dipole moments of AlCl and CP)
+			
+		along with 'kappa' (the asymmetry parameter, -1 for linear molecules, nan where it can't be worked out), 'mass', and 'natoms', so that statistics and plots can work straight from the arrays, e.g. 
+		
+			columns = census.get_constants()
+			ok = columns['Bcon_valid']
+			plt.scatter(columns['mass'][ok],columns['Bcon'][ok])
+		'''
+		
+		if self._constants is None:
+		
+			with self.lock:
+			
+				if self._constants is None:
+				
+					columns = {}
+				
+					for x in spectroscopic_columns:
+					
+						values = [getattr(mol,x) for mol in self.mol_list]
 						
-			# get the center and radius of the pie wedges			
-			center = slices[0].center
-			r = slices[0].r
+						#bools are ints too, but never a constant
+						
+						number = np.array([isinstance(y,(int,float)) and not isinstance(y,bool) for y in values],dtype=bool)
+						
+						columns[x] = np.array([y if z else np.nan for y, z in zip(values,number)],dtype=np.float64)
+						columns[x+'_valid'] = number & ~np.isnan(columns[x])
+						columns[x+'_flag'] = np.array(['' if z or y is None else str(y) for y, z in zip(values,number)],dtype=str)
+						
+					A, B, C = columns['Acon'], columns['Bcon'], columns['Ccon']
+					
+					with np.errstate(divide='ignore',invalid='ignore'):
+					
+						columns['kappa'] = np.where(np.isnan(A) & np.isnan(C) & ~np.isnan(B),-1.,(2*B - A - C)/(A - C))
+					
+					columns['mass'] = np.array([mol.mass for mol in self.mol_list],dtype=np.float64)
+					columns['natoms'] = np.array([mol.natoms for mol in self.mol_list],dtype=int)
+					
+					self._constants = columns
+					
+		return self._constants
+		
+	def constants_by(self,x,by='source_type'):
+	
+		'''
+		Returns a dictionary of {group : array} of the values of one of the get_constants() columns, e.g. 'mua' or 'Bcon', that there are numbers for, for each generalized source type the molecules were detected in (by='source_type') or each number of atoms (by='natoms').  A molecule seen in more than one type of source is counted in each of them.  e.g. the dipole moment distributions by source type:
+		
+			for type, mu in census.constants_by('mua').items():
 			
-			# create a new circle with the desired properties
-			circle = matplotlib.patches.Circle(center, r, fill=False, edgecolor="black", linewidth=1)
-			# add the circle to the axes
-			axs[i,j].add_patch(circle)
+				ax.hist(mu,label=type)
+		'''
+		
+		columns = self.get_constants()
+		
+		if x not in columns or x in ['mass','natoms']:
+		
+			raise KeyError('{} is not one of the constants ({})' .format(x,', '.join(spectroscopic_columns + ['kappa'])))
 			
-			idx += 1
-
-	fig.tight_layout()
+		values = columns[x]
+		ok = ~np.isnan(values)
+		
+		if by == 'natoms':
+		
+			groups = np.unique(columns['natoms'])
+		
+			return {int(n) : values[ok & (columns['natoms'] == n)] for n in groups}
+			
+		if by != 'source_type':
+		
+			raise KeyError('constants can be grouped by source_type or natoms, not {}' .format(by))
+			
+		#which types each molecule was seen in, straight from the incidence matrix
+			
+		matrix, names = self.get_incidence('sources')
+		
+		types = {y.name : y.type for mol in self.mol_list for y in mol.sources}
+		types.update({y.name : y.type for y in self.source_list})
+		
+		labels = sorted(set(types.values()),key=str)
+		lookup = {y : i for i, y in enumerate(labels)}
+		
+		onehot = sparse.csr_matrix((np.ones(len(names)),([lookup[types[y]] for y in names],np.arange(len(names)))),shape=(len(labels),len(names)))
+		
+		member = (matrix @ onehot.T).toarray() > 0
+		
+		return {y : values[ok & member[:,i]] for i, y in enumerate(labels)}
+		
+	def get_lines(self,jmax=50,tolerance=0.):
 	
-	fig.subplots_adjust(wspace=-.5, hspace=.15)
+		'''
+		Returns the LineIndex of predicted rotational lines for the census, up to jmax.  One is kept for each jmax and tolerance asked for.
+		'''
+		
+		key = (jmax,tolerance)
+		
+		if key not in self._lines:
+		
+			with self.lock:
+			
+				if key not in self._lines:
+				
+					self._lines[key] = LineIndex(self.mol_list,jmax=jmax,tolerance=tolerance,columns=self.get_constants())
+					
+		return self._lines[key]
+		
+	def get_partition(self,temps=None):
 	
-	plt.show()
+		'''
+		Returns the (molecules x temperatures) array of rotational partition functions from rotational_partition for every molecule in mol_list, over temps (a 100 point logarithmic grid from 2.7 to 300 K by default).  One is kept for each temperature grid asked for, so treat it as read-only.
+		'''
+		
+		temps = np.geomspace(2.7,300,100) if temps is None else np.atleast_1d(np.asarray(temps,dtype=np.float64))
+		
+		key = temps.tobytes()
+		
+		if key not in self._partition:
+		
+			with self.lock:
+			
+				if key not in self._partition:
+				
+					self._partition[key] = rotational_partition(self.get_constants(),temps)
+					
+		return self._partition[key]
+		
+	def get_isomers(self):
 	
-	plt.savefig('facility_shares.pdf',format='pdf',transparent=True,bbox_inches='tight')	
+		'''
+		Returns the IsomerIndex of the molecules in mol_list, e.g. census.get_isomers().family('C2H4O2').
+		'''
+		
+		if self._isomers is None:
+		
+			with self.lock:
+			
+				if self._isomers is None:
+				
+					self._isomers = IsomerIndex(self.mol_list)
+					
+		return self._isomers
+		
+census = Census(full_list,source_list,scopes_list)
 
-	return		
-	
-def cumu_det_facility(list):
+#every snapshot CensusSnapshots has published that's still in use, by the id of its molecule list, so that figures drawn from a snapshot's molecules use that snapshot
+
+published = weakref.WeakValueDictionary()
+
+def get_census(list):
 
 	'''
-	Makes a plot of the cumulative number of detections of a facility with time.
+	Returns the census for a list of molecules: the main one if list is full_list, the snapshot it came from if it's the molecules of a published snapshot, otherwise a new one built from list.
 	'''
-
-	#Close an old figure if it exists and initialize a new figure
-	
-	plt.close('Detections Per Facility Over Time')
-	
-	fig = plt.figure(num='Detections Per Facility Over Time',figsize=(10,8))
 	
-	plt.ion()
+	if list is census.mol_list:
 	
-	#set some font defaults
-	
-	fontparams = {'size':24, 'family':'sans-serif','sans-serif':['Helvetica']}
+		return census
+		
+	snapshot = published.get(id(list))
 	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')	
+	if snapshot is not None and snapshot.mol_list is list:
 	
-	#We're only going to do facilities with 10 or more total detections.  Right now that's the GBT, IRAM, NRAO 140-ft, NRAO/ARO 12-m, NRAO 36ft, and Nobeyama.
+		return snapshot
+		
+	return Census(list,source_list,scopes_list)
 	
-	#set this thing up to kick off a few years before 1968 and run until today
+class CensusSnapshots(object):
+
+	'''
+	Publishes versions of the census for any number of concurrent readers.  get() returns the current snapshot: a Census of its own molecule, source, and telescope objects, held in tuples, that nothing changes once it's published.  update() and publish() build the next version from copies of the records, and only swap it in once it's complete, so a reader keeps a consistent census for as long as it holds on to one, and never needs a lock.  Updates are made one at a time.  Functions passed to subscribe() are called with each new snapshot after it's published, outside the lock that updates hold, so a slow subscriber doesn't hold up the next update and one that fails doesn't stop the others.
+	'''
 	
-	years = np.arange(1965,date.today().year+1)
+	def __init__(self,census=None):
 	
-	scopes = [GBT,IRAM30,NRAO140,NRAOARO12,NRAO36,Nobeyama45]
+		self.lock = threading.Lock()
+		self.notify_lock = threading.Lock()
+		self.subscribers = []
+		self.current = None
+		self.version = 0
+		self.notified = 0
+		
+		self.publish(globals()['census'] if census is None else census)
+		
+		return
+		
+	def get(self):
 	
-	my_dict = {}
+		'''
+		Returns the current snapshot.
+		'''
 	
-	for scope in scopes:
+		return self.current
+		
+	def get_records(self):
 	
-		tmp_years = np.copy(years)*0
+		'''
+		Returns a dictionary of new copies of the 'molecules', 'sources', and 'telescopes' records of the current snapshot, which can be changed freely.
+		'''
+		
+		current = self.current
 		
-		i = 0
+		return {kind : copy.deepcopy([to_record(x,kind) for x in y]) for kind, y in [('molecules',current.mol_list),('sources',current.source_list),('telescopes',current.scopes_list)]}
 		
-		for x in range(len(years)):
+	def publish(self,census):
 	
-			for mol in list:
+		'''
+		Publishes a snapshot of census (which is copied, so the census itself can go on changing) as the new version.  Returns the snapshot.
+		'''
+		
+		with self.lock:
+		
+			records = {kind : copy.deepcopy([to_record(x,kind) for x in y]) for kind, y in [('molecules',census.mol_list),('sources',census.source_list),('telescopes',census.scopes_list)]}
+			
+			snapshot, version = self._swap(records)
+			
+		self._notify(snapshot,version)
+			
+		return snapshot
+			
+	def update(self,edit):
 	
-				if mol.year == years[x] and scope in mol.telescopes:
+		'''
+		Publishes a new version made by edit, a function that's given the dictionary from get_records() and either changes the records in it or returns a new dictionary like it.  For example, to move a detection year:
 		
-					i += 1
+			snapshots.update(lambda r: [x.update(year=2012) for x in r['molecules'] if x['label'] == 'HO2'])
 			
-			tmp_years[x] = i
+		Returns the new snapshot.
+		'''
 		
-		my_dict[scope.shortname] = tmp_years
+		with self.lock:
 		
+			records = self.get_records()
+			
+			result = edit(records)
+			
+			snapshot, version = self._swap(result if isinstance(result,dict) else records)
+			
+		self._notify(snapshot,version)
+			
+		return snapshot
+			
+	def _swap(self,records):
 	
-	ax = fig.add_subplot(111)
-	
-	#label the axes
-	
-	plt.xlabel('Year')
-	plt.ylabel('Cumulative Number of Detected Molecules')
-	
-	#customize tick marks
+		snapshot = census_from_records(records['molecules'],records['sources'],records['telescopes'],freeze=True)
+		
+		published[id(snapshot.mol_list)] = snapshot
+		
+		#a single assignment, so readers see either the old snapshot or the new one
+		
+		self.current = snapshot
+		self.version += 1
+		
+		return snapshot, self.version
+		
+	def _notify(self,snapshot,version):
 	
-	ax.tick_params(axis='x', which='both', direction='in',length=15,width=1)
-	ax.tick_params(axis='y', which='both', direction='in',length=15,width=1)
+		#subscribers hear about snapshots one at a time and in order; if a newer one was published while they were busy, the older one is skipped
 	
-	ax.yaxis.set_ticks_position('both')
-	ax.xaxis.set_ticks_position('both')		
-	ax.set_xticks([1970,1980,1990,2000,2010,2020])
+		with self.notify_lock:
+		
+			if version <= self.notified:
+			
+				return
+				
+			self.notified = version
+			
+			for x in list(self.subscribers):
+			
+				try:
+				
+					x(snapshot)
+					
+				except Exception as e:
+				
+					print('CensusSnapshots: subscriber {} failed on version {}: {!r}' .format(getattr(x,'__name__',x),version,e),file=sys.stderr)
+					
+		return
+		
+	def subscribe(self,callback):
 	
-	ax.plot(years,my_dict['GBT'],color='#000000')
-	ax.plot(years,my_dict['IRAM'],color='#800000')
-	ax.plot(years,my_dict['NRAO 140-ft'],color='#f032e6')
-	ax.plot(years,my_dict['NRAO/ARO 12-m'],color='dodgerblue')
-	ax.plot(years,my_dict['NRAO 36-ft'],color='#e6194B')
-	ax.plot(years,my_dict['Nobeyama'],color='#469990')
+		'''
+		Calls callback with every snapshot published from now on (though if several are published while it's still busy with one, it only gets the latest of them).  Anything it raises is reported on stderr and otherwise ignored.
+		'''
 	
-	ax.annotate(r'\textbf{GBT}',xy=(date.today().year+1,my_dict['GBT'][-1]),xycoords='data',size=16,color='#000000',va='center',zorder=100)
-	ax.annotate(r'\textbf{IRAM}',xy=(date.today().year+1,my_dict['IRAM'][-1]),xycoords='data',size=16,color='#800000',va='center',zorder=100)
-	ax.annotate(r'\textbf{NRAO 140-ft}',xy=(date.today().year+1,my_dict['NRAO 140-ft'][-1]),xycoords='data',size=16,color='#f032e6',va='top',zorder=100)
-	ax.annotate(r'\textbf{NRAO/ARO 12-m}',xy=(date.today().year+1,my_dict['NRAO/ARO 12-m'][-1]),xycoords='data',size=16,color='dodgerblue',va='center',zorder=100)
-	ax.annotate(r'\textbf{NRAO 36-ft}',xy=(date.today().year+1,my_dict['NRAO 36-ft'][-1]),xycoords='data',size=16,color='#e6194B',va='center',zorder=100)
-	ax.annotate(r'\textbf{Nobeyama}',xy=(date.today().year+1,my_dict['Nobeyama'][-1]),xycoords='data',size=16,color='#469990',va='bottom',zorder=100)
+		with self.lock:
 	
-	ax.set_xlim([1965,date.today().year+19])
+			self.subscribers.append(callback)
+		
+		return
 	
-	ax.set_ylim(0,max([my_dict[x][-1] for x in my_dict])+5)
+environments = ['ice','ppd','exgal','exo']
+
+def detection_state(value):
+
+	'''
+	Encodes one of the ice, ppd, exgal, or exo flags as 2 if it's a confirmed detection (True), 1 if it's tentative ('Tentative'), and 0 if it's not detected (False or None).
+	'''
 	
-	#do linear fits to the data for the ranges we care about for each facility:
+	if value is True:
 	
-	#get some year indicies for years we care about
+		return 2
+		
+	if value == 'Tentative':
 	
-	def iyear(x):
+		return 1
+		
+	return 0
+	
+def parse_sexagesimal(value,hours=False):
+
+	'''
+	Converts a sexagesimal string like '17:47:20.4' or '-28:23:07' to radians, reading it in hours if hours is True and in degrees otherwise.  Returns nan if value is None.
+	'''
 	
-		return np.argwhere(years==x)[0][0]	
+	if value is None:
 	
-	trendGBT = np.polynomial.polynomial.Polynomial.fit(years[iyear(GBT.built):],my_dict['GBT'][iyear(GBT.built):],1).convert().coef[1]
-	ax.annotate('{:.1f}/yr' .format(trendGBT),xy=(2014,7.5),xycoords='data',size=16,color='#000000',ha='center')
-	ax.annotate('{}{: <7}' .format(GBT.built,' - '),xy=(2014,4.5),xycoords='data',size=16,color='#000000',ha='right')
+		return np.nan
+		
+	value = value.strip()
 	
-	trendIRAMold = np.polynomial.polynomial.Polynomial.fit(years[iyear(IRAM30.built):iyear(2006)],my_dict['IRAM'][iyear(IRAM30.built):iyear(2006)],1).convert().coef[1]
-	ax.annotate('{:.1f}/yr' .format(trendIRAMold),xy=(1990,21),xycoords='data',size=16,color='#800000',ha='center')
-	ax.annotate('{} - 2006' .format(IRAM30.built),xy=(1990,18),xycoords='data',size=16,color='#800000',ha='center')
+	sign = -1. if value.startswith('-') else 1.
+	
+	total = 0.
+	
+	for i, x in enumerate(value.lstrip('+-').split(':')):
+	
+		total += float(x)/60**i
+		
+	return math.radians(sign*total*(15. if hours is True else 1.))
+	
+def positions_to_radians(ra,dec):
 
-	trendIRAMnew = np.polynomial.polynomial.Polynomial.fit(years[iyear(2006):],my_dict['IRAM'][iyear(2006):],1).convert().coef[1]
-	ax.annotate('{:.1f}/yr' .format(trendIRAMnew),xy=(2020,45),xycoords='data',size=16,color='#800000',ha='center')
-	ax.annotate('2006{: <7}' .format(' - '),xy=(2020,42),xycoords='data',size=16,color='#800000',ha='right')	
+	'''
+	Returns ra and dec in radians, from either numbers in degrees or sexagesimal strings (ra in hours), or arrays or lists of either.
+	'''
 	
-	trend140 = np.polynomial.polynomial.Polynomial.fit(years[iyear(NRAO140.built):1993],my_dict['NRAO 140-ft'][iyear(NRAO140.built):1993],1).convert().coef[1]
-	ax.annotate('{:.1f}/yr' .format(trend140),xy=(1980,12.5),xycoords='data',size=16,color='#f032e6',ha='center')
-	ax.annotate('{} - 1993' .format(NRAO140.built),xy=(1980,9.5),xycoords='data',size=16,color='#f032e6',ha='center')	
+	if isinstance(ra,str):
 	
-	trend12 = np.polynomial.polynomial.Polynomial.fit(years[iyear(NRAOARO12.built):],my_dict['NRAO/ARO 12-m'][iyear(NRAOARO12.built):],1).convert().coef[1]
-	ax.annotate('{:.1f}/yr' .format(trend12),xy=(2014.8,30.2),xycoords='data',size=16,color='dodgerblue',ha='center')
-	ax.annotate('{}{: <7}' .format(NRAOARO12.built,' - '),xy=(2014.8,27.2),xycoords='data',size=16,color='dodgerblue',ha='right')	
+		return parse_sexagesimal(ra,hours=True), parse_sexagesimal(dec)
+		
+	if np.ndim(ra) > 0 and len(ra) > 0 and isinstance(ra[0],str):
 	
-	trend36 = np.polynomial.polynomial.Polynomial.fit(years[iyear(NRAO36.built):1985],my_dict['NRAO 36-ft'][iyear(NRAO36.built):1985],1).convert().coef[1]
-	ax.annotate('{:.1f}/yr' .format(trend36),xy=(1975,34),xycoords='data',size=16,color='#e6194B',ha='center')
-	ax.annotate('{} - 1985' .format(NRAO36.built),xy=(1975,31),xycoords='data',size=16,color='#e6194B',ha='center')		
+		return np.array([parse_sexagesimal(x,hours=True) for x in ra]), np.array([parse_sexagesimal(x) for x in dec])
+		
+	return np.radians(np.asarray(ra,dtype=float)), np.radians(np.asarray(dec,dtype=float))
 	
-	trendNobeyama = np.polynomial.polynomial.Polynomial.fit(years[iyear(Nobeyama45.built):],my_dict['Nobeyama'][iyear(Nobeyama45.built):],1).convert().coef[1]
-	ax.annotate('{:.1f}/yr' .format(trendNobeyama),xy=(2012,19),xycoords='data',size=16,color='#469990',ha='center')
-	ax.annotate('{}{: <7}' .format(Nobeyama45.built,' - '),xy=(2012,16),xycoords='data',size=16,color='#469990',ha='right')		
+def radec_to_xyz(ra,dec):
+
+	'''
+	Returns the unit vectors for ra and dec (in radians), with x, y, z along the last axis.
+	'''
+	
+	ra = np.asarray(ra)
+	dec = np.asarray(dec)
 	
-	plt.show()
+	return np.stack([np.cos(dec)*np.cos(ra),np.cos(dec)*np.sin(ra),np.sin(dec)],axis=-1)
+
+#############################################################
+#						Functions	 						#
+#############################################################	
+
+#the style every figure is drawn in.  It's only applied while a figure is being drawn (see figure_context), and figures can change any of it for themselves, e.g. the font size.
+
+figure_style = {
+	'text.usetex'			:	True,
+	'text.latex.preamble'	:	r'\usepackage{cmbright}\usepackage[version=4]{mhchem}',
+	'font.family'			:	'sans-serif',
+	'font.sans-serif'		:	['Helvetica'],
+	'font.size'				:	24,
+	'mathtext.fontset'		:	'stixsans',
+	}
+	
+#the style figure_context currently has applied to matplotlib's rc settings, how many figures are being drawn in it, how deeply each thread drawing them has entered it, and the settings it replaced
+
+figure_style_state = {'style' : None, 'count' : 0, 'owners' : {}, 'saved' : None}
+
+figure_style_changed = threading.Condition()
+
+@contextlib.contextmanager
+def figure_context(style=None):
+
+	'''
+	Applies figure_style, with any changes in style (a dictionary of rc settings, e.g. {'font.size' : 14}), to matplotlib's rc settings for the length of a with block, and puts the old settings back afterwards.  matplotlib only has the one set of rc settings, so any number of threads can draw at once in the same style, but a thread that wants a different style waits for them to finish first.  That means no figure is ever drawn with another's settings.  The same style can be nested in one thread, but a different one can't (the thread would be waiting on itself), so that raises a RuntimeError.
+	'''
 	
-	plt.savefig('scopes_by_year.pdf',format='pdf',transparent=True,bbox_inches='tight')					
+	style = dict(figure_style,**style) if style is not None else dict(figure_style)
 	
-	return
+	thread = threading.get_ident()
+	
+	with figure_style_changed:
 	
-def periodic_heatmap(mol_list):
+		if figure_style_state['owners'].get(thread,0) > 0 and figure_style_state['style'] != style:
+		
+			raise RuntimeError('this thread is already drawing a figure in a different style, and would wait on itself forever; finish that figure before starting one in another style')
+	
+		while figure_style_state['count'] > 0 and figure_style_state['style'] != style:
+		
+			figure_style_changed.wait()
+			
+		if figure_style_state['count'] == 0:
+		
+			figure_style_state['saved'] = {x : matplotlib.rcParams[x] for x in style}
+			figure_style_state['style'] = style
+			
+			matplotlib.rcParams.update(style)
+			
+		figure_style_state['count'] += 1
+		figure_style_state['owners'][thread] = figure_style_state['owners'].get(thread,0) + 1
+		
+	try:
+	
+		yield
+		
+	finally:
+	
+		with figure_style_changed:
+		
+			figure_style_state['count'] -= 1
+			figure_style_state['owners'][thread] -= 1
+			
+			if figure_style_state['owners'][thread] == 0:
+			
+				del figure_style_state['owners'][thread]
+			
+			if figure_style_state['count'] == 0:
+			
+				matplotlib.rcParams.update(figure_style_state['saved'])
+				
+				figure_style_state['style'] = None
+				figure_style_state['saved'] = None
+				
+				figure_style_changed.notify_all()
+				
+def drawn_in_style(style=None):
 
+	'''
+	Decorates a figure function so that it runs inside figure_context(style): everything it draws, and everything it writes out, uses figure_style with the changes in style, whatever the global rc settings are.  Some settings are read again whenever a figure is drawn, so a figure should be written out in the same style it was built in, as the figure functions do with export_figure.  For the same reason, a figure opened in a window (show=True) is drawn once before the style comes off; if the window is redrawn later (e.g. resized), it picks up whatever rc settings are current then.
+	'''
+	
+	def decorate(function):
+	
+		@functools.wraps(function)
+		def styled(*args,**kwargs):
+		
+			with figure_context(style):
+			
+				fig = function(*args,**kwargs)
+				
+				#a pyplot window doesn't draw itself until the event loop gets to it, by which time the style would be gone
+				
+				if kwargs.get('show') is True:
+				
+					fig.canvas.draw()
+					
+				return fig
+				
+		return styled
+		
+	return decorate
+	
+def new_figure(name,show=False,**kwargs):
 
 	'''
-	Makes a periodic table heat map
+	Returns a new, empty figure called name, with any keyword arguments (like figsize) passed on to Figure.  Normally it's a standalone Figure that pyplot knows nothing about, so any number of them can be drawn at once, from any thread, and it goes away when nothing refers to it any more.  With show, it's opened in a pyplot window instead, replacing any old window of the same name.
 	'''
+	
+	if show is True:
+	
+		plt.close(name)
+		
+		plt.ion()
+		
+		return plt.figure(num=name,**kwargs)
+		
+	fig = Figure(**kwargs)
+	
+	FigureCanvasAgg(fig)
+	
+	fig.set_label(name)
+	
+	return fig
+	
+def export_figure(fig,filename,formats=None,rasterize=False,dpi=300,nworkers=None,**kwargs):
 
-	#Close an old figure if it exists and initialize a new figure
+	'''
+	Writes out an already-drawn figure in any number of formats, in parallel.  Formats are given as a list of extensions, e.g. ['pdf','svg','png'] (just ['pdf'] if formats is None), and raster formats can ask for several resolutions using '@', e.g. ['png@72','png@300'], which are written to filename_72dpi.png and filename_300dpi.png.  If rasterize is True, the collections (fills, patches, scatter points) in vector outputs are rasterized at dpi to keep the files small.  Any other keyword arguments are passed on to savefig.  Returns a list of the files written.
+	'''
+	
+	if formats is None:
+	
+		formats = ['pdf']
+	
+	if len(formats) == 0:
+	
+		return []
+		
+	#work out the name and resolution of everything we're writing
+		
+	jobs = []
 	
-	plt.close('Periodic Heatmap')
+	for x in formats:
 	
-	fig = plt.figure(num='Periodic Heatmap',figsize=(20,9.5))
+		fmt, at, res = x.partition('@')
+		
+		if fmt == '' or (at == '@' and (res.isdigit() is False or int(res) == 0)):
+		
+			raise ValueError("bad format {}: formats look like 'pdf' or 'png@300' (an extension, optionally followed by @ and a whole number of dpi)" .format(repr(x)))
+		
+		if at == '@':
+		
+			jobs.append(['{}_{}dpi.{}' .format(filename,res,fmt),fmt,int(res)])
+			
+		else:
+		
+			jobs.append(['{}.{}' .format(filename,fmt),fmt,dpi])
+			
+	#find a tight bounding box once up front, so the individual writes don't each have to redo the layout to get it
 	
-	plt.ion()
+	if kwargs.get('bbox_inches') == 'tight':
 	
-	#set some font defaults
+		pad = kwargs.pop('pad_inches',matplotlib.rcParams['savefig.pad_inches'])
 	
-	fontparams = {'size':24, 'family':'sans-serif','sans-serif':['Helvetica']}
+		kwargs['bbox_inches'] = fig.get_tightbbox(fig.canvas.get_renderer()).padded(pad)
+		
+	vector = ['pdf','svg','eps','ps']
 	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')	
+	#the easy case: one file, written straight from the figure we were given
+		
+	if len(jobs) == 1 and rasterize is False:
 	
-	#make a dictionary of detections from the list
+		name, fmt, res = jobs[0]
 	
-	census = {
-		'H': 0,
-		'He': 0,
-		'C': 0,
-		'O': 0,
-		'N': 0,
-		'S': 0,
-		'P': 0,
-		'Si': 0,
-		'Cl': 0,
-		'F': 0,
-		'Mg': 0,
-		'Na': 0,
-		'Al': 0,
-		'K': 0,
-		'Fe': 0,
-		'Ti': 0,
-		'Ar': 0,
-		'V': 0,
-		'Ca': 0,
-		}
+		fig.savefig(name,format=fmt,dpi=res,**kwargs)
 		
-	els = ['H', 'He', 'C', 'O', 'N', 'S', 'P', 'Si', 'Cl', 'F', 'Mg', 'Na', 'Al', 'K', 'Fe', 'Ti', 'Ar', 'V', 'Ca']
+		return [name]
+		
+	#otherwise, each writer gets its own copy of the figure, since savefig temporarily changes the figure dpi and canvas while it works.  The copy is detached from pyplot so that unpickling doesn't register it as a new window.
 	
-	for mol in mol_list:
+	manager = fig.canvas.manager
 	
-		for el in els:
+	fig.canvas.manager = None
+	
+	try:
+	
+		fig_data = pickle.dumps(fig)
+		
+	finally:
+	
+		fig.canvas.manager = manager
+		
+	def write(job):
+	
+		name, fmt, res = job
+	
+		my_fig = pickle.loads(fig_data)
+		
+		if rasterize is True and fmt in vector:
+		
+			for ax in my_fig.axes:
 			
-			if getattr(mol,el) > 0:
+				for artist in ax.collections:
+				
+					artist.set_rasterized(True)
+					
+		my_fig.savefig(name,format=fmt,dpi=res,**kwargs)
 		
-				census[el] += 1
+		return name
+		
+	with ThreadPoolExecutor(max_workers=nworkers) as pool:
+	
+		written = [x for x in pool.map(write,jobs)]
+		
+	return written
+
+def update_plots(list,formats=None,rasterize=False,nworkers=1):
+
+	'''
+	A meta function that, when run, will call every plot command and generate new plots based on the input list using default parameters.  Useful for rapidly re-generating all figures.  Every figure is drawn once and then written out in each of the requested formats (see export_figure), e.g. update_plots(full_list,formats=['pdf','svg','png@150','png@300']).  Up to nworkers figures are drawn at once, on threads.  Returns a dictionary of the figures, keyed by function name.
+	'''
+	
+	with ThreadPoolExecutor(max_workers=nworkers) as pool:
+	
+		jobs = {x : pool.submit(figure_functions[x],list,formats=formats,rasterize=rasterize) for x in figure_functions}
+	
+	return {x : jobs[x].result() for x in jobs}
+
+#the layouts used by summary_list and refs_list, put together once when the module loads rather than every time a record is rendered
+
+mol_summary_layout = '\n'.join([
+	'',
+	'{dashes}',
+	'{name} ({formula})',
+	'{dashes}',
+	'',
+	'Atoms:\t{natoms}',
+	'Mass:\t{mass} amu',
+	'Year Detected:\t{year}',
+	'Source(s):\t{sources}',
+	'Telescope(s) Used:\t{scopes}',
+	'Attributes:\t{attributes}',
+	'',
+	]).format
+	
+source_summary_layout = '\n'.join([
+	'',
+	'{dashes}',
+	'{name}',
+	'{dashes}',
+	'',
+	'RA (J2000):\t{ra}',
+	'DEC (J2000):\t{dec}',
+	'',
+	'Generalized Type:\t{type}',
+	'',
+	'Number of Detections:\t{detects}',
+	'',
+	'Simbad URL:\t{simbad_url}',
+	'',
+	'{mol_dashes}',
+	'Molecules Detected in {name}',
+	'{mol_dashes}',
+	'{mols}',
+	]).format
+	
+mol_attributes = [('neutral','Neutral'),('cation','Cation'),('anion','Anion'),('cyclic','Cyclic'),('radical','Radical')]
+
+mol_other_envs = [('ice','Ices'),('ppd','Protoplanetary Disks'),('exgal','External Galaxies'),('exo','Exoplanetary Atmospheres')]
+
+mol_env_refs = [('ppd','Protoplanetary Disks Reference(s)','ppd_d_ref'),('exgal','External Galaxies Reference(s)','exgal_d_ref'),('exo','Exoplanetary Atmospheres Reference(s)','exo_d_ref')]
+
+def summary_list(y):
+
+	'''
+	Returns the summary of the information in the database for either a molecule or a source as a list of lines, which is what summary prints and output_summary writes out.
+	
+	'''
+	
+	if isinstance(y,Molecule):
+	
+		lines = mol_summary_layout(
+			dashes = '-' * (len(y.name) + len(y.formula) + 3),
+			name = y.name,
+			formula = y.formula,
+			natoms = y.natoms,
+			mass = y.mass,
+			year = y.year,
+			sources = ', '.join([x.name for x in y.sources]),
+			scopes = ', '.join([x.shortname for x in y.telescopes]),
+			attributes = ', '.join([label for attr, label in mol_attributes if getattr(y,attr) == True]),
+			).split('\n')
+		
+		if y.isos != None:
+		
+			lines += ['Known Isotopologues:\t{}' .format(y.isos),'']
+			
+		other_envs = [label if detection_state(getattr(y,attr)) == 2 else '{} (Tentative)' .format(label) for attr, label in mol_other_envs if detection_state(getattr(y,attr)) > 0]
+		
+		if len(other_envs) > 0:
+		
+			lines += ['Also Detected In:\t{}' .format(', '.join(other_envs)),'']
+			
+		if detection_state(y.exgal) > 0:
+		
+			lines += ['Sources of External Galaxy Detections:\t{}' .format(y.exgal_sources),'']
+			
+		if y.ppd_isos != None:
+		
+			lines += ['Isotopologues Also Detected in Protoplanetary Disks:\t{}' .format(y.ppd_isos),'']
+			
+		return lines + refs_list(y)
+		
+	elif isinstance(y,Source):
+	
+		mols = [x.formula for x in y.mols] if y.mols is not None else []
+	
+		return source_summary_layout(
+			dashes = '-' * len(y.name),
+			name = y.name,
+			ra = y.ra,
+			dec = y.dec,
+			type = y.type,
+			detects = y.detects,
+			simbad_url = y.simbad_url,
+			mol_dashes = '-' * len('Molecules Detected in {}' .format(y.name)),
+			mols = ', '.join(mols),
+			).split('\n')
+			
+	return []
+	
+def refs_list(y):
+
+	'''
+	
+	Returns a nicely formatted list of references and notes for a molecule, as a list of lines.
+	
+	'''
+	
+	lines = ['Detection Reference(s)']
+	
+	lines += ['[{}] {}' .format(i+1,x.strip()) for i, x in enumerate((y.d_ref or '').split(';'))]
+	
+	lines += ['','Laboratory Reference(s)']
+	
+	lines += ['[{}] {}' .format(i+1,x.strip()) for i, x in enumerate((y.lab_ref or '').split(';'))]
+	
+	if y.notes != None:
+	
+		lines += ['','Notes',y.notes.strip('*')]
+		
+	if y.isos != None:
+	
+		#isotopologue laboratory references aren't implemented yet
+	
+		lines += ['','Isotopologue Detection Reference(s)']
+		
+		lines += ['[{}] {}' .format(x.formula,x.ref) for x in y.get_isotopologues() if x.environment == 'ism' and x.ref is not None]
+		
+	if detection_state(y.ice) > 0:
+	
+		lines += ['','Ice Reference(s)','[Det] {}' .format(y.ice_d_ref),'[Lab] {}' .format(y.ice_l_ref)]
+		
+	for attr, title, ref in mol_env_refs:
+	
+		if detection_state(getattr(y,attr)) > 0:
+		
+			#lab references to be enabled later if they are cataloged.
+		
+			lines += ['',title,'[{}] {}' .format(y.formula,getattr(y,ref))]
+			
+			if attr == 'ppd' and y.ppd_isos != None:
+			
+				lines += ['[{}] {}' .format(x.formula,x.ref) for x in y.get_isotopologues() if x.environment == 'ppd' and x.ref is not None]
 				
-	maxdets = max([census[x] for x in census])
+	return lines
+
+def summary(y):
+
+	'''
+	Prints a summary of the information in the database for either a molecule or a source to the terminal.  Requires the variable name (usually intuitive, but if not, do a plain text search...).
 	
-	map_colors = list(Color("#f1fb53").range_to(Color("#f00707"),maxdets))
+	'''
+	
+	print('\n'.join(summary_list(y)))
+	
+	return
+	
+def refs(y):
 
-	map_colors = [str(x) for x in map_colors]		
+	'''
 	
-	#Dictionary for the periodic table
+	Prints a nicely formatted list of references and notes for a molecule to the terminal.
 	
-	elements = {
-		'H'		:	[pt.H,1,6.9],
-		'He'	:	[pt.He,18,6.9],
+	'''
+	
+	print('\n'.join(refs_list(y)))
+	
+	return
+		
+def output_summary(y,filename=None):
+
+	'''
+	Writes out an ascii file containing the output of summary(y) for molecule y or a list of molecules y.  A filename can optionally be specified.
+	
+	'''
+
+	#if we're using a default filename and only one molecule has been specified, name the output file that molecules formula
+
+	if filename == None and type(y) != list:
+	
+		filename = y.formula + '.txt'
+		
+	elif filename == None and type(y) == list:
+	
+		filename = 'summary.txt'
+	
+	if type(y) != list:
+	
+		y = [y]
+		
+	with open(filename,'w') as output:
+	
+		for x in y:
+		
+			output.write('\n'.join(summary_list(x)) + '\n')
+			
+	return
+	
+def output_summaries(y,directory='.',nworkers=None):
+
+	'''
+	Writes out a separate ascii file with the output of summary(x) for every molecule or source x in the list y, named after the molecule label or source name, into directory.  The files are rendered and written by a pool of nworkers threads (the default is whatever ThreadPoolExecutor picks).  Returns the list of files written.
+	
+	'''
+	
+	if os.path.isdir(directory) is False:
+	
+		os.makedirs(directory)
+	
+	def write_summary(x):
+	
+		filename = os.path.join(directory,'{}.txt' .format(getattr(x,'label',x.name)).replace(os.sep,'_'))
+		
+		with open(filename,'w') as output:
+		
+			output.write('\n'.join(summary_list(x)) + '\n')
+			
+		return filename
+		
+	with ThreadPoolExecutor(max_workers=nworkers) as executor:
+	
+		files = list(executor.map(write_summary,y,chunksize=256))
+		
+	return files
+
+def mol_to_dict(mol):
+
+	'''
+	Returns a dictionary of everything stored for a molecule, with its sources and telescopes given by name so that it can be written out as JSON.  Internal caches (anything starting with an underscore) are skipped.
+	'''
+	
+	my_dict = {}
+	
+	for x in vars(mol):
+	
+		if x.startswith('_'):
+		
+			continue
+			
+		my_dict[x] = getattr(mol,x)
+		
+	my_dict['sources'] = [x.name for x in mol.sources]
+	my_dict['telescopes'] = [x.shortname for x in mol.telescopes]
+	
+	#the reference strings are also split up the same way refs() prints them
+	
+	my_dict['refs'] = {
+		'detection'		:	[x.strip() for x in mol.d_ref.split(';')] if mol.d_ref is not None else [],
+		'laboratory'	:	[x.strip() for x in mol.lab_ref.split(';')] if mol.lab_ref is not None else [],
+		}
+	
+	return my_dict
+	
+def source_to_dict(source):
+
+	'''
+	Returns a dictionary of everything stored for a source, with its molecules given by label.
+	'''
+	
+	my_dict = {}
+	
+	for x in vars(source):
+	
+		if x.startswith('_'):
+		
+			continue
+			
+		my_dict[x] = getattr(source,x)
+		
+	my_dict['mols'] = [x.label for x in source.mols] if source.mols is not None else []
+	
+	return my_dict
+	
+def scope_to_dict(scope):
+
+	'''
+	Returns a dictionary of everything stored for a telescope, with its molecules given by label.
+	'''
+	
+	my_dict = {}
+	
+	for x in vars(scope):
+	
+		if x.startswith('_'):
+		
+			continue
+			
+		my_dict[x] = getattr(scope,x)
+		
+	my_dict['mol_list'] = [x.label for x in scope.mol_list] if scope.mol_list is not None else []
+	
+	return my_dict
+	
+def query(list,**kwargs):
+
+	'''
+	Returns the molecules in list that match all of the given filters.  Available filters are:
+	
+		label, formula							molecule label or formula (e.g. 'CH3CN')
+		year, syear, eyear						detected in, on/after, on/before a year
+		natoms, min_natoms, max_natoms			number of atoms
+		source, source_type						source name (e.g. 'TMC-1') or generalized type (e.g. 'Dark Cloud')
+		telescope, wavelength					telescope shortname (e.g. 'GBT') or wavelength range (e.g. 'mm')
+		element									an element symbol or list of them, all of which must be present
+		neutral, cation, anion, radical, cyclic, fullerene, pah, ice, ppd, exgal, exo		True or False
+		
+	For example, query(full_list,source='TMC-1',syear=2010,element='N').
+	'''
+	
+	flags = ['neutral','cation','anion','radical','cyclic','fullerene','pah','ice','ppd','exgal','exo']
+	
+	for x in kwargs:
+	
+		if x not in flags and x not in ['label','formula','year','syear','eyear','natoms','min_natoms','max_natoms','source','source_type','telescope','wavelength','element']:
+		
+			raise TypeError('query() got an unexpected filter {}' .format(x))
+			
+	elements = kwargs.get('element',[])
+	
+	if isinstance(elements,str):
+	
+		elements = [elements]
+		
+	els = ['H', 'He', 'C', 'O', 'N', 'S', 'P', 'Si', 'Cl', 'F', 'Mg', 'Na', 'Al', 'K', 'Fe', 'Ti', 'Ar', 'V', 'Ca']
+		
+	for x in elements:
+	
+		if x not in els:
+		
+			raise TypeError('query() got an unknown element {}' .format(x))
+	
+	matches = []
+	
+	for mol in list:
+	
+		if 'label' in kwargs and mol.label != kwargs['label']:
+			continue
+		if 'formula' in kwargs and mol.formula != kwargs['formula']:
+			continue
+		if 'year' in kwargs and mol.year != kwargs['year']:
+			continue
+		if 'syear' in kwargs and mol.year < kwargs['syear']:
+			continue
+		if 'eyear' in kwargs and mol.year > kwargs['eyear']:
+			continue
+		if 'natoms' in kwargs and mol.natoms != kwargs['natoms']:
+			continue
+		if 'min_natoms' in kwargs and mol.natoms < kwargs['min_natoms']:
+			continue
+		if 'max_natoms' in kwargs and mol.natoms > kwargs['max_natoms']:
+			continue
+		if 'source' in kwargs and kwargs['source'] not in [x.name for x in mol.sources]:
+			continue
+		if 'source_type' in kwargs and kwargs['source_type'] not in [x.type for x in mol.sources]:
+			continue
+		if 'telescope' in kwargs and kwargs['telescope'] not in [x.shortname for x in mol.telescopes]:
+			continue
+		if 'wavelength' in kwargs and kwargs['wavelength'] not in mol.wavelengths:
+			continue
+		if any(getattr(mol,x) == 0 for x in elements):
+			continue
+			
+		#the environment flags can be 'Tentative', which counts as detected here
+			
+		if any((detection_state(getattr(mol,x)) > 0) != kwargs[x] for x in flags if x in kwargs):
+			continue
+			
+		matches.append(mol)
+		
+	return matches
+	
+def parse_filters(params):
+
+	'''
+	Turns query filters given as strings, in a dictionary of {filter : [values]} like parse_qs returns, into keyword arguments for query(): numbers become integers, the True/False filters accept 1/0, true/false, or yes/no, and element can be given more than once.  Raises ValueError if a number isn't one.
+	'''
+	
+	ints = ['year','syear','eyear','natoms','min_natoms','max_natoms']
+	flags = ['neutral','cation','anion','radical','cyclic','fullerene','pah','ice','ppd','exgal','exo']
+	
+	kwargs = {}
+	
+	for key, values in params.items():
+	
+		if key == 'element':
+		
+			kwargs[key] = values
+			
+		elif key in ints:
+		
+			try:
+				kwargs[key] = int(values[-1])
+			except ValueError:
+				raise ValueError('{} must be an integer' .format(key))
+		
+		elif key in flags:
+		
+			kwargs[key] = values[-1].lower() in ['1','true','yes']
+			
+		else:
+		
+			kwargs[key] = values[-1]
+			
+	return kwargs
+	
+def figure_data(list):
+
+	'''
+	Returns a dictionary of the aggregate numbers behind the figures (cumulative detections, element counts, facility counts, etc.) for the molecules in list, in a form that can be written out as JSON.
+	'''
+	
+	els = ['H', 'He', 'C', 'O', 'N', 'S', 'P', 'Si', 'Cl', 'F', 'Mg', 'Na', 'Al', 'K', 'Fe', 'Ti', 'Ar', 'V', 'Ca']
+	
+	my_dict = {}
+	
+	#cumulative detections by year
+	
+	years = np.arange(min([x.year for x in list]),date.today().year+1)
+	
+	dets = np.cumsum(np.bincount([x.year - years[0] for x in list],minlength=len(years)))
+	
+	my_dict['cumulative_detections'] = {'years' : years.tolist(), 'detections' : dets.tolist()}
+	
+	#detections by element, number of atoms, wavelength, facility, source type, and molecule type
+	
+	my_dict['elements'] = {el : len([x for x in list if getattr(x,el) > 0]) for el in els}
+	
+	natoms = {}
+	waves = {}
+	scopes = {}
+	source_types = {}
+	
+	for mol in list:
+	
+		natoms[mol.natoms] = natoms.get(mol.natoms,0) + 1
+		
+		for x in mol.wavelengths:
+		
+			waves[x] = waves.get(x,0) + 1
+			
+		for x in mol.telescopes:
+		
+			scopes[x.shortname] = scopes.get(x.shortname,0) + 1
+			
+		#only credit each source type once per molecule
+			
+		for x in set([y.type for y in mol.sources]):
+		
+			source_types[x] = source_types.get(x,0) + 1
+	
+	my_dict['natoms'] = {str(x) : natoms[x] for x in sorted(natoms)}
+	my_dict['wavelengths'] = waves
+	my_dict['facilities'] = scopes
+	my_dict['source_types'] = source_types
+	my_dict['types'] = {x.capitalize() : len([y for y in list if getattr(y,x) is True]) for x in ['neutral','radical','cation','cyclic','anion','fullerene','pah']}
+	
+	return my_dict
+	
+@drawn_in_style()
+def cumu_det_plot(list,syear=None,eyear=None,formats=None,rasterize=False,show=False,ci=None):
+
+	'''
+	Makes a plot of the cumulative detections by year using 'list', which is usually 'full_list'.  The start year and end year are defined by default to be the earliest year in the list and the current year, but these are overridable.  If ci is given (e.g. 95), the detection rates are followed by their ci% confidence intervals, from bootstrap_rates.
+	
+	'''
+	
+	#initialize a new figure
+	
+	fig = new_figure('Cumulative Detections',show=show,figsize=(10,8))
+	
+	#get the starting and ending years, if they aren't set by the user
+	
+	if syear is None:
+	
+		#grab the earliest year in the list of molecules
+	
+		syear = min([x.year for x in list])
+		
+	if eyear is None:
+	
+		#grab the current year
+	
+		eyear = date.today().year
+		
+	#make the x-axis array of years
+	
+	years = np.arange(syear,eyear+1)
+		
+	#get the cumulative detections out of the detection cube
+	
+	cube = get_census(list).get_cube()
+	
+	dets = cube.cumulative(years)
+		
+	#get some year indicies for years we care about
+	
+	def iyear(x):
+	
+		return np.argwhere(years==x)[0][0]
+
+	
+	#do linear fits to the data for the two ranges we care about (1968-Present, 2005-Present)
+	#get the slope of the fit to detections since 1968 and since 2005
+	
+	trend1968 = cube.rate(1968,eyear)
+	trend2005 = cube.rate(2005,eyear)
+	
+	rate_str = ['{:.1f}' .format(x) for x in [trend1968,trend2005]]
+	
+	if ci is not None:
+	
+		#a fixed seed, so the same census always gets the same intervals
+	
+		trends, low, high = bootstrap_rates(list,[1968,2005],eyear,ci=ci,seed=0)
+		
+		rate_str = ['{:.1f} [{:.1f}, {:.1f}]' .format(*x) for x in zip(trends,low,high)]
+
+	#load up an axis
+	
+	ax = fig.add_subplot(111)
+	
+	#label the axes
+	
+	ax.set_xlabel('Year')
+	ax.set_ylabel('Cumulative Number of Detected Molecules')
+	
+	#customize tick marks
+	
+	ax.tick_params(axis='x', which='both', direction='in',length=15,width=1)
+	ax.tick_params(axis='y', which='both', direction='in',length=15,width=1)
+	
+	ax.yaxis.set_ticks_position('both')
+	ax.xaxis.set_ticks_position('both')
+	
+	#plot it
+	
+	ax.plot(years,dets,color='dodgerblue',linewidth=4)
+	
+	#add annotations
+	
+	#first, the detections per year
+	
+	args = {'ha' : 'left','size' : '24'}
+	
+	det_str = '\\noindent Since 1968: {} detections/year \\\\ Since 2005: {} detections/year' .format(*rate_str)
+	
+	ax.annotate(det_str, xy=(0.05,0.85),xycoords='axes fraction',**args)
+	
+	#Now the total number of detections
+		
+	ax.annotate('Total: {}' .format(dets[iyear(eyear)]),xy=(eyear-2,dets[iyear(eyear)]),xycoords='data',va='center',ha='right',size=16)
+	
+	#Now the facilities
+	
+	args = {'size' : '16'}
+	
+	arrowprops = {'arrowstyle' : '-|>', 'connectionstyle' : 'arc3', 'facecolor' : 'black'}
+	
+	ax.annotate('NRAO 36-foot (1968)',xy=(1968,dets[iyear(1968)]+4),xycoords='data',xytext=(0,35),textcoords='offset points',rotation=90,arrowprops=arrowprops,va='bottom',ha='center',**args)
+	ax.annotate('',xy=(1982,dets[iyear(1982)]-4),xycoords='data',xytext=(0,-35),textcoords='offset points',rotation=0,arrowprops=arrowprops,va='bottom',ha='left',**args)
+	ax.annotate('Nobeyama (1982)',xy=(1982,dets[iyear(1982)]-31),xycoords='data',**args)
+	ax.annotate('IRAM (1984)',xy=(1984,dets[iyear(1984)]+4),xycoords='data',xytext=(0,35),textcoords='offset points',rotation=90,arrowprops=arrowprops,va='bottom',ha='center',**args)
+	ax.annotate('GBT (2001)',xy=(2001,dets[iyear(2001)]+4),xycoords='data',xytext=(0,35),textcoords='offset points',rotation=90,arrowprops=arrowprops,va='bottom',ha='center',**args)
+	ax.annotate('ALMA (2011)',xy=(2011,dets[iyear(2011)]-4),xycoords='data',xytext=(0,-35),textcoords='offset points',rotation=90,arrowprops=arrowprops,va='top',ha='center',**args)
+		
+	#show the plot
+	
+	if show is True:
+	
+		plt.show()
+	
+	#write out the figure
+	
+	export_figure(fig,'cumulative_detections',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight')
+	
+	return fig
+	
+@drawn_in_style()
+def cumu_det_natoms_plot(list,syear=None,eyear=None,formats=None,rasterize=False,show=False):
+
+	'''
+	Makes a plot of the cumulative detections (sorted by atoms) by year using 'list', which is usually 'full_list'.  The start year and end year are defined by default to be the earliest year in the list and the current year + 20 (to give room for labels), but these are overridable. 
+	
+	'''
+
+	#initialize a new figure
+	
+	fig = new_figure('Cumulative Detections By Atoms',show=show,figsize=(10,8))
+	
+	#get the starting and ending years, if they aren't set by the user
+	
+	if syear is None:
+	
+		#grab the earliest year in the list of molecules
+	
+		syear = min([x.year for x in list])
+		
+	if eyear is None:
+	
+		#grab the current year
+	
+		eyear = date.today().year
+		
+	#make the x-axis array of years
+	
+	years = np.arange(syear,eyear+1)
+	
+	#now we make a dictionary of the different traces we're gonna want, loop through the list, and populate an array of detections for that number of atoms or special case
+	
+	dets_dict = {}
+	
+	cube = get_census(list).get_cube()
+	
+	#cumulative detections for every number of atoms at once, padded out in case nothing in the list is as big as 13 atoms
+	
+	natoms_dets = cube.cumulative(years,keep=['natoms'])
+	
+	natoms_dets = np.pad(natoms_dets,((0,0),(0,max(0,14-natoms_dets.shape[1]))))
+	
+	for natoms in range(2,14):
+	
+		dets_dict[natoms] = natoms_dets[:,natoms]
+		
+	#do the fullerenes and pahs
+	
+	dets_dict['fullerenes'] = cube.cumulative(years,kind='fullerene')
+		
+	dets_dict['pahs'] = cube.cumulative(years,kind='pah')
+		
+	#load up an axis
+	
+	ax = fig.add_subplot(111)
+	
+	#label the axes
+	
+	ax.set_xlabel('Year')
+	ax.set_ylabel('Cumulative Number of Detected Molecules')
+	
+	#customize tick marks
+	
+	ax.tick_params(axis='x', which='both', direction='in',length=15,width=1)
+	ax.tick_params(axis='y', which='both', direction='in',length=15,width=1)
+	
+	ax.yaxis.set_ticks_position('both')
+	ax.xaxis.set_ticks_position('both')		
+	ax.set_xticks([1940,1960, 1980,2000,2020])
+	
+	ax.set_xlim([syear,eyear+35])
+	
+	#plot the traces
+	
+	ax.plot(years,dets_dict[2],color='#000000')
+	ax.plot(years,dets_dict[3],color='#800000')
+	ax.plot(years,dets_dict[4],color='#f032e6')
+	ax.plot(years,dets_dict[5],color='#9A6324')
+	ax.plot(years,dets_dict[6],color='dodgerblue')
+	ax.plot(years,dets_dict[7],color='#e6194B')
+	ax.plot(years,dets_dict[8],color='#469990')
+	ax.plot(years,dets_dict[9],color='#f58231')
+	ax.plot(years,dets_dict[10],color='#42d4f4')
+	ax.plot(years,dets_dict[11],color='#ffe119')
+	ax.plot(years,dets_dict[12],color='#3cb44b')
+	ax.plot(years,dets_dict[13],color='#e6beff')
+	ax.plot(years,dets_dict['fullerenes'],color='#000075')
+	ax.plot(years,dets_dict['pahs'],color='#aaffc3')
+	
+	#add the annotations	
+	
+	ax.annotate(r'\textbf{2 atoms}',xy=(eyear+2,dets_dict[2][-1]),xycoords='data',size=16,color='#000000',va='top')
+	ax.annotate(r'\textbf{3 atoms}',xy=(eyear+2,dets_dict[3][-1]),xycoords='data',size=16,color='#800000',va='bottom')
+	ax.annotate(r'\textbf{4 atoms}',xy=(eyear+2,dets_dict[4][-1]),xycoords='data',size=16,color='#f032e6',va='center')
+	ax.annotate(r'\textbf{5 atoms}',xy=(eyear+2,dets_dict[5][-1]),xycoords='data',size=16,color='#9A6324',va='center')
+	ax.annotate(r'\textbf{6 atoms}',xy=(eyear+2,dets_dict[6][-1]),xycoords='data',size=16,color='dodgerblue',va='center')
+	ax.annotate(r'\textbf{7 atoms}',xy=(eyear+2,dets_dict[7][-1]),xycoords='data',size=16,color='#e6194B',va='center')
+	ax.annotate(r'\textbf{8 atoms}',xy=(eyear+2,dets_dict[8][-1]),xycoords='data',size=16,color='#469990',va='bottom')
+	ax.annotate(r'\textbf{9 atoms}',xy=(eyear+2,dets_dict[9][-1]),xycoords='data',size=16,color='#f58231',va='center')
+	ax.annotate(r'\textbf{10 \&}',xy=(eyear+2,dets_dict[10][-1]),xycoords='data',size=16,color='#42d4f4',va='bottom')
+	ax.annotate(r'\textbf{11 atoms}',xy=(eyear+11,dets_dict[11][-1]),xycoords='data',size=16,color='#ffe119',va='bottom')
+	ax.annotate(r'\textbf{12 atoms}',xy=(eyear+2,dets_dict[12][-1]),xycoords='data',size=16,color='#3cb44b',va='center')
+	ax.annotate(r'\textbf{13 atoms \& }',xy=(eyear+2,dets_dict[13][-1]),xytext=(eyear+2,dets_dict[13][-1]-0.5),xycoords='data',size=16,color='#e6beff',va='center')	
+	arrowprops = {'arrowstyle' : '-|>', 'connectionstyle' : 'arc3', 'facecolor' : '#000075'}
+	ax.annotate(r'\textbf{Fullerenes}',xy=(eyear+2,dets_dict['fullerenes'][-1]),xycoords='data',xytext=(eyear+17,dets_dict['fullerenes'][-1]),textcoords='data',arrowprops=arrowprops,size=16,color='#000075',va='center')
+	ax.annotate(r'\textbf{PAHs}',xy=(eyear+22,dets_dict['pahs'][-1]-0.5),xycoords='data',size=16,color='#aaffc3',va='center')
+
+	#show the plot
+	
+	if show is True:
+	
+		plt.show()
+	
+	#write out the figure
+	
+	export_figure(fig,'cumulative_by_atoms',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight')
+	
+	return fig
+
+def change_color(color, amount=1.0):
+    """
+    Lightens the given color by multiplying (1-luminosity) by the given amount.
+    Input can be matplotlib color string, hex string, or RGB tuple.
+
+    Examples:
+    >> lighten_color('g', 0.3)
+    >> lighten_color('#F034A3', 0.6)
+    >> lighten_color((.3,.55,.1), 0.5)
+    """
+    import matplotlib.colors as mc
+    import colorsys
+    try:
+        c = mc.cnames[color]
+    except:
+        c = color
+    c = colorsys.rgb_to_hls(*mc.to_rgb(c))
+    return colorsys.hls_to_rgb(c[0], 1 - amount * (1 - c[1]), c[2])		
+	
+@drawn_in_style()
+def det_per_year_per_atom(list,formats=None,rasterize=False,show=False):
+
+	'''
+	Makes a plot of the average number of detections per year (y) for a molecule with (x) atoms, starting in the year they were first detected.  Has the ability to plot PAHs and fullerenes, but doesn't.
+	'''
+
+	#initialize a new figure
+	
+	fig = new_figure('Detects Per Year Per Atom',show=show,figsize=(10,8))
+	
+	#We're going to cheat later on and lump PAHs and Fullerenes together, but these need fake natoms.  They'll always be +2 and +4, respectively, beyond the maximum of 'normal' molecules, and we'll leave +1 blank for visual separation.  For now, though, time to make a list and loop through our molecules.
+	
+	natoms = np.arange(2,18)
+	
+	#and an array of the average number of detections
+	
+	avg_dets = np.copy(natoms)*0.0
+	n_dets = np.copy(natoms)*0.0
+	
+	#get the detections per year for each number of atoms, and for the PAHs and fullerenes, out of the detection cube
+	
+	cube = get_census(list).get_cube()
+	
+	by_natoms = cube.counts(['natoms','year'])
+	
+	by_natoms = np.pad(by_natoms,((0,max(0,14-by_natoms.shape[0])),(0,0)))
+	
+	by_kind = cube.counts(['kind','year'])
+	
+	#get the years that are being spanned
+	
+	eyear = cube.syear + np.nonzero(by_kind.sum(axis=0))[0][-1]
+	
+	for x in range(len(natoms)):
+	
+		if natoms[x] < 14:
+		
+			per_year = by_natoms[natoms[x]]
+			
+		elif natoms[x] == 15:
+		
+			per_year = by_kind[cube.lookup['kind']['pah']]
+					
+		elif natoms[x] == 17:
+		
+			per_year = by_kind[cube.lookup['kind']['fullerene']]
+			
+		else:
+		
+			per_year = by_kind[0]*0
+			
+		i = per_year.sum()
+		
+		years = cube.syear + np.nonzero(per_year)[0]
+							
+		if i == 0:
+			
+			avg_dets[x] = np.nan
+			
+		else:
+			
+			avg_dets[x] = i/(eyear-min(years)+1)
+			n_dets[x] = i
+			
+	n_dets[n_dets == 0] = np.nan		
+		
+	#load up an axis
+	
+	ax = fig.add_subplot(111)
+	
+	#label the axes
+	
+	ax.set_xlabel('Number of Atoms')
+	ax.set_ylabel('Detections/Year*')
+	
+	#customize tick marks
+	
+	ax.tick_params(axis='x', which='both', direction='in',length=15,width=1)
+	ax.tick_params(axis='y', which='both', direction='in',length=15,width=1)
+	
+	ax.yaxis.set_ticks_position('both')
+	ax.xaxis.set_ticks_position('both')		
+	ax.set_xticks([2,4,6,8,10,12,15,17])
+	ax.set_xticklabels(['2','4','6','8','10','12','PAHs','Fullerenes'])
+	
+	ax.set_xlim([1,12.8])
+	ax.set_ylim([0,1.])
+	
+	#plot the data
+	
+	marker = 'o'		
+	mfc = 'dodgerblue'
+	mec = change_color(mfc,1.5)	
+	
+	sizes = np.copy(n_dets) * 200/np.nanmin(n_dets)
+	
+# 	sizes = [x*200/np.amin(n_dets) for x in sizes if x > 0]
+# 	
+# 	ddd
+	
+	ax.scatter(natoms,avg_dets,marker='o',c=mfc,edgecolors=mec,s=sizes)
+	
+	#add some annotations
+	
+	ax.annotate('*Since year of first detection',xy=(0.35,0.9),xycoords='axes fraction',ha='left')
+	ax.annotate('\\noindent Marker size proportional to\\\\ total \# of detections',xy=(0.05,0.1),xycoords='axes fraction',ha='left')
+	
+	for label in ax.get_xmajorticklabels():
+	
+		if label._text == 'Fullerenes' or label._text == 'PAHs':
+		
+			label.set_rotation(-45)
+			
+	fig.tight_layout()		
+
+	#show the plot
+	
+	if show is True:
+	
+		plt.show()
+	
+	#write out the figure
+	
+	export_figure(fig,'rate_by_atoms',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight')
+
+	return fig
+	
+@drawn_in_style({'font.size' : 14})
+def facility_shares(scopes_list,mols_list,formats=None,rasterize=False,show=False):
+
+	'''
+	Generates a plot of the percentage share of yearly detections that a facility contributed over its operational lifetime for the top 9 facilities
+	'''
+
+	#initialize a new figure
+	
+	fig = new_figure('Facility Shares',show=show)
+	axs = fig.subplots(3,3)
+
+	#we need to generate the data now, which we'll store in a dictionary for each telescope.  Each entry will be [syear,eyear,ndetects,ntotal,shortname] for the start year, end year, number of detections, and total number of detections over those years
+	
+	cube = get_census(mols_list).get_cube()
+	
+	facility_dets = cube.counts(['facility'])
+	
+	detects = np.array([facility_dets[cube.lookup['facility'][x.shortname]] if x.shortname in cube.lookup['facility'] else 0 for x in scopes_list])
+	
+	#the years each one was built and decommissioned (or this year if it's still in operation), and the total number of detections in that time, all at once
+	
+	lifetimes = FacilityIndex(scopes_list)
+	
+	syears = lifetimes.starts
+	eyears = lifetimes.ends
+	
+	ntotals = cube.window(syears,eyears)
+	
+	#pick out the top 9 without sorting the whole list
+	
+	top = np.argpartition(-detects,min(9,len(detects))-1)[:9]
+	
+	min_allowed = detects[top].min()
+	
+	my_dict = {}
+	
+	for x in np.nonzero(detects >= min_allowed)[0]:
+	
+		scope = scopes_list[x]
+		
+		my_dict[scope.shortname] = [syears[x],eyears[x],detects[x],ntotals[x],scope.shortname]
+		
+	my_list = [my_dict[x] for x in my_dict]	
+	
+	my_list.sort(key = lambda x: x[2]/x[3],reverse=True)
+	
+# 	for x in my_list:
+# 		print(x, x[2]/x[3])
+
+	#load some axes
+	
+	idx = 0
+	
+	for i in range(3):
+		
+		for j in range(3)[::-1]:
+		
+			fracs = [my_list[idx][2]/my_list[idx][3],1.-my_list[idx][2]/my_list[idx][3]]
+			
+			label = '\\textbf' + '{' +'{}' .format(int(my_list[idx][2]/my_list[idx][3] * 100)) +'\%'
+			
+			if my_list[idx][1] == date.today().year:
+			
+				color = 'dodgerblue'
+				
+			else:
+			
+				color = '#F87070'
+		
+
+
+			if idx > 5:
+			
+				slices, labels = axs[i,j].pie(fracs, colors=[color,'#F5F6FF'], wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black'})
+			
+				axs[i,j].annotate(my_list[idx][-1],xy=(0.5,1.08),xycoords='axes fraction',ha='center',size=12)
+				axs[i,j].annotate('{} - {}' .format(my_list[idx][0],my_list[idx][1]),xy=(0.5,.95),xycoords='axes fraction',ha='center',size=10)
+			
+				kw = dict(arrowprops=dict(arrowstyle="-"), zorder=0, va="center")
+				ang = (slices[0].theta2 - slices[0].theta1)/2. + slices[0].theta1
+				y = np.sin(np.deg2rad(ang))
+				x = np.cos(np.deg2rad(ang))
+				horizontalalignment = {-1: "right", 1: "left"}[int(np.sign(x))]
+				connectionstyle = "angle,angleA=0,angleB={}".format(ang)
+				kw["arrowprops"].update({"connectionstyle": connectionstyle})
+				axs[i,j].annotate(label, xy=(x, y), xytext=(1.1*np.sign(x), y),
+					horizontalalignment=horizontalalignment, size=10, **kw)
+					
+			else:
+			
+				my_labels = ['\\textbf' + '{' +'{}' .format(int(my_list[idx][2]/my_list[idx][3] * 100)) +'\%','']
+			
+				slices, labels = axs[i,j].pie(fracs, labels=my_labels, colors=[color,'#F5F6FF'], wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black'}, labeldistance=0.7)
+			
+				axs[i,j].annotate(my_list[idx][-1],xy=(0.5,1.08),xycoords='axes fraction',ha='center',size=12)
+				axs[i,j].annotate('{} - {}' .format(my_list[idx][0],my_list[idx][1]),xy=(0.5,.95),xycoords='axes fraction',ha='center',size=10)
+				
+				for label in labels:
+				
+					label.set_horizontalalignment('center')
+					label.set_color('white')
+					label.set_fontsize(10)
+				
+			
+			#draw a line around the outside of the pie
+						
+			# get the center and radius of the pie wedges			
+			center = slices[0].center
+			r = slices[0].r
+			
+			# create a new circle with the desired properties
+			circle = patches.Circle(center, r, fill=False, edgecolor="black", linewidth=1)
+			# add the circle to the axes
+			axs[i,j].add_patch(circle)
+			
+			idx += 1
+
+	fig.tight_layout()
+	
+	fig.subplots_adjust(wspace=-.5, hspace=.15)
+	
+	if show is True:
+	
+		plt.show()
+	
+	export_figure(fig,'facility_shares',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight')
+
+	return fig
+	
+@drawn_in_style()
+def cumu_det_facility(list,formats=None,rasterize=False,show=False,ci=None):
+
+	'''
+	Makes a plot of the cumulative number of detections of a facility with time.  If ci is given (e.g. 95), the detection rates are followed by their ci% confidence intervals, from bootstrap_rates.
+	'''
+
+	#initialize a new figure
+	
+	fig = new_figure('Detections Per Facility Over Time',show=show,figsize=(10,8))
+	
+	#We're only going to do facilities with 10 or more total detections.  Right now that's the GBT, IRAM, NRAO 140-ft, NRAO/ARO 12-m, NRAO 36ft, and Nobeyama.
+	
+	#set this thing up to kick off a few years before 1968 and run until today
+	
+	years = np.arange(1965,date.today().year+1)
+	
+	scopes = [GBT,IRAM30,NRAO140,NRAOARO12,NRAO36,Nobeyama45]
+	
+	my_dict = {}
+	
+	cube = get_census(list).get_cube()
+	
+	for scope in scopes:
+		
+		my_dict[scope.shortname] = np.cumsum(cube.per_year(years,facility=scope.shortname))
+		
+	
+	ax = fig.add_subplot(111)
+	
+	#label the axes
+	
+	ax.set_xlabel('Year')
+	ax.set_ylabel('Cumulative Number of Detected Molecules')
+	
+	#customize tick marks
+	
+	ax.tick_params(axis='x', which='both', direction='in',length=15,width=1)
+	ax.tick_params(axis='y', which='both', direction='in',length=15,width=1)
+	
+	ax.yaxis.set_ticks_position('both')
+	ax.xaxis.set_ticks_position('both')		
+	ax.set_xticks([1970,1980,1990,2000,2010,2020])
+	
+	ax.plot(years,my_dict['GBT'],color='#000000')
+	ax.plot(years,my_dict['IRAM'],color='#800000')
+	ax.plot(years,my_dict['NRAO 140-ft'],color='#f032e6')
+	ax.plot(years,my_dict['NRAO/ARO 12-m'],color='dodgerblue')
+	ax.plot(years,my_dict['NRAO 36-ft'],color='#e6194B')
+	ax.plot(years,my_dict['Nobeyama'],color='#469990')
+	
+	ax.annotate(r'\textbf{GBT}',xy=(date.today().year+1,my_dict['GBT'][-1]),xycoords='data',size=16,color='#000000',va='center',zorder=100)
+	ax.annotate(r'\textbf{IRAM}',xy=(date.today().year+1,my_dict['IRAM'][-1]),xycoords='data',size=16,color='#800000',va='center',zorder=100)
+	ax.annotate(r'\textbf{NRAO 140-ft}',xy=(date.today().year+1,my_dict['NRAO 140-ft'][-1]),xycoords='data',size=16,color='#f032e6',va='top',zorder=100)
+	ax.annotate(r'\textbf{NRAO/ARO 12-m}',xy=(date.today().year+1,my_dict['NRAO/ARO 12-m'][-1]),xycoords='data',size=16,color='dodgerblue',va='center',zorder=100)
+	ax.annotate(r'\textbf{NRAO 36-ft}',xy=(date.today().year+1,my_dict['NRAO 36-ft'][-1]),xycoords='data',size=16,color='#e6194B',va='center',zorder=100)
+	ax.annotate(r'\textbf{Nobeyama}',xy=(date.today().year+1,my_dict['Nobeyama'][-1]),xycoords='data',size=16,color='#469990',va='bottom',zorder=100)
+	
+	ax.set_xlim([1965,date.today().year+19])
+	
+	ax.set_ylim(0,max([my_dict[x][-1] for x in my_dict])+5)
+	
+	#do linear fits to the data for the ranges we care about for each facility:
+	
+	def rate_str(syear,eyear,scope):
+	
+		#the rate for a facility as it's labeled, with its confidence interval if there is one
+	
+		if ci is None:
+		
+			return '{:.1f}/yr' .format(cube.rate(syear,eyear,facility=scope.shortname))
+			
+		return '{:.1f}/yr [{:.1f}, {:.1f}]' .format(*bootstrap_rates(list,syear,eyear,ci=ci,seed=0,facility=scope.shortname))
+	
+	trendGBT = rate_str(GBT.built,years[-1],GBT)
+	ax.annotate(trendGBT,xy=(2014,7.5),xycoords='data',size=16,color='#000000',ha='center')
+	ax.annotate('{}{: <7}' .format(GBT.built,' - '),xy=(2014,4.5),xycoords='data',size=16,color='#000000',ha='right')
+	
+	trendIRAMold = rate_str(IRAM30.built,2005,IRAM30)
+	ax.annotate(trendIRAMold,xy=(1990,21),xycoords='data',size=16,color='#800000',ha='center')
+	ax.annotate('{} - 2006' .format(IRAM30.built),xy=(1990,18),xycoords='data',size=16,color='#800000',ha='center')
+
+	trendIRAMnew = rate_str(2006,years[-1],IRAM30)
+	ax.annotate(trendIRAMnew,xy=(2020,45),xycoords='data',size=16,color='#800000',ha='center')
+	ax.annotate('2006{: <7}' .format(' - '),xy=(2020,42),xycoords='data',size=16,color='#800000',ha='right')	
+	
+	trend140 = rate_str(NRAO140.built,1993,NRAO140)
+	ax.annotate(trend140,xy=(1980,12.5),xycoords='data',size=16,color='#f032e6',ha='center')
+	ax.annotate('{} - 1993' .format(NRAO140.built),xy=(1980,9.5),xycoords='data',size=16,color='#f032e6',ha='center')	
+	
+	trend12 = rate_str(NRAOARO12.built,years[-1],NRAOARO12)
+	ax.annotate(trend12,xy=(2014.8,30.2),xycoords='data',size=16,color='dodgerblue',ha='center')
+	ax.annotate('{}{: <7}' .format(NRAOARO12.built,' - '),xy=(2014.8,27.2),xycoords='data',size=16,color='dodgerblue',ha='right')	
+	
+	trend36 = rate_str(NRAO36.built,1985,NRAO36)
+	ax.annotate(trend36,xy=(1975,34),xycoords='data',size=16,color='#e6194B',ha='center')
+	ax.annotate('{} - 1985' .format(NRAO36.built),xy=(1975,31),xycoords='data',size=16,color='#e6194B',ha='center')		
+	
+	trendNobeyama = rate_str(Nobeyama45.built,years[-1],Nobeyama45)
+	ax.annotate(trendNobeyama,xy=(2012,19),xycoords='data',size=16,color='#469990',ha='center')
+	ax.annotate('{}{: <7}' .format(Nobeyama45.built,' - '),xy=(2012,16),xycoords='data',size=16,color='#469990',ha='right')		
+	
+	if show is True:
+	
+		plt.show()
+	
+	export_figure(fig,'scopes_by_year',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight')
+	
+	return fig
+	
+@drawn_in_style()
+def periodic_heatmap(mol_list,formats=None,rasterize=False,show=False):
+
+
+	'''
+	Makes a periodic table heat map
+	'''
+
+	#initialize a new figure
+	
+	fig = new_figure('Periodic Heatmap',show=show,figsize=(20,9.5))
+	
+	#make a dictionary of detections from the list
+	
+	census = {
+		'H': 0,
+		'He': 0,
+		'C': 0,
+		'O': 0,
+		'N': 0,
+		'S': 0,
+		'P': 0,
+		'Si': 0,
+		'Cl': 0,
+		'F': 0,
+		'Mg': 0,
+		'Na': 0,
+		'Al': 0,
+		'K': 0,
+		'Fe': 0,
+		'Ti': 0,
+		'Ar': 0,
+		'V': 0,
+		'Ca': 0,
+		}
+		
+	els = ['H', 'He', 'C', 'O', 'N', 'S', 'P', 'Si', 'Cl', 'F', 'Mg', 'Na', 'Al', 'K', 'Fe', 'Ti', 'Ar', 'V', 'Ca']
+	
+	for mol in mol_list:
+	
+		for el in els:
+			
+			if getattr(mol,el) > 0:
+		
+				census[el] += 1
+				
+	maxdets = max([census[x] for x in census])
+	
+	map_colors = list(Color("#f1fb53").range_to(Color("#f00707"),maxdets))
+
+	map_colors = [str(x) for x in map_colors]		
+	
+	#Dictionary for the periodic table
+	
+	elements = {
+		'H'		:	[pt.H,1,6.9],
+		'He'	:	[pt.He,18,6.9],
 		'Li'	:	[pt.Li,1,5.75],
 		'Be'	:	[pt.Be,2,5.75],
 		'B'		:	[pt.B,13,5.75],
@@ -2425,1497 +4477,3447 @@ def periodic_heatmap(mol_list):
 		'Og'	:	[pt.Og,18,0.],
 		}
 	
-	#load up an axis
+	#load up an axis
+	
+	ax = fig.add_axes([0,0,1,1])
+	
+	ax.set_xlim([0,18])
+	ax.set_ylim([0,8])
+	ax.set_aspect('equal',adjustable='box')
+	ax.axis('off')
+	
+	#lock in the final data limits now, so we know how many points there are per data unit when we lay out the text below
+	
+	ax.apply_aspect()
+	
+	pts_per_unit = (ax.transData.transform((1,0))[0] - ax.transData.transform((0,0))[0]) * 72./fig.dpi
+	
+	#gather up all the cells and all the text, rather than adding ~600 separate artists to the axis
+	
+	rects = []
+	rect_colors = []
+	texts = []
+	
+	for el in elements:
+		
+		x = elements[el][1]-1
+		y = elements[el][2]
+		
+		sym = elements[el][0].symbol
+		num = elements[el][0].number
+		mass = elements[el][0].mass
+		name = elements[el][0].name.capitalize()
+		
+		this_color = 'white'
+			
+		if el in census:
+		
+			this_color = map_colors[census[el]-1]
+			
+			texts.append([str(census[el]),x+0.8,y+.95,14,'right','bold'])
+			
+		rects.append(patches.Rectangle((x,y),0.9,1.05))
+		rect_colors.append(this_color)
+		
+		texts.append([str(num),x+0.1,y+.95,14,'left','normal'])
+		texts.append([sym,x+0.1,y+.70,20,'left','bold'])
+		texts.append([str(mass),x+0.1,y+.42,8,'left','normal'])
+		texts.append([name,x+0.1,y+.29,8,'left','normal'])
+		
+	#all of the cells go in as a single collection
+		
+	cells = PatchCollection(rects,facecolors=rect_colors,edgecolors='black',linewidths=1,alpha=0.5)
+	ax.add_collection(cells)
+	
+	#the text gets converted to glyph outlines in data coordinates and goes in as a single collection too.  This skips the LaTeX run that usetex would otherwise do for every one of these strings.
+	
+	props = {
+		'normal'	:	FontProperties(family='sans-serif',weight='normal'),
+		'bold'		:	FontProperties(family='sans-serif',weight='bold'),
+		}
+	
+	text_paths = []
+	
+	for text in texts:
+	
+		s, x, y, size, ha, weight = text
+	
+		tp = TextPath((0,0),s,size=size/pts_per_unit,prop=props[weight])
+		
+		#anchor the top of the glyphs at y, and either the left or right edge at x.  The control points bound the glyphs closely enough for this, and are much cheaper than exact extents.
+		
+		vmin = tp.vertices.min(axis=0)
+		vmax = tp.vertices.max(axis=0)
+		
+		dx = x - vmin[0] if ha == 'left' else x - vmax[0]
+		dy = y - vmax[1]
+		
+		text_paths.append(Path(tp.vertices + [dx,dy],tp.codes))
+		
+	labels = PathCollection(text_paths,facecolors='black',edgecolors='none')
+	ax.add_collection(labels)
+	
+	if show is True:
+	
+		plt.show()
+	
+	#crop to the edges of the table in-process (half a linewidth of padding keeps the cell borders intact), rather than shelling out to pdfcrop afterwards
+	
+	xmin = min([x.get_x() for x in rects])
+	xmax = max([x.get_x() + x.get_width() for x in rects])
+	ymin = min([x.get_y() for x in rects])
+	ymax = max([x.get_y() + x.get_height() for x in rects])
+	
+	crop = Bbox(ax.transData.transform([[xmin,ymin],[xmax,ymax]])/fig.dpi).padded(0.5/72.)
+	
+	#write out the figure
+	
+	export_figure(fig,'periodic_heatmap',formats=formats,rasterize=rasterize,transparent=True,bbox_inches=crop)
+	
+	return fig
+	
+@drawn_in_style()
+def mass_by_wavelength(list,formats=None,rasterize=False,show=False):
+
+	'''
+	Makes a KDE plot of detections at each wavelength vs mass
+	'''
+	
+	#gather the data
+	
+	my_dict = {
+	
+		'UV'	: [],
+		'Vis'	: [],
+		'IR'	: [],
+		'sub-mm': [],
+		'mm'	: [],
+		'cm'	: [],
+		'UV-Vis': [],
+		
+	}
+	
+	for x in list:
+	
+		for y in my_dict:
+		
+			if y in x.wavelengths:
+			
+				my_dict[y].append(x.mass)
+				
+	for x in my_dict['UV']:
+	
+		my_dict['UV-Vis'].append(x)
+		
+	for x in my_dict['Vis']:
+	
+		my_dict['UV-Vis'].append(x)
+	
+	fig = new_figure('Detections at Wavelengths by Mass',show=show,figsize=(10,8))
+
+	#load up an axis
+	
+	ax = fig.add_subplot(111)
+
+	ax.tick_params(axis='x', which='both', direction='in',length=5,width=1)
+	ax.tick_params(axis='y', which='both', direction='in',length=5,width=1)	
+
+	#label the axes
+	
+	ax.set_xlabel('Atomic Mass (amu)')
+	ax.set_ylabel('Kernel Density Estimate')
+	
+	#Do the estimates and plot them
+	
+	xvals = np.arange(0,160)
+	
+	density_cm = gkde(my_dict['cm'])
+	density_cm.covariance_factor = lambda : .5
+	density_cm._compute_covariance()
+	
+	density_mm = gkde(my_dict['mm'])
+	density_mm.covariance_factor = lambda : .5
+	density_mm._compute_covariance()
+	
+	density_submm = gkde(my_dict['sub-mm'])
+	density_submm.covariance_factor = lambda : .5
+	density_submm._compute_covariance()	
+	
+	density_IR = gkde(my_dict['IR'])
+	density_IR.covariance_factor = lambda : .5
+	density_IR._compute_covariance()	
+	
+	density_UV = gkde(my_dict['UV-Vis'])
+	density_UV.covariance_factor = lambda : .5
+	density_UV._compute_covariance()	
+	
+	ax.plot(xvals,density_cm(xvals),color='dodgerblue')
+	ax.fill_between(xvals,density_cm(xvals),0,facecolor='dodgerblue',alpha=0.25,zorder=4)
+	ax.annotate('{}' .format(len(my_dict['cm'])), xy=(75,0.01),xycoords='data',ha='left',va='bottom',color='dodgerblue')	
+	
+	max_mm = max([x for x in my_dict['mm'] if x < 160])
+	ax.plot(xvals[:max_mm+1],density_mm(xvals[:max_mm+1]),color='darkorange')
+	ax.fill_between(xvals[:max_mm+1],density_mm(xvals[:max_mm+1]),0,facecolor='darkorange',alpha=0.25)
+	ax.annotate('{}' .format(len(my_dict['mm'])), xy=(53.5,0.022),xycoords='data',ha='left',va='bottom',color='darkorange')
+	
+	ax.plot(xvals,density_submm(xvals),color='forestgreen')
+	ax.fill_between(xvals,density_submm(xvals),0,facecolor='forestgreen',alpha=0.25)
+	ax.annotate('{}' .format(len(my_dict['sub-mm'])), xy=(40,0.038),xycoords='data',ha='left',va='bottom',color='forestgreen')
+	
+	max_IR = max([x for x in my_dict['IR'] if x < 160])
+	ax.plot(xvals[:max_IR+1],density_IR(xvals[:max_IR+1]),color='black')
+	ax.fill_between(xvals[:max_IR+1],density_IR(xvals[:max_IR+1]),0,facecolor='black',alpha=0.25,zorder=5)
+	ax.annotate('{}' .format(len(my_dict['IR'])), xy=(68,0.0025),xycoords='data',ha='left',va='bottom',color='black')		
+	
+	max_UV = max(my_dict['UV-Vis'])
+	ax.plot(xvals[:max_UV+1],density_UV(xvals[:max_UV+1]),color='violet')
+	ax.fill_between(xvals[:max_UV+1],density_UV(xvals[:max_UV+1]),0,facecolor='violet',alpha=0.25)
+	ax.annotate('{}' .format(len(my_dict['UV-Vis'])), xy=(16.5,0.057),xycoords='data',ha='left',va='bottom',color='violet')
+	
+	ax.annotate(r'\underline{Detection Wavelengths}',xy=(158,0.06),xycoords='data',color='black',ha='right',va='top')
+	ax.annotate('centimeter',xy=(158,0.056),xycoords='data',color='dodgerblue',ha='right',va='top')
+	ax.annotate('millimeter',xy=(158,0.052),xycoords='data',color='darkorange',ha='right',va='top')
+	ax.annotate('sub-millimeter',xy=(158,0.048),xycoords='data',color='forestgreen',ha='right',va='top')
+	ax.annotate('infrared',xy=(158,0.044),xycoords='data',color='black',ha='right',va='top')
+	ax.annotate('visible/ultraviolet',xy=(158,0.04),xycoords='data',color='violet',ha='right',va='top')		
+	
+	if show is True:
+	
+		plt.show()
+	
+	export_figure(fig,'mass_by_wavelengths_kde',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight',pad_inches=0)
+	
+	return fig
+
+@drawn_in_style({'font.size' : 18})
+def mols_waves_by_atoms(list,formats=None,rasterize=False,show=False):
+
+	'''
+	Makes six histogram plots of molecules detected in each wavelength range by number of atoms, excepting fullerenes
+	'''
+
+	#initialize a new figure
+	
+	fig = new_figure('Molecules Detected in Each Wavelength by Number of Atoms',show=show,figsize=(10,8))
+	
+	#gather the data
+	
+	my_dict = {
+	
+		'UV'	: [],
+		'Vis'	: [],
+		'IR'	: [],
+		'sub-mm': [],
+		'mm'	: [],
+		'cm'	: [],	
+		
+	}
+	
+	#the number of molecules with each number of atoms in each wavelength range comes straight out of the detection cube; the histograms and kdes want the individual values back, though
+	
+	cube = get_census(list).get_cube()
+	
+	waves = cube.counts(['wavelength','natoms'],kind=['molecule','pah'])
+	
+	natoms = np.arange(waves.shape[1])
+	
+	for y in my_dict:
+	
+		if y in cube.lookup['wavelength']:
+		
+			my_dict[y] = np.repeat(natoms,waves[cube.lookup['wavelength'][y]])
+					
+	max_n = max([max(my_dict[y]) for y in my_dict if len(my_dict[y]) > 0])
+				
+	ax1 = fig.add_subplot(231)
+	ax2 = fig.add_subplot(232)
+	ax3 = fig.add_subplot(233)
+	ax4 = fig.add_subplot(234)
+	ax5 = fig.add_subplot(235)
+	ax6 = fig.add_subplot(236)
+	
+	n_bins = max_n
+	
+	xvals = np.arange(0,max_n+1,0.5)
+	
+	ax1.tick_params(axis='x', which='both', direction='in',length=5,width=1)
+	ax1.tick_params(axis='y', which='both', direction='in',length=5,width=1)
+	ax2.tick_params(axis='x', which='both', direction='in',length=5,width=1)
+	ax2.tick_params(axis='y', which='both', direction='in',length=5,width=1)
+	ax3.tick_params(axis='x', which='both', direction='in',length=5,width=1)
+	ax3.tick_params(axis='y', which='both', direction='in',length=5,width=1)
+	ax4.tick_params(axis='x', which='both', direction='in',length=5,width=1)
+	ax4.tick_params(axis='y', which='both', direction='in',length=5,width=1)
+	ax5.tick_params(axis='x', which='both', direction='in',length=5,width=1)
+	ax5.tick_params(axis='y', which='both', direction='in',length=5,width=1)
+	ax6.tick_params(axis='x', which='both', direction='in',length=5,width=1)
+	ax6.tick_params(axis='y', which='both', direction='in',length=5,width=1)					
+		
+	density_cm = gkde(my_dict['cm'])
+	density_cm.covariance_factor = lambda : .5
+	density_cm._compute_covariance()
+	ax1.plot(xvals,density_cm(xvals))	
+	ax1.fill_between(xvals,density_cm(xvals),0,facecolor='dodgerblue',alpha=0.25)
+	ax1.annotate('cm',xy=(0.95,0.96),xycoords='axes fraction',ha='right',va='top',size=24)
+	ax1.set_ylim([0,0.65])
+	ax1.set_xticks([0,5,10,15,20])	
+	ax1.set_xticklabels([])
+	ax1.set_ylabel('Kernel Density Estimate')
+
+	density_mm = gkde(my_dict['mm'])
+	density_mm.covariance_factor = lambda : .5
+	density_mm._compute_covariance()
+	ax2.plot(xvals,density_mm(xvals))
+	ax2.fill_between(xvals,density_mm(xvals),0,facecolor='dodgerblue',alpha=0.25)
+	ax2.annotate('mm',xy=(0.95,0.96),xycoords='axes fraction',ha='right',va='top',size=24)
+	ax2.set_ylim([0,0.65])
+	ax2.set_xticks([0,5,10,15,20])
+	ax2.set_xticklabels([])
+
+	density_submm = gkde(my_dict['sub-mm'])
+	density_submm.covariance_factor = lambda : .5
+	density_submm._compute_covariance()
+	ax3.plot(xvals,density_submm(xvals))
+	ax3.fill_between(xvals,density_submm(xvals),0,facecolor='dodgerblue',alpha=0.25)
+	ax3.annotate('sub-mm',xy=(0.95,0.96),xycoords='axes fraction',ha='right',va='top',size=24)
+	ax3.set_ylim([0,0.65])
+	ax3.set_xticks([0,5,10,15,20])
+	ax3.set_xticklabels([])
+
+	density_IR = gkde(my_dict['IR'])
+	density_IR.covariance_factor = lambda : .5
+	density_IR._compute_covariance()
+	ax4.plot(xvals,density_IR(xvals))
+	ax4.fill_between(xvals,density_IR(xvals),0,facecolor='dodgerblue',alpha=0.25)
+	ax4.annotate('IR',xy=(0.95,0.96),xycoords='axes fraction',ha='right',va='top',size=24)
+	ax4.set_ylim([0,0.65])
+	ax4.set_xticks([0,5,10,15,20])
+	ax4.set_xlabel('\# of Atoms')
+	ax4.set_ylabel('Kernel Density Estimate')
+
+	
+	ax5.hist(my_dict['Vis'],bins=[.5,1.5,2.5,3.5,4.5])
+	ax5.annotate('Vis',xy=(0.95,0.96),xycoords='axes fraction',ha='right',va='top',size=24)
+	ax5.set_xlim([0,20])
+	ax5.set_ylim([0,8])	
+	ax5.set_xticks([0,5,10,15,20])
+	ax5.set_xticklabels([])
+	ax5.set_ylabel('\# of Detected Molecules')
+	
+	ax6.hist(my_dict['UV'],bins=[.5,1.5,2.5,3.5,4.5])
+	ax6.annotate('UV',xy=(0.95,0.96),xycoords='axes fraction',ha='right',va='top',size=24)
+	ax6.set_xlim([0,20])
+	ax6.set_ylim([0,8])	
+	ax6.set_xticks([0,5,10,15,20])
+	ax6.set_xticklabels([])
+	
+	fig.tight_layout()
+	
+	if show is True:
+	
+		plt.show()
+	
+	export_figure(fig,'mols_waves_by_atoms',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight',pad_inches=0)
+
+	return fig
+	
+@drawn_in_style()
+def du_histogram(list,formats=None,rasterize=False,show=False):
+
+	'''
+	Makes a histogram of the degree of unsaturation of molecules containing only H, O, N, C, Cl, or F.
+	'''
+
+	#initialize a new figure
+	
+	fig = new_figure('Degree of Unsaturation Histogram',show=show,figsize=(10,8))
+	
+	#gather the data
+	
+	dus = []
+	
+	for x in list:
+	
+		if (x.H + x.O + x.N + x.C + x.Cl + x.F + x.S) == x.natoms and x.du is not None and x.fullerene is not True:
+		
+			dus.append(x.du)
+			
+	#set up a plot
+	
+	ax = fig.add_subplot(111)
+	
+	ax.tick_params(axis='x', which='both', direction='in',length=5,width=1)
+	ax.tick_params(axis='y', which='both', direction='in',length=5,width=1)
+	
+	ax.yaxis.set_ticks_position('both')
+	ax.xaxis.set_ticks_position('both')
+	
+	ax.set_xlabel('Degree of Unsaturation')
+	ax.set_ylabel('\# of Detected Molecules')
+	
+	bins = np.arange(-0.25,12.5,0.5)	
+	(n,bins,patches) = ax.hist(dus,bins=bins,facecolor='dodgerblue',alpha=0.25)
+	ax.hist(dus,bins=bins,edgecolor='royalblue',linewidth=1.5,fill=False)
+	
+	ax.annotate(r'\ce{CH4}, \ce{CH3OH}, \ce{CH3Cl}, \ce{CH3NH2}, ...',xy=(0,n[0]+1),xycoords='data',rotation=90,size=16,ha='center',va='bottom')		
+	ax.annotate(r'\ce{HC11N}',xy=(12,n[12*2]+1),xycoords='data',rotation=90,size=16,ha='center',va='bottom')		
+	
+	fig.tight_layout()
+	if show is True:
+	
+		plt.show()
+	
+	export_figure(fig,'du_histogram',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight')
+
+	return fig
+	
+@drawn_in_style()
+def type_pie_chart(my_list,formats=None,rasterize=False,show=False):
+
+	'''
+	Makes a pie chart of the fraction of interstellar molecules that are neutral, radical, cation, cyclic, pahs, fullerenes, or anions
+	'''
+
+	#initialize a new figure
+	
+	fig = new_figure('Type Pie Chart',show=show,figsize=(10,8))
+	
+	#gather the data
+
+	my_dict = {
+	
+		'Neutral' 	: 	[0],
+		'Radical'	:	[0],
+		'Cation'	:	[0],
+		'Cyclic'	:	[0],
+		'Anion'		:	[0],
+		'Fullerene'	:	[0],
+		'PAH'		:	[0],
+		
+		}
+		
+	for mol in my_list:
+	
+		if mol.neutral is True:
+		
+			my_dict['Neutral'][0] += 1 
+			
+		if mol.radical is True:
+		
+			my_dict['Radical'][0] += 1 
+			
+		if mol.cation is True:
+		
+			my_dict['Cation'][0] += 1 
+			
+		if mol.cyclic is True:
+		
+			my_dict['Cyclic'][0] += 1
+			
+		if mol.anion is True:
+		
+			my_dict['Anion'][0] += 1
+			
+		if mol.fullerene is True:
+		
+			my_dict['Fullerene'][0] += 1
+			
+		if mol.pah is True:
+		
+			my_dict['PAH'][0] += 1		
+	
+	nmols = len(my_list)
+	
+	for type in my_dict:
+	
+		my_dict[type].append(my_dict[type][0]/nmols)		
+		
+	labels = ['Neutral','Radical','Cation','Cyclic','Anion','Fullerene','PAH']
+	
+	fracs = [my_dict[x][1] for x in labels]			
+
+	#set up a plot
+	
+	ax = fig.add_subplot(111)
+	
+	size = 0.1
+	
+	def getshift(x):
+	
+		return -(90-(360 - 360*x)/2)
+		
+	def getper(x):
+	
+		return '{}' .format(int(100*x)) + r'\%'
+	
+	ax.pie([fracs[0],1.-fracs[0]],  colors=['dodgerblue','#EEEEEE'], radius=1, startangle=getshift(fracs[0]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+	ax.pie([fracs[1],1.-fracs[1]],  colors=['darkorange','#EEEEEE'], radius=1-size-.02, startangle=getshift(fracs[1]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+	ax.pie([fracs[2],1.-fracs[2]],  colors=['forestgreen','#EEEEEE'], radius=1-2*size-.04, startangle=getshift(fracs[2]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+	ax.pie([fracs[3],1.-fracs[3]],  colors=['violet','#EEEEEE'], radius=1-3*size-.06, startangle=getshift(fracs[3]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+	ax.pie([fracs[4],1.-fracs[4]],  colors=['red','#EEEEEE'], radius=1-4*size-.08, startangle=getshift(fracs[4]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+	ax.pie([fracs[5],1.-fracs[5]],  colors=['goldenrod','#EEEEEE'], radius=1-5*size-.1, startangle=getshift(fracs[5]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+	ax.pie([fracs[6],1.-fracs[6]],  colors=['royalblue','#EEEEEE'], radius=1-6*size-.12, startangle=getshift(fracs[6]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+
+	ax.annotate(r'\textbf{Neutrals}',xy=(0.5,0.11),xycoords='axes fraction',color='dodgerblue', ha='center',size=14)
+	ax.annotate(r'\textbf{Radicals}',xy=(0.5,0.16),xycoords='axes fraction',color='darkorange', ha='center',size=14)
+	ax.annotate(r'\textbf{Cations}',xy=(0.5,0.205),xycoords='axes fraction',color='forestgreen', ha='center',size=14)
+	ax.annotate(r'\textbf{Cyclics}',xy=(0.5,0.255),xycoords='axes fraction',color='violet', ha='center',size=14)
+	ax.annotate(r'\textbf{Anions}',xy=(0.5,0.305),xycoords='axes fraction',color='red', ha='center',size=14)
+	ax.annotate(r'\textbf{Fullerenes}',xy=(0.5,0.3575),xycoords='axes fraction',color='goldenrod', ha='center',size=14)
+	ax.annotate(r'\textbf{PAHs}',xy=(0.5,0.40),xycoords='axes fraction',color='royalblue', ha='center',size=14)
+	
+	percents = ['\\textbf{' + '{:.1f}' .format((x*100)) + '}\%'  for x in fracs]
+	
+	ax.annotate(percents[0],xy=(0.775,0.775),xycoords='axes fraction',color='white', ha='center',size=12,rotation=-45)
+	ax.annotate(percents[1],xy=(0.74,0.74),xycoords='axes fraction',color='darkorange', ha='center',size=12,rotation=-45)
+	ax.annotate(percents[2],xy=(0.705,0.705),xycoords='axes fraction',color='forestgreen', ha='center',size=12,rotation=-45)
+	ax.annotate(percents[3],xy=(0.67,0.67),xycoords='axes fraction',color='violet', ha='center',size=12,rotation=-45)
+	ax.annotate(percents[4],xy=(0.635,0.635),xycoords='axes fraction',color='red', ha='center',size=12,rotation=-45)
+	ax.annotate(percents[5],xy=(0.6,0.6),xycoords='axes fraction',color='goldenrod', ha='center',size=12,rotation=-45)
+	ax.annotate(percents[6],xy=(0.5675,0.5675),xycoords='axes fraction',color='royalblue', ha='center',size=12,rotation=-45)
+	
+	
+	fig.tight_layout()
+	if show is True:
+	
+		plt.show()
+	
+	export_figure(fig,'type_pie_chart',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight',pad_inches=-.65)
+
+	return fig
+
+@drawn_in_style()
+def source_pie_chart(my_list,formats=None,rasterize=False,show=False):
+
+	'''
+	Makes a pie chart of the fraction of interstellar molecules detected in carbon stars, dark clouds, los clouds, star forming regions, and other types of sources
+	'''
+
+	#initialize a new figure
+	
+	fig = new_figure('Source Pie Chart',show=show,figsize=(10,8))
+	
+	#gather the data
+
+	my_dict = {
+	
+		'Carbon Star' 	: 	[0],
+		'Dark Cloud'	:	[0],
+		'LOS Cloud'	:	[0],
+		'SFR'	:	[0],
+		'Other'		:	[0],		
+		}
+		
+	#we have to be a little careful here, because for a given source, there can be two SFRs listed, and we only want to credit it once
+		
+	for mol in my_list:
+	
+		#we'll make a dictionary here to flag if we've credited things already
+		
+		credit_dict = {
+	
+			'Carbon Star' 	: 	False,
+			'Dark Cloud'	:	False,
+			'LOS Cloud'	:	False,
+			'SFR'	:	False,
+			'Other'		:	False,		
+			}		
+	
+		for source in mol.sources:
+		
+			if source.type in my_dict:
+			
+				if credit_dict[source.type] is False:
+			
+					my_dict[source.type][0] += 1
+					
+					credit_dict[source.type] = True
+				
+			else:
+			
+				if credit_dict['Other'] is False:
+			
+					my_dict['Other'][0] += 1	
+					
+					credit_dict['Other'] = True
+	
+	nmols = len(my_list)
+	
+	for type in my_dict:
+	
+		my_dict[type].append(my_dict[type][0]/nmols)		
+		
+	labels = ['SFR','Carbon Star','Dark Cloud','Other','LOS Cloud']
+	
+	fracs = [my_dict[x][1] for x in labels]			
+
+	#set up a plot
+	
+	ax = fig.add_subplot(111)
+	
+	size = 0.1
+	
+	def getshift(x):
+	
+		return -(90-(360 - 360*x)/2)
+		
+	def getper(x):
+	
+		return '{}' .format(int(100*x)) + r'\%'
+	
+	ax.pie([fracs[0],1.-fracs[0]],  colors=['dodgerblue','#EEEEEE'], radius=1, startangle=getshift(fracs[0]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+	ax.pie([fracs[1],1.-fracs[1]],  colors=['darkorange','#EEEEEE'], radius=1-size-.02, startangle=getshift(fracs[1]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+	ax.pie([fracs[2],1.-fracs[2]],  colors=['forestgreen','#EEEEEE'], radius=1-2*size-.04, startangle=getshift(fracs[2]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+	ax.pie([fracs[3],1.-fracs[3]],  colors=['violet','#EEEEEE'], radius=1-3*size-.06, startangle=getshift(fracs[3]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+	ax.pie([fracs[4],1.-fracs[4]],  colors=['red','#EEEEEE'], radius=1-4*size-.08, startangle=getshift(fracs[4]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+
+	ax.annotate(r'\textbf{SFR}',xy=(0.5,0.11),xycoords='axes fraction',color='dodgerblue', ha='center',size=14)
+	ax.annotate(r'\textbf{Carbon Star}',xy=(0.5,0.16),xycoords='axes fraction',color='darkorange', ha='center',size=14)
+	ax.annotate(r'\textbf{Dark Cloud}',xy=(0.5,0.205),xycoords='axes fraction',color='forestgreen', ha='center',size=14)
+	ax.annotate(r'\textbf{Other}',xy=(0.5,0.255),xycoords='axes fraction',color='violet', ha='center',size=14)
+	ax.annotate(r'\textbf{LOS Cloud}',xy=(0.5,0.305),xycoords='axes fraction',color='red', ha='center',size=14)
+	
+	percents = ['\\textbf{' + '{:.1f}' .format((x*100)) + '}\%'  for x in fracs]
+	
+	ax.annotate(percents[4],xy=(0.51,0.68),xycoords='axes fraction',color='white', ha='center',size=12,)
+	ax.annotate(percents[3],xy=(0.51,0.725),xycoords='axes fraction',color='white', ha='center',size=12,)
+	ax.annotate(percents[2],xy=(0.51,0.775),xycoords='axes fraction',color='white', ha='center',size=12,)
+	ax.annotate(percents[1],xy=(0.51,0.825),xycoords='axes fraction',color='white', ha='center',size=12,)
+	ax.annotate(percents[0],xy=(0.51,0.87),xycoords='axes fraction',color='white', ha='center',size=12,)
+	
+	
+	fig.tight_layout()
+	if show is True:
+	
+		plt.show()
+	
+	export_figure(fig,'source_pie_chart',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight',pad_inches=-.65)
+
+	return fig
+	
+@drawn_in_style()
+def indiv_source_pie_chart(my_list,formats=None,rasterize=False,show=False):
+
+	'''
+	Makes a pie chart of the fraction of interstellar molecules detected in IRC+10216, TMC-1, Orion, and Sgr
+	'''
+
+	#initialize a new figure
+	
+	fig = new_figure('Individual Source Pie Chart',show=show,figsize=(10,8))
+	
+	#gather the data
+
+	my_dict = {
+	
+		'IRC+10216' 	: 	[0],
+		'TMC-1'	:	[0],
+		'Orion'	:	[0],
+		'Sgr B2'	:	[0],
+		'Other'		:	[0],		
+		}
+		
+	for mol in my_list:
+	
+		for source in mol.sources:
+		
+			other = False
+		
+			if source == IRC10216:
+				my_dict['IRC+10216'][0] += 1
+				other=True
+			if source == TMC1:
+				my_dict['TMC-1'][0] += 1
+				other=True
+			if source == Orion:
+				my_dict['Orion'][0] += 1
+				other=True
+			if source == SgrB2:
+				my_dict['Sgr B2'][0] += 1
+				other=True
+			if other is False:
+				my_dict['Other'][0] += 1		
+								
+	nmols = len(my_list)
+	
+	for type in my_dict:
+	
+		my_dict[type].append(my_dict[type][0]/nmols)		
+		
+	labels = ['Other','Sgr B2','IRC+10216','TMC-1','Orion']
+	
+	fracs = [my_dict[x][1] for x in labels]			
+	
+	print(my_dict)
+
+	#set up a plot
+	
+	ax = fig.add_subplot(111)
+	
+	size = 0.1
+	
+	def getshift(x):
+	
+		return -(90-(360 - 360*x)/2)
+		
+	def getper(x):
+	
+		return '{}' .format(int(100*x)) + r'\%'
+	
+	ax.pie([fracs[0],1.-fracs[0]],  colors=['dodgerblue','#EEEEEE'], radius=1, startangle=getshift(fracs[0]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+	ax.pie([fracs[1],1.-fracs[1]],  colors=['darkorange','#EEEEEE'], radius=1-size-.02, startangle=getshift(fracs[1]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+	ax.pie([fracs[2],1.-fracs[2]],  colors=['forestgreen','#EEEEEE'], radius=1-2*size-.04, startangle=getshift(fracs[2]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+	ax.pie([fracs[3],1.-fracs[3]],  colors=['violet','#EEEEEE'], radius=1-3*size-.06, startangle=getshift(fracs[3]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+	ax.pie([fracs[4],1.-fracs[4]],  colors=['red','#EEEEEE'], radius=1-4*size-.08, startangle=getshift(fracs[4]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+
+	ax.annotate(r'\textbf{Other}',xy=(0.5,0.11),xycoords='axes fraction',color='dodgerblue', ha='center',size=14)
+	ax.annotate(r'\textbf{Sgr B2}',xy=(0.5,0.16),xycoords='axes fraction',color='darkorange', ha='center',size=14)
+	ax.annotate(r'\textbf{IRC+10216}',xy=(0.5,0.205),xycoords='axes fraction',color='forestgreen', ha='center',size=14)
+	ax.annotate(r'\textbf{TMC-1}',xy=(0.5,0.255),xycoords='axes fraction',color='violet', ha='center',size=14)
+	ax.annotate(r'\textbf{Orion}',xy=(0.5,0.305),xycoords='axes fraction',color='red', ha='center',size=14)
+	
+	percents = ['\\textbf{' + '{:.1f}' .format((x*100)) + '}\%'  for x in fracs]
+	
+	ax.annotate(percents[4],xy=(0.51,0.68),xycoords='axes fraction',color='white', ha='center',size=12,)
+	ax.annotate(percents[3],xy=(0.51,0.725),xycoords='axes fraction',color='white', ha='center',size=12,)
+	ax.annotate(percents[2],xy=(0.51,0.775),xycoords='axes fraction',color='white', ha='center',size=12,)
+	ax.annotate(percents[1],xy=(0.51,0.825),xycoords='axes fraction',color='white', ha='center',size=12,)
+	ax.annotate(percents[0],xy=(0.51,0.87),xycoords='axes fraction',color='white', ha='center',size=12,)
+	
+	
+	fig.tight_layout()
+	if show is True:
+	
+		plt.show()
+	
+	export_figure(fig,'indiv_source_pie_chart',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight',pad_inches=-.65)
+
+	return fig
+
+@drawn_in_style({'font.size' : 26})
+def mol_type_by_source_type(my_list,formats=None,rasterize=False,show=False):
+
+	'''
+	Generates four pie charts, one for each generalized source type, with the wedges for the types of molecules detected first in each type
+	'''
+	#initialize a new figure
+	
+	fig = new_figure('Molecule Type by Source Type',show=show,figsize=(15,12))
+	axs = fig.subplots(2,2)
+
+	#collect the data
+	
+	type_dict = {
+	
+		'Carbon Star' 	: 	{'Anion': 0, 'Cation': 0, 'Cyclic': 0, 'Neutral': 0, 'Radical': 0},
+		'Dark Cloud'	:	{'Anion': 0, 'Cation': 0, 'Cyclic': 0, 'Neutral': 0, 'Radical': 0},
+		'LOS Cloud'	:	{'Anion': 0, 'Cation': 0, 'Cyclic': 0, 'Neutral': 0, 'Radical': 0},
+		'SFR'	:	{'Anion': 0, 'Cation': 0, 'Cyclic': 0, 'Neutral': 0, 'Radical': 0},
+		
+		}
+	
+	for mol in my_list:
+	
+		#we'll make a dictionary here to flag if we've credited things already
+		
+		credit_dict = {
+	
+			'Carbon Star' 	: 	False,
+			'Dark Cloud'	:	False,
+			'LOS Cloud'	:	False,
+			'SFR'	:	False,
+			
+			}		
+	
+		for source in mol.sources:
+		
+			if source.type in type_dict:
+			
+				if credit_dict[source.type] is False:
+				
+					if mol.anion is True:
+					
+						type_dict[source.type]['Anion'] += 1
+						
+					if mol.cation is True:
+					
+						type_dict[source.type]['Cation'] += 1
+
+					if mol.cyclic is True:
+					
+						type_dict[source.type]['Cyclic'] += 1	
+						
+					if mol.neutral is True:
+					
+						type_dict[source.type]['Neutral'] += 1
+						
+					if mol.radical is True:
+					
+						type_dict[source.type]['Radical'] += 1																
+
+					credit_dict[source.type] = True
+					
+	#make the pie charts
+	
+	#Carbon Stars
+	
+	carbon_data = [
+	
+		type_dict['Carbon Star']['Anion'], 
+		#type_dict['Carbon Star']['Cation'],
+		type_dict['Carbon Star']['Cyclic'], 
+		type_dict['Carbon Star']['Neutral'], 
+		type_dict['Carbon Star']['Radical'],
+		
+		]
+		
+	carbon_colors = [
+	
+		'darkorange',
+		#'forestgreen',
+		'violet',
+		'dodgerblue',
+		'red',
+	
+		]		
+		
+	#Dark Clouds
+	
+	dark_data = [
+	
+		type_dict['Dark Cloud']['Anion'], 
+		type_dict['Dark Cloud']['Cation'], 
+		type_dict['Dark Cloud']['Cyclic'], 
+		type_dict['Dark Cloud']['Neutral'], 
+		type_dict['Dark Cloud']['Radical'],
+		
+		]
+		
+	dark_colors = [
+	
+		'darkorange',
+		'forestgreen',
+		'violet',
+		'dodgerblue',
+		'red',
+	
+		]		
+		
+	#LOS Clouds
+	
+	los_data = [
+	
+		#type_dict['LOS Cloud']['Anion'], 
+		type_dict['LOS Cloud']['Cation'], 
+		#type_dict['LOS Cloud']['Cyclic'], 
+		type_dict['LOS Cloud']['Neutral'], 
+		type_dict['LOS Cloud']['Radical'],
+		
+		]
+		
+	los_colors = [
+	
+		#'darkorange',
+		'forestgreen',
+		#'violet',
+		'dodgerblue',
+		'red',
+	
+		]		
+		
+	#SFRs
+	
+	sfr_data = [
+	
+		#type_dict['SFR']['Anion'], 
+		type_dict['SFR']['Cation'], 
+		type_dict['SFR']['Cyclic'], 
+		type_dict['SFR']['Neutral'], 
+		type_dict['SFR']['Radical'],
+		
+		]		
+						
+	sfr_colors = [
+	
+		#'darkorange',
+		'forestgreen',
+		'violet',
+		'dodgerblue',
+		'red',
+	
+		]
+	
+	types = [
+	
+		'Anion',
+		'Cation',
+		'Cyclic',
+		'Neutral',
+		'Radical',
+	
+		]		
+	
+	axs[0,0].pie(carbon_data,labels=carbon_data,colors=carbon_colors, labeldistance=0.8, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})	
+	axs[0,0].annotate(r'\textbf{Carbon Stars}',xy=(0.5,1.0),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
+	
+	wedges, texts = axs[0,1].pie(dark_data,labels=dark_data,colors=dark_colors, labeldistance=0.8, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})	
+	axs[0,1].annotate(r'\textbf{Dark Clouds}',xy=(0.5,1.0),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
+
+	axs[1,0].pie(los_data,labels=los_data,colors=los_colors, labeldistance=0.8, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})	
+	axs[1,0].annotate(r'\textbf{LOS Clouds}',xy=(0.5,1.0),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
+	
+	axs[1,1].pie(sfr_data,labels=sfr_data,colors=sfr_colors, labeldistance=0.8, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})		
+	axs[1,1].annotate(r'\textbf{SFRs}',xy=(0.5,1.0),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
+	
+	
+	axs[0,1].legend(wedges, types,
+          title="Molecule Types",
+          loc="center left",
+          bbox_to_anchor=(1, 0, 0.5, 1))
+	
+	fig.tight_layout()
+	
+	fig.subplots_adjust(wspace=-0.3, hspace=0)
+	
+	if show is True:
+	
+		plt.show()
+	
+	export_figure(fig,'mol_type_by_source_type',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight')
+
+	return fig
+	
+@drawn_in_style()
+def du_by_source_type(my_list,formats=None,rasterize=False,show=False):
+
+	'''
+	Makes a KDE plot of the dus in each source type
+	'''
+	
+	#gather the data
+
+	my_dict = {
+	
+		'Carbon Star' 	: 	[],
+		'Dark Cloud'	:	[],
+		'LOS Cloud'	:	[],
+		'SFR'	:	[],	
+		}
+		
+	#we have to be a little careful here, because for a given source, there can be two SFRs listed, and we only want to credit it once
+		
+	for mol in my_list:
+	
+		#we'll make a dictionary here to flag if we've credited things already
+		
+		credit_dict = {
+	
+			'Carbon Star' 	: 	False,
+			'Dark Cloud'	:	False,
+			'LOS Cloud'	:	False,
+			'SFR'	:	False,	
+			}		
+	
+		if mol.du is None or mol.fullerene is True:
+		
+			continue
+		
+		for source in mol.sources:
+		
+			if source.type in my_dict:
+			
+				if credit_dict[source.type] is False:
+			
+					my_dict[source.type].append(mol.du)
+					
+					credit_dict[source.type] = True
+	
+	fig = new_figure('DU by Source Type',show=show,figsize=(10,8))
+
+	#load up an axis
+	
+	ax = fig.add_subplot(111)
+
+	ax.tick_params(axis='x', which='both', direction='in',length=5,width=1)
+	ax.tick_params(axis='y', which='both', direction='in',length=5,width=1)	
+
+	#label the axes
+	
+	ax.set_xlabel('Degree of Unsaturation')
+	ax.set_ylabel('Kernel Density Estimate')
+	
+	#Do the estimates and plot them
+	
+	xvals = np.arange(0,15,0.1)
+	
+	density_carbon = gkde(my_dict['Carbon Star'])
+	density_carbon.covariance_factor = lambda : 0.5
+	density_carbon._compute_covariance()
+	
+	density_dark = gkde(my_dict['Dark Cloud'])
+	density_dark.covariance_factor = lambda : 0.5
+	density_dark._compute_covariance()
+	
+	density_los = gkde(my_dict['LOS Cloud'])
+	density_los.covariance_factor = lambda : 0.5
+	density_los._compute_covariance()	
+	
+	density_sfr = gkde(my_dict['SFR'])
+	density_sfr.covariance_factor = lambda : 0.5
+	density_sfr._compute_covariance()	
+	
+	x_ann = 0.97
+	y_ann = 0.96
+	y_sep = 0.06	
+		
+	ax.plot(xvals,density_carbon(xvals),color='darkorange')
+	ax.fill_between(xvals,density_carbon(xvals),0,facecolor='darkorange',alpha=0.25,zorder=4)
+
+	ax.plot(xvals,density_dark(xvals),color='forestgreen')
+	ax.fill_between(xvals,density_dark(xvals),0,facecolor='forestgreen',alpha=0.25,zorder=4)
+
+	ax.plot(xvals,density_los(xvals),color='red')
+	ax.fill_between(xvals,density_los(xvals),0,facecolor='red',alpha=0.25,zorder=4)
+
+	ax.plot(xvals,density_sfr(xvals),color='dodgerblue')
+	ax.fill_between(xvals,density_sfr(xvals),0,facecolor='dodgerblue',alpha=0.25,zorder=4)
+		
+	ax.annotate(r'\underline{Source Types}',xy=(x_ann,y_ann-0*y_sep),xycoords='axes fraction',color='black',ha='right',va='top')
+
+	ax.annotate('SFR',xy=(x_ann,y_ann-y_sep),xycoords='axes fraction',color='dodgerblue',ha='right',va='top')
+	ax.annotate('{}' .format(len(my_dict['SFR'])), xy=(2.7,0.3),xycoords='data',ha='left',va='bottom',color='dodgerblue')	
+
+	ax.annotate('Carbon Star',xy=(x_ann,y_ann-2*y_sep),xycoords='axes fraction',color='darkorange',ha='right',va='top')
+	ax.annotate('{}' .format(len(my_dict['Carbon Star'])), xy=(6,0.14),xycoords='data',ha='left',va='bottom',color='darkorange')	
+
+	ax.annotate('Dark Cloud',xy=(x_ann,y_ann-3*y_sep),xycoords='axes fraction',color='forestgreen',ha='right',va='top')
+	ax.annotate('{}' .format(len(my_dict['Dark Cloud'])), xy=(10.9,0.02),xycoords='data',ha='left',va='bottom',color='forestgreen')	
+
+	ax.annotate('LOS Cloud',xy=(x_ann,y_ann-4*y_sep),xycoords='axes fraction',color='red',ha='right',va='top')	
+	ax.annotate('{}' .format(len(my_dict['LOS Cloud'])), xy=(2.3,0.4),xycoords='data',ha='left',va='bottom',color='red')	
+
+	
+	if show is True:
+	
+		plt.show()
+	
+	export_figure(fig,'du_by_source_type_kde',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight',pad_inches=0)
+	
+	return fig
+
+@drawn_in_style({'font.size' : 18})
+def rel_du_by_source_type(my_list,formats=None,rasterize=False,show=False):
+
+	'''
+	Makes a KDE plot of the relative dus in each source type
+	'''
+	
+	#gather the data
+
+	my_dict = {
+	
+		'Carbon Star' 	: 	[],
+		'Dark Cloud'	:	[],
+		'LOS Cloud'	:	[],
+		'SFR'	:	[],	
+		}
+		
+	#we have to be a little careful here, because for a given source, there can be two SFRs listed, and we only want to credit it once
+		
+	for mol in my_list:
+	
+		#we'll make a dictionary here to flag if we've credited things already
+		
+		credit_dict = {
+	
+			'Carbon Star' 	: 	False,
+			'Dark Cloud'	:	False,
+			'LOS Cloud'	:	False,
+			'SFR'	:	False,	
+			}		
+	
+		if mol.du is None or mol.fullerene is True:
+		
+			continue
+		
+		for source in mol.sources:
+		
+			if source.type in my_dict:
+			
+				if credit_dict[source.type] is False:
+			
+					my_dict[source.type].append(mol.du/mol.maxdu)
+					
+					credit_dict[source.type] = True
+	
+	fig = new_figure('Relative DU by Source Type',show=show,figsize=(10,8))
+	axs = fig.subplots(2,2)
+
+	#axes ticks and limits
+	
+	for ax in axs.flat:
+		ax.set_ylim([0,3.75])
+		ax.tick_params(axis='y', which='both', direction='in',length=5,width=1)
+		ax.tick_params(axis='x', which='both', direction='in',length=5,width=1)
+		
+	axs[0,0].set_yticklabels(axs[0,0].get_yticklabels(), visible=False)			
+	axs[0,0].set_xticklabels(axs[0,0].get_xticklabels(), visible=False)	
+
+	axs[1,1].set_yticklabels(axs[1,0].get_yticklabels(), visible=False)	
+	axs[1,1].set_xticklabels(axs[1,0].get_xticklabels(), visible=False)	
+	
+	axs[0,1].set_yticklabels(axs[1,0].get_yticklabels(), visible=False)	
+	axs[0,1].set_xticklabels(axs[1,0].get_xticklabels(), visible=False)				
+		
+
+	#label the axes
+	
+	axs[1,0].set(xlabel = 'Relative Degree of Unsaturation')
+	axs[1,0].set(ylabel = 'Kernel Density Estimate')	
+	
+	#Do the estimates and plot them
+	
+	xvals = np.arange(0,1,0.01)
+	
+	density_carbon = gkde(my_dict['Carbon Star'])
+	density_carbon.covariance_factor = lambda : 0.5
+	density_carbon._compute_covariance()
+	
+	density_dark = gkde(my_dict['Dark Cloud'])
+	density_dark.covariance_factor = lambda : 0.5
+	density_dark._compute_covariance()
+	
+	density_los = gkde(my_dict['LOS Cloud'])
+	density_los.covariance_factor = lambda : 0.5
+	density_los._compute_covariance()	
 	
-	ax = plt.axes([0,0,1,1])
+	density_sfr = gkde(my_dict['SFR'])
+	density_sfr.covariance_factor = lambda : 0.5
+	density_sfr._compute_covariance()	
 	
-	ax.set_xlim([0,18])
-	ax.set_ylim([0,8])
+	x_ann = 0.97
+	y_ann = 0.96
+	y_sep = 0.06	
+		
+	axs[0,0].plot(xvals,density_carbon(xvals),color='darkorange')
+	axs[0,0].fill_between(xvals,density_carbon(xvals),0,facecolor='darkorange',alpha=0.25,zorder=4)
+	axs[0,0].annotate('Carbon Star',xy=[0.04,0.96],xycoords='axes fraction',ha='left',va='top',size=24,color='darkorange')
+
+	axs[1,0].plot(xvals,density_dark(xvals),color='forestgreen')
+	axs[1,0].fill_between(xvals,density_dark(xvals),0,facecolor='forestgreen',alpha=0.25,zorder=4)
+	axs[1,0].annotate('Dark Cloud',xy=[0.04,0.96],xycoords='axes fraction',ha='left',va='top',size=24,color='forestgreen')
+
+
+	axs[0,1].plot(xvals,density_los(xvals),color='red')
+	axs[0,1].fill_between(xvals,density_los(xvals),0,facecolor='red',alpha=0.25,zorder=4)
+	axs[0,1].annotate('LOS Cloud',xy=[0.04,0.96],xycoords='axes fraction',ha='left',va='top',size=24,color='red')
+
+
+	axs[1,1].plot(xvals,density_sfr(xvals),color='dodgerblue')
+	axs[1,1].fill_between(xvals,density_sfr(xvals),0,facecolor='dodgerblue',alpha=0.25,zorder=4)
+	axs[1,1].annotate('SFR',xy=[0.04,0.96],xycoords='axes fraction',ha='left',va='top',size=24,color='dodgerblue')
+
 	
-	for el in elements:
+	fig.subplots_adjust(wspace=0, hspace=0)
+	if show is True:
+	
+		plt.show()
+	
+	export_figure(fig,'relative_du_by_source_type_kde',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight',pad_inches=0)
+	
+	return fig
+	
+@drawn_in_style()
+def mass_by_source_type(my_list,formats=None,rasterize=False,show=False):
+
+	'''
+	Makes a KDE plot of the masses in each source type
+	'''
+	
+	#gather the data
+
+	my_dict = {
+	
+		'Carbon Star' 	: 	[],
+		'Dark Cloud'	:	[],
+		'LOS Cloud'	:	[],
+		'SFR'	:	[],	
+		}
 		
-		x = elements[el][1]-1
-		y = elements[el][2]
+	#we have to be a little careful here, because for a given source, there can be two SFRs listed, and we only want to credit it once
 		
-		sym = '\\textbf{' + elements[el][0].symbol + '}'
-		num = elements[el][0].number
-		mass = elements[el][0].mass
-		name = elements[el][0].name.capitalize()
+	masses = []
+	
+	for mol in my_list:
 		
-		this_color = 'white'
+		#we'll make a dictionary here to flag if we've credited things already
+		
+		credit_dict = {
+	
+			'Carbon Star' 	: 	False,
+			'Dark Cloud'	:	False,
+			'LOS Cloud'	:	False,
+			'SFR'	:	False,	
+			}		
+	
+		#drop the fullerenes
+		
+		if mol.fullerene is True:
+		
+			continue
 			
-		if el in census:
+		#add the mass to the list for axis limit purposes
 		
-			this_color = map_colors[census[el]-1]
+		masses.append(mol.mass)	
 		
-			ndets = '\\textbf{' + str(census[el]) + '}'
+		for source in mol.sources:
 		
-			ax.annotate(ndets,xy=(x+0.8,y+.95),xycoords='data',size=14,color='black',ha='right',va='top')
-
-		rect = patches.Rectangle((x,y),0.9,1.05,linewidth=1,edgecolor='black',facecolor=this_color,alpha=0.5)
-		ax.add_patch(rect)
-		ax.annotate(num,xy=(x+0.1,y+.95),xycoords='data',size=14,color='black',ha='left',va='top')
-		ax.annotate(sym,xy=(x+0.1,y+.70),xycoords='data',size=20,color='black',ha='left',va='top')
-		ax.annotate(mass,xy=(x+0.1,y+.42),xycoords='data',size=8,color='black',ha='left',va='top')
-		ax.annotate(name,xy=(x+0.1,y+.29),xycoords='data',size=8,color='black',ha='left',va='top')
+			if source.type in my_dict:
+			
+				if credit_dict[source.type] is False:
 			
+					my_dict[source.type].append(mol.mass)
+					
+					credit_dict[source.type] = True
 	
-	plt.axis('equal')
-	plt.axis('off')	
-	plt.show()
+	fig = new_figure('Mass by Source Type',show=show,figsize=(10,8))
+
+	#axes ticks and limits
 	
-	#write out the figure
+	ax = fig.add_subplot(111)
+	
+	ax.set_xlim([min(masses),max(masses)])
+	ax.tick_params(axis='y', which='both', direction='in',length=5,width=1,labelleft='off')
+	ax.tick_params(axis='x', which='both', direction='in',length=5,width=1,labelbottom='off')		
+
+	#label the axes
+	
+	ax.set(xlabel = 'Molecular Mass (amu)')
+	ax.set(ylabel = 'Kernel Density Estimate')	
+	
+	#Do the estimates and plot them
+	
+	xvals = np.arange(0,max(masses),1)
+	
+	density_carbon = gkde(my_dict['Carbon Star'])
+	density_carbon.covariance_factor = lambda : 0.5
+	density_carbon._compute_covariance()
+	
+	density_dark = gkde(my_dict['Dark Cloud'])
+	density_dark.covariance_factor = lambda : 0.5
+	density_dark._compute_covariance()
+	
+	density_los = gkde(my_dict['LOS Cloud'])
+	density_los.covariance_factor = lambda : 0.5
+	density_los._compute_covariance()	
+	
+	density_sfr = gkde(my_dict['SFR'])
+	density_sfr.covariance_factor = lambda : 0.5
+	density_sfr._compute_covariance()	
+		
+	ax.plot(xvals[min(masses):max(masses)],density_carbon(xvals[min(masses):max(masses)]),color='darkorange')
+	ax.fill_between(xvals[min(masses):max(masses)],density_carbon(xvals[min(masses):max(masses)]),0,facecolor='darkorange',alpha=0.25,zorder=4)
 	
-	plt.savefig('periodic_heatmap.pdf',format='pdf',transparent=True,bbox_inches='tight',pad_inches=0)
+	ax.plot(xvals[min(masses):max(masses)],density_dark(xvals[min(masses):max(masses)]),color='forestgreen')
+	ax.fill_between(xvals[min(masses):max(masses)],density_dark(xvals[min(masses):max(masses)]),0,facecolor='forestgreen',alpha=0.25,zorder=4)
+	
+	ax.plot(xvals[min(masses):max(masses)],density_los(xvals[min(masses):max(masses)]),color='red')
+	ax.fill_between(xvals[min(masses):max(masses)],density_los(xvals[min(masses):max(masses)]),0,facecolor='red',alpha=0.25,zorder=4)
+
+	ax.plot(xvals[min(masses):max(masses)],density_sfr(xvals[min(masses):max(masses)]),color='dodgerblue')
+	ax.fill_between(xvals[min(masses):max(masses)],density_sfr(xvals[min(masses):max(masses)]),0,facecolor='dodgerblue',alpha=0.25,zorder=4)
 	
-	#the bit below crops off extra white space.  This only works on Macs with the TexLive pdfcrop utility installed.  Comment out if not desired.
+	x_ann = 0.97
+	y_ann = 0.96
+	y_sep = 0.06	
+		
+	ax.annotate(r'\underline{Source Types}',xy=(x_ann,y_ann-0*y_sep),xycoords='axes fraction',color='black',ha='right',va='top')
+	ax.annotate('SFR',xy=(x_ann,y_ann-y_sep),xycoords='axes fraction',color='dodgerblue',ha='right',va='top')
+	ax.annotate('Carbon Star',xy=(x_ann,y_ann-2*y_sep),xycoords='axes fraction',color='darkorange',ha='right',va='top')	
+	ax.annotate('Dark Cloud',xy=(x_ann,y_ann-3*y_sep),xycoords='axes fraction',color='forestgreen',ha='right',va='top')
+	ax.annotate('LOS Cloud',xy=(x_ann,y_ann-4*y_sep),xycoords='axes fraction',color='red',ha='right',va='top')	
+
+	if show is True:
 	
-	os.system('pdfcrop --margins -0 periodic_heatmap.pdf periodic_heatmap.pdf')
+		plt.show()
 	
-	return	
+	export_figure(fig,'mass_by_source_type_kde',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight',pad_inches=0)
 	
-def mass_by_wavelength(list):
+	return fig
+
+@drawn_in_style({'font.size' : 26})
+def waves_by_source_type(my_list,formats=None,rasterize=False,show=False):
 
 	'''
-	Makes a KDE plot of detections at each wavelength vs mass
+	Generates four pie charts, one for each generalized source type, with the wedges for the wavelengths used for first detections in those sources
 	'''
+	#initialize a new figure
 	
-	#gather the data
+	fig = new_figure('Wavelength by Source Type',show=show,figsize=(15,12))
+	axs = fig.subplots(2,2)
+
+	#collect the data
 	
-	my_dict = {
+	type_dict = {
 	
-		'UV'	: [],
-		'Vis'	: [],
-		'IR'	: [],
-		'sub-mm': [],
-		'mm'	: [],
-		'cm'	: [],
-		'UV-Vis': [],
+		'Carbon Star' 	: 	{'cm': 0, 'mm': 0, 'sub-mm': 0, 'IR': 0, 'UV': 0, 'Vis': 0},
+		'Dark Cloud'	:	{'cm': 0, 'mm': 0, 'sub-mm': 0, 'IR': 0, 'UV': 0, 'Vis': 0},
+		'LOS Cloud'		:	{'cm': 0, 'mm': 0, 'sub-mm': 0, 'IR': 0, 'UV': 0, 'Vis': 0},
+		'SFR'			:	{'cm': 0, 'mm': 0, 'sub-mm': 0, 'IR': 0, 'UV': 0, 'Vis': 0},
 		
-	}
+		}
 	
-	for x in list:
+	for mol in my_list:
 	
-		for y in my_dict:
+		#we'll make a dictionary here to flag if we've credited things already
 		
-			if y in x.wavelengths:
+		credit_dict = {
+	
+			'Carbon Star' 	: 	False,
+			'Dark Cloud'	:	False,
+			'LOS Cloud'		:	False,
+			'SFR'			:	False,
 			
-				my_dict[y].append(x.mass)
+			}		
+	
+		for source in mol.sources:
+		
+			if source.type in type_dict:
+			
+				if credit_dict[source.type] is False:
 				
-	for x in my_dict['UV']:
+					for wave in mol.wavelengths:
+					
+						type_dict[source.type][wave] += 1													
+
+					credit_dict[source.type] = True
+					
+	#make the pie charts
 	
-		my_dict['UV-Vis'].append(x)
+	#Carbon Stars
+	
+	carbon_data = [
+	
+		type_dict['Carbon Star']['cm'], 
+		type_dict['Carbon Star']['mm'],
+		type_dict['Carbon Star']['sub-mm'], 
+		type_dict['Carbon Star']['IR'], 
+		#type_dict['Carbon Star']['UV'] + type_dict['Carbon Star']['Vis'],
+		]
 		
-	for x in my_dict['Vis']:
+	carbon_colors = [
 	
-		my_dict['UV-Vis'].append(x)
+		'dodgerblue',
+		'darkorange',
+		'forestgreen',
+		'black',
+		#'violet',
+	
+		]		
+		
+	#Dark Clouds
+	
+	dark_data = [
 	
-	plt.close('Detections at Wavelengths by Mass')
+		type_dict['Dark Cloud']['cm'], 
+		type_dict['Dark Cloud']['mm'],
+		#type_dict['Dark Cloud']['sub-mm'], 
+		#type_dict['Dark Cloud']['IR'], 
+		#type_dict['Dark Cloud']['UV'] + type_dict['Dark Cloud']['Vis'],
+		]
+		
+	dark_colors = [
 	
-	fig = plt.figure(num='Detections at Wavelengths by Mass',figsize=(10,8))
+		'dodgerblue',
+		'darkorange',
+		#'forestgreen',
+		#'black',
+		#'violet',
 	
-	plt.ion()
+		]			
+		
+	#LOS Clouds
 	
-	#set some font defaults
+	los_data = [
 	
-	fontparams = {'size':24, 'family':'sans-serif','sans-serif':['Helvetica']}
+		type_dict['LOS Cloud']['cm'], 
+		type_dict['LOS Cloud']['mm'],
+		type_dict['LOS Cloud']['sub-mm'], 
+		type_dict['LOS Cloud']['IR'], 
+		type_dict['LOS Cloud']['UV'] + type_dict['LOS Cloud']['Vis'],
+		]
+		
+	los_colors = [
 	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')		
-
-	#load up an axis
+		'dodgerblue',
+		'darkorange',
+		'forestgreen',
+		'black',
+		'violet',
 	
-	ax = fig.add_subplot(111)
-
-	ax.tick_params(axis='x', which='both', direction='in',length=5,width=1)
-	ax.tick_params(axis='y', which='both', direction='in',length=5,width=1)	
-
-	#label the axes
+		]
+		
+	#SFRs
 	
-	plt.xlabel('Atomic Mass (amu)')
-	plt.ylabel('Kernel Density Estimate')
+	sfr_data = [
 	
-	#Do the estimates and plot them
+		type_dict['SFR']['cm'], 
+		type_dict['SFR']['mm'],
+		type_dict['SFR']['sub-mm'], 
+		#type_dict['SFR']['IR'], 
+		#type_dict['SFR']['UV'] + type_dict['SFR']['Vis'],
+		]
+		
+	sfr_colors = [
 	
-	xvals = np.arange(0,160)
+		'dodgerblue',
+		'darkorange',
+		'forestgreen',
+		#'black',
+		#'violet',
 	
-	density_cm = gkde(my_dict['cm'])
-	density_cm.covariance_factor = lambda : .5
-	density_cm._compute_covariance()
+		]
 	
-	density_mm = gkde(my_dict['mm'])
-	density_mm.covariance_factor = lambda : .5
-	density_mm._compute_covariance()
+	types = [
 	
-	density_submm = gkde(my_dict['sub-mm'])
-	density_submm.covariance_factor = lambda : .5
-	density_submm._compute_covariance()	
+		'cm',
+		'mm',
+		'sub-mm',
+		'IR',
+		'UV/Vis',
 	
-	density_IR = gkde(my_dict['IR'])
-	density_IR.covariance_factor = lambda : .5
-	density_IR._compute_covariance()	
+		]
+		
+	def make_labels(list):
 	
-	density_UV = gkde(my_dict['UV-Vis'])
-	density_UV.covariance_factor = lambda : .5
-	density_UV._compute_covariance()	
+		new_labels = []
+		
+		total = sum(list)
+		
+		for i in list:
+		
+			percent = 100*i/total
+			
+			new_labels.append('{:.1f}\%' .format(percent))
+			
+		return new_labels			
 	
-	ax.plot(xvals,density_cm(xvals),color='dodgerblue')
-	ax.fill_between(xvals,density_cm(xvals),0,facecolor='dodgerblue',alpha=0.25,zorder=4)
-	ax.annotate('{}' .format(len(my_dict['cm'])), xy=(75,0.01),xycoords='data',ha='left',va='bottom',color='dodgerblue')	
+	axs[0,0].pie(carbon_data,labels=make_labels(carbon_data), colors=carbon_colors, labeldistance=1.1, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})	
+	axs[0,0].annotate(r'\textbf{Carbon Stars}',xy=(0.5,1.05),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
 	
-	max_mm = max([x for x in my_dict['mm'] if x < 160])
-	ax.plot(xvals[:max_mm+1],density_mm(xvals[:max_mm+1]),color='darkorange')
-	ax.fill_between(xvals[:max_mm+1],density_mm(xvals[:max_mm+1]),0,facecolor='darkorange',alpha=0.25)
-	ax.annotate('{}' .format(len(my_dict['mm'])), xy=(53.5,0.022),xycoords='data',ha='left',va='bottom',color='darkorange')
+	axs[0,1].pie(dark_data,labels=make_labels(dark_data),colors=dark_colors, labeldistance=1.1, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})	
+	axs[0,1].annotate(r'\textbf{Dark Clouds}',xy=(0.5,1.05),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
+
+	wedges, texts = axs[1,0].pie(los_data,labels=make_labels(los_data),colors=los_colors, labeldistance=1.1, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})	
+	axs[1,0].annotate(r'\textbf{LOS Clouds}',xy=(0.5,1.05),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
 	
-	ax.plot(xvals,density_submm(xvals),color='forestgreen')
-	ax.fill_between(xvals,density_submm(xvals),0,facecolor='forestgreen',alpha=0.25)
-	ax.annotate('{}' .format(len(my_dict['sub-mm'])), xy=(40,0.038),xycoords='data',ha='left',va='bottom',color='forestgreen')
+	axs[1,1].pie(sfr_data,labels=make_labels(sfr_data),colors=sfr_colors, labeldistance=1.1, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})		
+	axs[1,1].annotate(r'\textbf{SFRs}',xy=(0.5,1.05),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
 	
-	max_IR = max([x for x in my_dict['IR'] if x < 160])
-	ax.plot(xvals[:max_IR+1],density_IR(xvals[:max_IR+1]),color='black')
-	ax.fill_between(xvals[:max_IR+1],density_IR(xvals[:max_IR+1]),0,facecolor='black',alpha=0.25,zorder=5)
-	ax.annotate('{}' .format(len(my_dict['IR'])), xy=(68,0.0025),xycoords='data',ha='left',va='bottom',color='black')		
 	
-	max_UV = max(my_dict['UV-Vis'])
-	ax.plot(xvals[:max_UV+1],density_UV(xvals[:max_UV+1]),color='violet')
-	ax.fill_between(xvals[:max_UV+1],density_UV(xvals[:max_UV+1]),0,facecolor='violet',alpha=0.25)
-	ax.annotate('{}' .format(len(my_dict['UV-Vis'])), xy=(16.5,0.057),xycoords='data',ha='left',va='bottom',color='violet')
+	axs[0,1].legend(wedges, types,
+          title="Wavelengths",
+          loc="center left",
+          bbox_to_anchor=(1, 0, 0.5, 1))
 	
-	ax.annotate(r'\underline{Detection Wavelengths}',xy=(158,0.06),xycoords='data',color='black',ha='right',va='top')
-	ax.annotate('centimeter',xy=(158,0.056),xycoords='data',color='dodgerblue',ha='right',va='top')
-	ax.annotate('millimeter',xy=(158,0.052),xycoords='data',color='darkorange',ha='right',va='top')
-	ax.annotate('sub-millimeter',xy=(158,0.048),xycoords='data',color='forestgreen',ha='right',va='top')
-	ax.annotate('infrared',xy=(158,0.044),xycoords='data',color='black',ha='right',va='top')
-	ax.annotate('visible/ultraviolet',xy=(158,0.04),xycoords='data',color='violet',ha='right',va='top')		
+	fig.tight_layout()
 	
-	plt.show()
+	fig.subplots_adjust(wspace=0.1, hspace=0.1)
 	
-	plt.savefig('mass_by_wavelengths_kde.pdf',format='pdf',transparent=True,bbox_inches='tight',pad_inches=0)
+	if show is True:
+	
+		plt.show()
+	
+	export_figure(fig,'waves_by_source_type',formats=formats,rasterize=rasterize,transparent=True,bbox_inches='tight')
+
+	return fig
+
+#every figure function, by name, each taking a list of molecules.  Used by update_plots() and the rendering service.
+
+figure_functions = {
+	'cumu_det_plot'				:	cumu_det_plot,
+	'cumu_det_natoms_plot'		:	cumu_det_natoms_plot,
+	'det_per_year_per_atom'		:	det_per_year_per_atom,
+	'facility_shares'			:	lambda list,**kwargs: facility_shares(scopes_list,list,**kwargs),
+	'cumu_det_facility'			:	cumu_det_facility,
+	'periodic_heatmap'			:	periodic_heatmap,
+	'mass_by_wavelength'		:	mass_by_wavelength,
+	'mols_waves_by_atoms'		:	mols_waves_by_atoms,
+	'du_histogram'				:	du_histogram,
+	'type_pie_chart'			:	type_pie_chart,
+	'source_pie_chart'			:	source_pie_chart,
+	'mol_type_by_source_type'	:	mol_type_by_source_type,
+	'du_by_source_type'			:	du_by_source_type,
+	'rel_du_by_source_type'		:	rel_du_by_source_type,
+	'mass_by_source_type'		:	mass_by_source_type,
+	'waves_by_source_type'		:	waves_by_source_type,
+	}
+
+#############################################################
+#					   Import and Export					#
+#############################################################
+
+#the fields written out for each kind of record.  Molecules get every argument Molecule() takes, so that records can be turned straight back into molecules; the counts sources and telescopes keep are left out, since update_stats() rebuilds them.
+
+record_fields = {
+	'molecules'		:	[x for x in inspect.signature(Molecule.__init__).parameters if x != 'self'],
+	'sources'		:	['name','type','ra','dec','simbad_url'],
+	'telescopes'	:	['name','shortname','type','wavelength','latitude','longitude','diameter','built','decommissioned','notes'],
+	}
 	
-	return			
+#the first characters a string can have and still be read as JSON, so that csv cells only need checking if they start with one of these
+
+json_starts = set('-0123456789"[{tfn \t\r\n')
+
+json_constants = {'null' : None, 'true' : True, 'false' : False}
 
-def mols_waves_by_atoms(list):
+def to_record(obj,kind='molecules'):
 
 	'''
-	Makes six histogram plots of molecules detected in each wavelength range by number of atoms, excepting fullerenes
+	Returns a dictionary of the fields in record_fields[kind] for a molecule, source, or telescope, with the sources and telescopes of a molecule given by name and shortname.  The reference and isotopologue strings are kept exactly as they are.
 	'''
-
-	#Close an old figure if it exists and initialize a new figure
-	
-	plt.close('Molecules Detected in Each Wavelength by Number of Atoms')
-	
-	fig = plt.figure(num='Molecules Detected in Each Wavelength by Number of Atoms',figsize=(10,8))
 	
-	plt.ion()
+	record = {x : getattr(obj,x) for x in record_fields[kind]}
 	
-	#set some font defaults
+	if kind == 'molecules':
 	
-	fontparams = {'size':18, 'family':'sans-serif','sans-serif':['Helvetica']}
+		record['sources'] = [x.name for x in obj.sources]
+		record['telescopes'] = [x.shortname for x in obj.telescopes]
+		
+	return record
 	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')	
+def from_record(record,kind='molecules',sources=None,scopes=None):
+
+	'''
+	Makes a Molecule, Source, or Telescope from a record.  For molecules, sources and scopes are dictionaries of the Source and Telescope objects to use by name and shortname (by default those of source_list and scopes_list); any name not in them gets a new, bare object, which is added to the dictionary.
+	'''
 	
-	#gather the data
+	if kind == 'sources':
 	
-	my_dict = {
+		return Source(**record)
+		
+	if kind == 'telescopes':
 	
-		'UV'	: [],
-		'Vis'	: [],
-		'IR'	: [],
-		'sub-mm': [],
-		'mm'	: [],
-		'cm'	: [],	
+		return Telescope(**record)
 		
-	}
+	sources = {x.name : x for x in source_list} if sources is None else sources
+	scopes = {x.shortname : x for x in scopes_list} if scopes is None else scopes
 	
-	max_n = []
+	record = dict(record)
 	
-	for x in list:
+	record['sources'] = [sources[x] if x in sources else sources.setdefault(x,Source(x)) for x in record['sources']]
+	record['telescopes'] = [scopes[x] if x in scopes else scopes.setdefault(x,Telescope(x,x)) for x in record['telescopes']]
 	
-		for y in my_dict:
-		
-			if y in x.wavelengths:
-			
-				if x.fullerene is True:
-				
-					continue
-					
-				else:
-			
-					my_dict[y].append(x.natoms)
-					
-					max_n.append(x.natoms)
-		
-					
-	max_n = max(max_n)				
-				
-	ax1 = plt.subplot(231)
-	ax2 = plt.subplot(232)
-	ax3 = plt.subplot(233)
-	ax4 = plt.subplot(234)
-	ax5 = plt.subplot(235)
-	ax6 = plt.subplot(236)
+	return Molecule(**record)
 	
-	n_bins = max_n
+def encode_cell(value):
+
+	'''
+	Returns the csv cell for a value.  Strings are written as they are unless they could be mistaken for JSON (like '2007', 'null', or ''), everything else is written as JSON.
+	'''
 	
-	xvals = np.arange(0,max_n+1,0.5)
+	if isinstance(value,str) and (value[:1] not in json_starts or value == ''):
 	
-	ax1.tick_params(axis='x', which='both', direction='in',length=5,width=1)
-	ax1.tick_params(axis='y', which='both', direction='in',length=5,width=1)
-	ax2.tick_params(axis='x', which='both', direction='in',length=5,width=1)
-	ax2.tick_params(axis='y', which='both', direction='in',length=5,width=1)
-	ax3.tick_params(axis='x', which='both', direction='in',length=5,width=1)
-	ax3.tick_params(axis='y', which='both', direction='in',length=5,width=1)
-	ax4.tick_params(axis='x', which='both', direction='in',length=5,width=1)
-	ax4.tick_params(axis='y', which='both', direction='in',length=5,width=1)
-	ax5.tick_params(axis='x', which='both', direction='in',length=5,width=1)
-	ax5.tick_params(axis='y', which='both', direction='in',length=5,width=1)
-	ax6.tick_params(axis='x', which='both', direction='in',length=5,width=1)
-	ax6.tick_params(axis='y', which='both', direction='in',length=5,width=1)					
+		return value
 		
-	density_cm = gkde(my_dict['cm'])
-	density_cm.covariance_factor = lambda : .5
-	density_cm._compute_covariance()
-	ax1.plot(xvals,density_cm(xvals))	
-	ax1.fill_between(xvals,density_cm(xvals),0,facecolor='dodgerblue',alpha=0.25)
-	ax1.annotate('cm',xy=(0.95,0.96),xycoords='axes fraction',ha='right',va='top',size=24)
-	ax1.set_ylim([0,0.65])
-	ax1.set_xticks([0,5,10,15,20])	
-	ax1.set_xticklabels([])
-	ax1.set_ylabel('Kernel Density Estimate')
-
-	density_mm = gkde(my_dict['mm'])
-	density_mm.covariance_factor = lambda : .5
-	density_mm._compute_covariance()
-	ax2.plot(xvals,density_mm(xvals))
-	ax2.fill_between(xvals,density_mm(xvals),0,facecolor='dodgerblue',alpha=0.25)
-	ax2.annotate('mm',xy=(0.95,0.96),xycoords='axes fraction',ha='right',va='top',size=24)
-	ax2.set_ylim([0,0.65])
-	ax2.set_xticks([0,5,10,15,20])
-	ax2.set_xticklabels([])
-
-	density_submm = gkde(my_dict['sub-mm'])
-	density_submm.covariance_factor = lambda : .5
-	density_submm._compute_covariance()
-	ax3.plot(xvals,density_submm(xvals))
-	ax3.fill_between(xvals,density_submm(xvals),0,facecolor='dodgerblue',alpha=0.25)
-	ax3.annotate('sub-mm',xy=(0.95,0.96),xycoords='axes fraction',ha='right',va='top',size=24)
-	ax3.set_ylim([0,0.65])
-	ax3.set_xticks([0,5,10,15,20])
-	ax3.set_xticklabels([])
-
-	density_IR = gkde(my_dict['IR'])
-	density_IR.covariance_factor = lambda : .5
-	density_IR._compute_covariance()
-	ax4.plot(xvals,density_IR(xvals))
-	ax4.fill_between(xvals,density_IR(xvals),0,facecolor='dodgerblue',alpha=0.25)
-	ax4.annotate('IR',xy=(0.95,0.96),xycoords='axes fraction',ha='right',va='top',size=24)
-	ax4.set_ylim([0,0.65])
-	ax4.set_xticks([0,5,10,15,20])
-	ax4.set_xlabel('\# of Atoms')
-	ax4.set_ylabel('Kernel Density Estimate')
-
-	
-	ax5.hist(my_dict['Vis'],bins=[.5,1.5,2.5,3.5,4.5])
-	ax5.annotate('Vis',xy=(0.95,0.96),xycoords='axes fraction',ha='right',va='top',size=24)
-	ax5.set_xlim([0,20])
-	ax5.set_ylim([0,8])	
-	ax5.set_xticks([0,5,10,15,20])
-	ax5.set_xticklabels([])
-	ax5.set_ylabel('\# of Detected Molecules')
+	if isinstance(value,str):
 	
-	ax6.hist(my_dict['UV'],bins=[.5,1.5,2.5,3.5,4.5])
-	ax6.annotate('UV',xy=(0.95,0.96),xycoords='axes fraction',ha='right',va='top',size=24)
-	ax6.set_xlim([0,20])
-	ax6.set_ylim([0,8])	
-	ax6.set_xticks([0,5,10,15,20])
-	ax6.set_xticklabels([])
+		try:
+		
+			json.loads(value)
+			
+		except ValueError:
+		
+			return value
+			
+	#the common cases, without going through json
+			
+	if value is None:
 	
-	plt.tight_layout()
+		return 'null'
+		
+	if value is True or value is False:
 	
-	plt.show()
+		return 'true' if value is True else 'false'
+		
+	if type(value) is int:
 	
-	plt.savefig('mols_waves_by_atoms.pdf',format='pdf',transparent=True,bbox_inches='tight',pad_inches=0)
-
-	return
+		return str(value)
+			
+	return json.dumps(value,ensure_ascii=False)
 	
-def du_histogram(list):
+def decode_cell(cell):
 
 	'''
-	Makes a histogram of the degree of unsaturation of molecules containing only H, O, N, C, Cl, or F.
+	The inverse of encode_cell.
 	'''
-
-	#Close an old figure if it exists and initialize a new figure
 	
-	plt.close('Degree of Unsaturation Histogram')
+	if cell[:1] not in json_starts or cell == '':
 	
-	fig = plt.figure(num='Degree of Unsaturation Histogram',figsize=(10,8))
-	
-	plt.ion()
+		return cell
+		
+	if cell in json_constants:
 	
-	#set some font defaults
+		return json_constants[cell]
 	
-	fontparams = {'size':24, 'family':'sans-serif','sans-serif':['Helvetica']}
+	try:
 	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')
+		return json.loads(cell)
+		
+	except ValueError:
 	
-	#gather the data
+		return cell
+		
+def batches(records,batch_size):
+
+	'''
+	Yields lists of up to batch_size items from the iterable records.
+	'''
 	
-	dus = []
+	records = iter(records)
 	
-	for x in list:
+	while True:
 	
-		if (x.H + x.O + x.N + x.C + x.Cl + x.F + x.S) == x.natoms and x.du is not None and x.fullerene is not True:
+		batch = list(itertools.islice(records,batch_size))
 		
-			dus.append(x.du)
+		if len(batch) == 0:
+		
+			return
 			
-	#set up a plot
-	
-	ax = plt.subplot(111)
+		yield batch
+		
+def write_records(filename,records,kind='molecules',format=None,batch_size=10000):
+
+	'''
+	Writes out records (molecules, sources, or telescopes, as objects or as records from to_record, and from any iterable, including a generator) to filename as either 'csv' or 'jsonl' (JSON lines).  The format comes from the file extension if it isn't given.  Records are converted and written batch_size at a time, so memory use doesn't depend on how many there are.  Returns the number of records written.
+	'''
 	
-	ax.tick_params(axis='x', which='both', direction='in',length=5,width=1)
-	ax.tick_params(axis='y', which='both', direction='in',length=5,width=1)
+	format = os.path.splitext(filename)[1].lstrip('.').lower() if format is None else format
 	
-	ax.yaxis.set_ticks_position('both')
-	ax.xaxis.set_ticks_position('both')
+	if format not in ['csv','jsonl']:
 	
-	plt.xlabel('Degree of Unsaturation')
-	plt.ylabel('\# of Detected Molecules')
+		raise ValueError('format must be csv or jsonl, not {}' .format(format))
+		
+	fields = record_fields[kind] 
 	
-	bins = np.arange(-0.25,12.5,0.5)	
-	(n,bins,patches) = ax.hist(dus,bins=bins,facecolor='dodgerblue',alpha=0.25)
-	ax.hist(dus,bins=bins,edgecolor='royalblue',linewidth=1.5,fill=False)
+	n = 0
 	
-	ax.annotate(r'\ce{CH4}, \ce{CH3OH}, \ce{CH3Cl}, \ce{CH3NH2}, ...',xy=(0,n[0]+1),xycoords='data',rotation=90,size=16,ha='center',va='bottom')		
-	ax.annotate(r'\ce{HC11N}',xy=(12,n[12*2]+1),xycoords='data',rotation=90,size=16,ha='center',va='bottom')		
+	with open(filename,'w',newline='',encoding='utf-8') as output:
 	
-	plt.tight_layout()
-	plt.show()
+		if format == 'csv':
+		
+			writer = csv.writer(output)
+			
+			writer.writerow(fields)
 	
-	plt.savefig('du_histogram.pdf',format='pdf',transparent=True,bbox_inches='tight')
-
-	return	
+		for batch in batches(records,batch_size):
+		
+			batch = [x if isinstance(x,dict) else to_record(x,kind) for x in batch]
+		
+			if format == 'csv':
+			
+				writer.writerows([[encode_cell(x[y]) for y in fields] for x in batch])
+				
+			else:
+			
+				output.write(''.join([json.dumps(x,ensure_ascii=False) + '\n' for x in batch]))
+				
+			n += len(batch)
+			
+	return n
 	
-def type_pie_chart(my_list):
+def read_records(filename,format=None,batch_size=10000):
 
 	'''
-	Makes a pie chart of the fraction of interstellar molecules that are neutral, radical, cation, cyclic, pahs, fullerenes, or anions
+	Reads records written by write_records back in, yielding lists of up to batch_size record dictionaries at a time.  Nothing is turned into a Python object beyond the dictionaries (use from_record for that), and only one batch is held at a time.
 	'''
-
-	#Close an old figure if it exists and initialize a new figure
-	
-	plt.close('Type Pie Chart')
-	
-	fig = plt.figure(num='Type Pie Chart',figsize=(10,8))
 	
-	plt.ion()
+	format = os.path.splitext(filename)[1].lstrip('.').lower() if format is None else format
 	
-	#set some font defaults
+	if format not in ['csv','jsonl']:
 	
-	fontparams = {'size':24, 'family':'sans-serif','sans-serif':['Helvetica']}
-	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')
-	
-	#gather the data
-
-	my_dict = {
+		raise ValueError('format must be csv or jsonl, not {}' .format(format))
 	
-		'Neutral' 	: 	[0],
-		'Radical'	:	[0],
-		'Cation'	:	[0],
-		'Cyclic'	:	[0],
-		'Anion'		:	[0],
-		'Fullerene'	:	[0],
-		'PAH'		:	[0],
-		
-		}
-		
-	for mol in my_list:
+	with open(filename,'r',newline='',encoding='utf-8') as input:
 	
-		if mol.neutral is True:
-		
-			my_dict['Neutral'][0] += 1 
-			
-		if mol.radical is True:
-		
-			my_dict['Radical'][0] += 1 
-			
-		if mol.cation is True:
+		if format == 'csv':
 		
-			my_dict['Cation'][0] += 1 
+			reader = csv.reader(input)
 			
-		if mol.cyclic is True:
-		
-			my_dict['Cyclic'][0] += 1
+			fields = next(reader)
 			
-		if mol.anion is True:
-		
-			my_dict['Anion'][0] += 1
+			for batch in batches(reader,batch_size):
 			
-		if mol.fullerene is True:
+				yield [{y : decode_cell(z) for y, z in zip(fields,x)} for x in batch]
+				
+		else:
 		
-			my_dict['Fullerene'][0] += 1
+			for batch in batches(input,batch_size):
 			
-		if mol.pah is True:
-		
-			my_dict['PAH'][0] += 1		
+				yield [json.loads(x) for x in batch if x.strip() != '']
+				
+def export_census(directory,census=None,format='csv',batch_size=10000):
+
+	'''
+	Writes out the molecules, sources, and telescopes of census (the main one by default) to molecules, sources, and telescopes files of the given format in directory.  Returns the list of files written.
+	'''
 	
-	nmols = len(my_list)
+	census = globals()['census'] if census is None else census
 	
-	for type in my_dict:
+	if os.path.isdir(directory) is False:
 	
-		my_dict[type].append(my_dict[type][0]/nmols)		
-		
-	labels = ['Neutral','Radical','Cation','Cyclic','Anion','Fullerene','PAH']
+		os.makedirs(directory)
 	
-	fracs = [my_dict[x][1] for x in labels]			
-
-	#set up a plot
+	files = []
 	
-	ax = plt.subplot(111)
+	for kind, records in [('molecules',census.mol_list),('sources',census.source_list),('telescopes',census.scopes_list)]:
 	
-	size = 0.1
+		files.append(os.path.join(directory,'{}.{}' .format(kind,format)))
+		
+		write_records(files[-1],records,kind,format=format,batch_size=batch_size)
+		
+	return files
 	
-	def getshift(x):
+def import_census(directory,format='csv',batch_size=10000):
+
+	'''
+	Reads a census written by export_census back in as a new Census of new objects, with the source and telescope statistics updated.
+	'''
 	
-		return -(90-(360 - 360*x)/2)
-		
-	def getper(x):
+	files = {x : os.path.join(directory,'{}.{}' .format(x,format)) for x in ['molecules','sources','telescopes']}
 	
-		return '{}' .format(int(100*x)) + r'\%'
+	records = {x : (y for batch in read_records(files[x],batch_size=batch_size) for y in batch) for x in files}
+		
+	return census_from_records(records['molecules'],records['sources'],records['telescopes'])
 	
-	ax.pie([fracs[0],1.-fracs[0]],  colors=['dodgerblue','#EEEEEE'], radius=1, startangle=getshift(fracs[0]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
-	ax.pie([fracs[1],1.-fracs[1]],  colors=['darkorange','#EEEEEE'], radius=1-size-.02, startangle=getshift(fracs[1]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
-	ax.pie([fracs[2],1.-fracs[2]],  colors=['forestgreen','#EEEEEE'], radius=1-2*size-.04, startangle=getshift(fracs[2]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
-	ax.pie([fracs[3],1.-fracs[3]],  colors=['violet','#EEEEEE'], radius=1-3*size-.06, startangle=getshift(fracs[3]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
-	ax.pie([fracs[4],1.-fracs[4]],  colors=['red','#EEEEEE'], radius=1-4*size-.08, startangle=getshift(fracs[4]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
-	ax.pie([fracs[5],1.-fracs[5]],  colors=['goldenrod','#EEEEEE'], radius=1-5*size-.1, startangle=getshift(fracs[5]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
-	ax.pie([fracs[6],1.-fracs[6]],  colors=['royalblue','#EEEEEE'], radius=1-6*size-.12, startangle=getshift(fracs[6]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+def census_from_records(mol_records,source_records,scope_records,freeze=False):
 
-	ax.annotate(r'\textbf{Neutrals}',xy=(0.5,0.11),xycoords='axes fraction',color='dodgerblue', ha='center',size=14)
-	ax.annotate(r'\textbf{Radicals}',xy=(0.5,0.16),xycoords='axes fraction',color='darkorange', ha='center',size=14)
-	ax.annotate(r'\textbf{Cations}',xy=(0.5,0.205),xycoords='axes fraction',color='forestgreen', ha='center',size=14)
-	ax.annotate(r'\textbf{Cyclics}',xy=(0.5,0.255),xycoords='axes fraction',color='violet', ha='center',size=14)
-	ax.annotate(r'\textbf{Anions}',xy=(0.5,0.305),xycoords='axes fraction',color='red', ha='center',size=14)
-	ax.annotate(r'\textbf{Fullerenes}',xy=(0.5,0.3575),xycoords='axes fraction',color='goldenrod', ha='center',size=14)
-	ax.annotate(r'\textbf{PAHs}',xy=(0.5,0.40),xycoords='axes fraction',color='royalblue', ha='center',size=14)
+	'''
+	Builds a new Census of new objects from iterables of molecule, source, and telescope records, with the source and telescope statistics updated.  With freeze, the census holds its molecules, sources, and telescopes as tuples.
+	'''
 	
-	percents = ['\\textbf{' + '{:.1f}' .format((x*100)) + '}\%'  for x in fracs]
+	scopes = [from_record(x,'telescopes') for x in scope_records]
+	sources = [from_record(x,'sources') for x in source_records]
 	
-	ax.annotate(percents[0],xy=(0.775,0.775),xycoords='axes fraction',color='white', ha='center',size=12,rotation=-45)
-	ax.annotate(percents[1],xy=(0.74,0.74),xycoords='axes fraction',color='darkorange', ha='center',size=12,rotation=-45)
-	ax.annotate(percents[2],xy=(0.705,0.705),xycoords='axes fraction',color='forestgreen', ha='center',size=12,rotation=-45)
-	ax.annotate(percents[3],xy=(0.67,0.67),xycoords='axes fraction',color='violet', ha='center',size=12,rotation=-45)
-	ax.annotate(percents[4],xy=(0.635,0.635),xycoords='axes fraction',color='red', ha='center',size=12,rotation=-45)
-	ax.annotate(percents[5],xy=(0.6,0.6),xycoords='axes fraction',color='goldenrod', ha='center',size=12,rotation=-45)
-	ax.annotate(percents[6],xy=(0.5675,0.5675),xycoords='axes fraction',color='royalblue', ha='center',size=12,rotation=-45)
+	scopes_dict = {x.shortname : x for x in scopes}
+	sources_dict = {x.name : x for x in sources}
+	
+	mols = [from_record(x,'molecules',sources=sources_dict,scopes=scopes_dict) for x in mol_records]
 	
+	for x in scopes + sources:
 	
-	plt.tight_layout()
-	plt.show()
+		x.update_stats(mols)
+		
+	if freeze is True:
+	
+		return Census(tuple(mols),tuple(sources),tuple(scopes))
+		
+	return Census(mols,sources,scopes)
 	
-	plt.savefig('type_pie_chart.pdf',format='pdf',transparent=True,bbox_inches='tight',pad_inches=-.65)
+#############################################################
+#						SQLite Storage	 					#
+#############################################################
 
-	return	
+#the tables of a census database.  Each molecule, source, and telescope keeps its whole record as JSON, for turning it back into an object, plus the columns that queries filter and group on, and the membership tables link molecules to their sources, telescopes, wavelengths, and elements.
+
+db_schema = '''
+CREATE TABLE IF NOT EXISTS molecules (id INTEGER PRIMARY KEY, label TEXT UNIQUE, formula TEXT, year INTEGER, natoms INTEGER, neutral INTEGER, cation INTEGER, anion INTEGER, radical INTEGER, cyclic INTEGER, fullerene INTEGER, pah INTEGER, ice INTEGER, ppd INTEGER, exgal INTEGER, exo INTEGER, record TEXT);
+CREATE TABLE IF NOT EXISTS sources (id INTEGER PRIMARY KEY, name TEXT UNIQUE, type TEXT, record TEXT);
+CREATE TABLE IF NOT EXISTS telescopes (id INTEGER PRIMARY KEY, shortname TEXT UNIQUE, record TEXT);
+CREATE TABLE IF NOT EXISTS mol_sources (mol_id INTEGER, source_id INTEGER, PRIMARY KEY (source_id,mol_id)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS mol_telescopes (mol_id INTEGER, scope_id INTEGER, PRIMARY KEY (scope_id,mol_id)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS mol_wavelengths (mol_id INTEGER, wavelength TEXT, PRIMARY KEY (wavelength,mol_id)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS mol_elements (mol_id INTEGER, element TEXT, n INTEGER, PRIMARY KEY (element,mol_id)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS molecules_year ON molecules (year);
+CREATE INDEX IF NOT EXISTS molecules_formula ON molecules (formula);
+CREATE INDEX IF NOT EXISTS molecules_natoms ON molecules (natoms);
+CREATE INDEX IF NOT EXISTS sources_type ON sources (type);
+CREATE INDEX IF NOT EXISTS mol_sources_mol ON mol_sources (mol_id);
+CREATE INDEX IF NOT EXISTS mol_telescopes_mol ON mol_telescopes (mol_id);
+CREATE INDEX IF NOT EXISTS mol_elements_mol ON mol_elements (mol_id);
+'''
 
-def source_pie_chart(my_list):
+class CensusDatabase(object):
 
 	'''
-	Makes a pie chart of the fraction of interstellar molecules detected in carbon stars, dark clouds, los clouds, star forming regions, and other types of sources
+	A census kept in a SQLite file, so that it can be queried without loading every molecule, and shared between processes.  write() stores a census (or any iterables of objects or records) in it, query() and count() run the same filters as query() as SQL, with count() also doing the grouping, and get_molecules() and load() turn what's stored back into objects.  Each thread gets its own connection, and the file is in WAL mode, so any number of readers can work alongside one writer.
 	'''
-
-	#Close an old figure if it exists and initialize a new figure
 	
-	plt.close('Source Pie Chart')
+	flags = ['neutral','cation','anion','radical','cyclic','fullerene','pah','ice','ppd','exgal','exo']
 	
-	fig = plt.figure(num='Source Pie Chart',figsize=(10,8))
+	els = ['H', 'He', 'C', 'O', 'N', 'S', 'P', 'Si', 'Cl', 'F', 'Mg', 'Na', 'Al', 'K', 'Fe', 'Ti', 'Ar', 'V', 'Ca']
 	
-	plt.ion()
+	#the columns count() can group by, and the joins it needs for each
+	
+	groups = {
+		'year'			:	('m.year',''),
+		'natoms'		:	('m.natoms',''),
+		'formula'		:	('m.formula',''),
+		'source'		:	('s.name','JOIN mol_sources ms ON ms.mol_id = m.id JOIN sources s ON s.id = ms.source_id'),
+		'source_type'	:	('s.type','JOIN mol_sources ms ON ms.mol_id = m.id JOIN sources s ON s.id = ms.source_id'),
+		'telescope'		:	('t.shortname','JOIN mol_telescopes mt ON mt.mol_id = m.id JOIN telescopes t ON t.id = mt.scope_id'),
+		'wavelength'	:	('mw.wavelength','JOIN mol_wavelengths mw ON mw.mol_id = m.id'),
+		'element'		:	('me.element','JOIN mol_elements me ON me.mol_id = m.id'),
+		}
+
+	def __init__(self,filename,timeout=30):
 	
-	#set some font defaults
+		self.filename = filename
+		self.timeout = timeout
+		self.local = threading.local()
+		
+		with self.get_connection() as conn:
+		
+			conn.executescript(db_schema)
+		
+		return
+		
+	def get_connection(self):
 	
-	fontparams = {'size':24, 'family':'sans-serif','sans-serif':['Helvetica']}
+		'''
+		Returns this thread's connection to the database, opening it if need be.
+		'''
+		
+		conn = getattr(self.local,'conn',None)
 	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')
+		if conn is None:
+		
+			conn = sqlite3.connect(self.filename,timeout=self.timeout)
+			
+			conn.execute('PRAGMA journal_mode=WAL')
+			conn.execute('PRAGMA synchronous=NORMAL')
+			
+			self.local.conn = conn
+			
+		return conn
+		
+	def close(self):
 	
-	#gather the data
-
-	my_dict = {
+		'''
+		Closes this thread's connection.
+		'''
 	
-		'Carbon Star' 	: 	[0],
-		'Dark Cloud'	:	[0],
-		'LOS Cloud'	:	[0],
-		'SFR'	:	[0],
-		'Other'		:	[0],		
-		}
+		conn = getattr(self.local,'conn',None)
 		
-	#we have to be a little careful here, because for a given source, there can be two SFRs listed, and we only want to credit it once
+		if conn is not None:
 		
-	for mol in my_list:
-	
-		#we'll make a dictionary here to flag if we've credited things already
+			conn.close()
+			
+			self.local.conn = None
+			
+		return
 		
-		credit_dict = {
-	
-			'Carbon Star' 	: 	False,
-			'Dark Cloud'	:	False,
-			'LOS Cloud'	:	False,
-			'SFR'	:	False,
-			'Other'		:	False,		
-			}		
+	def write(self,census=None,mol_list=None,source_list=None,scopes_list=None,batch_size=10000):
 	
-		for source in mol.sources:
+		'''
+		Replaces the contents of the database with census (the main one by default), or with mol_list, source_list, and scopes_list, which can be any iterables of objects or records from to_record, including generators.  Everything is written in one transaction, batch_size records at a time, so readers see either the old census or the new one.  Returns the number of molecules written.
+		'''
 		
-			if source.type in my_dict:
+		if mol_list is None:
+		
+			census = globals()['census'] if census is None else census
 			
-				if credit_dict[source.type] is False:
+			mol_list, source_list, scopes_list = census.mol_list, census.source_list, census.scopes_list
 			
-					my_dict[source.type][0] += 1
+		conn = self.get_connection()
+		
+		n = 0
+		
+		with conn:
+		
+			for x in ['mol_sources','mol_telescopes','mol_wavelengths','mol_elements','molecules','sources','telescopes']:
+			
+				conn.execute('DELETE FROM {}' .format(x))
+				
+			source_ids = {}
+			scope_ids = {}
+				
+			for batch in batches(source_list,batch_size):
+			
+				batch = [x if isinstance(x,dict) else to_record(x,'sources') for x in batch]
+				
+				for x in batch:
+				
+					source_ids[x['name']] = len(source_ids) + 1
+			
+				conn.executemany('INSERT INTO sources VALUES (?,?,?,?)',[(source_ids[x['name']],x['name'],x['type'],json.dumps(x,ensure_ascii=False)) for x in batch])
+				
+			for batch in batches(scopes_list,batch_size):
+			
+				batch = [x if isinstance(x,dict) else to_record(x,'telescopes') for x in batch]
+				
+				for x in batch:
+				
+					scope_ids[x['shortname']] = len(scope_ids) + 1
+			
+				conn.executemany('INSERT INTO telescopes VALUES (?,?,?)',[(scope_ids[x['shortname']],x['shortname'],json.dumps(x,ensure_ascii=False)) for x in batch])
+				
+			for batch in batches(mol_list,batch_size):
+			
+				batch = [x if isinstance(x,dict) else to_record(x,'molecules') for x in batch]
+				
+				rows = []
+				members = {'mol_sources' : [], 'mol_telescopes' : [], 'mol_wavelengths' : [], 'mol_elements' : []}
+				
+				for x in batch:
+				
+					n += 1
 					
-					credit_dict[source.type] = True
+					rows.append([n,x['label'],x['formula'],x['year'],x['natoms']] + [detection_state(x[y]) for y in self.flags] + [json.dumps(x,ensure_ascii=False)])
+					
+					#sources and telescopes that aren't in the tables yet are added bare, the same way from_record does
+					
+					for y in x['sources']:
+					
+						if y not in source_ids:
+						
+							source_ids[y] = len(source_ids) + 1
+							
+							conn.execute('INSERT INTO sources VALUES (?,?,?,?)',(source_ids[y],y,None,json.dumps(to_record(Source(y),'sources'))))
+							
+						members['mol_sources'].append((n,source_ids[y]))
+							
+					for y in x['telescopes']:
+					
+						if y not in scope_ids:
+						
+							scope_ids[y] = len(scope_ids) + 1
+							
+							conn.execute('INSERT INTO telescopes VALUES (?,?,?)',(scope_ids[y],y,json.dumps(to_record(Telescope(y,y),'telescopes'))))
+							
+						members['mol_telescopes'].append((n,scope_ids[y]))
+						
+					members['mol_wavelengths'] += [(n,y) for y in set(x['wavelengths'])]
+					members['mol_elements'] += [(n,y,x[y]) for y in self.els if x[y] != 0]
 				
-			else:
+				conn.executemany('INSERT INTO molecules VALUES ({})' .format(','.join(['?']*len(rows[0]))),rows)
+				
+				for x in members:
+				
+					conn.executemany('INSERT OR IGNORE INTO {} VALUES ({})' .format(x,','.join(['?']*(3 if x == 'mol_elements' else 2))),members[x])
+				
+		conn.execute('ANALYZE')
+		
+		return n
+		
+	def where(self,**kwargs):
+	
+		'''
+		Turns the filters query() takes into a SQL WHERE clause on molecules m and its parameters.  Raises TypeError for an unknown filter or element, like query() does.
+		'''
+		
+		for x in kwargs:
+		
+			if x not in self.flags and x not in ['label','formula','year','syear','eyear','natoms','min_natoms','max_natoms','source','source_type','telescope','wavelength','element']:
+			
+				raise TypeError('query() got an unexpected filter {}' .format(x))
+				
+		elements = kwargs.get('element',[])
+		
+		if isinstance(elements,str):
+		
+			elements = [elements]
+			
+		for x in elements:
+		
+			if x not in self.els:
+			
+				raise TypeError('query() got an unknown element {}' .format(x))
+				
+		ops = {'label' : 'm.label = ?', 'formula' : 'm.formula = ?', 'year' : 'm.year = ?', 'syear' : 'm.year >= ?', 'eyear' : 'm.year <= ?', 'natoms' : 'm.natoms = ?', 'min_natoms' : 'm.natoms >= ?', 'max_natoms' : 'm.natoms <= ?'}
+		
+		members = {
+			'source'		:	'm.id IN (SELECT ms.mol_id FROM mol_sources ms JOIN sources s ON s.id = ms.source_id WHERE s.name = ?)',
+			'source_type'	:	'm.id IN (SELECT ms.mol_id FROM mol_sources ms JOIN sources s ON s.id = ms.source_id WHERE s.type = ?)',
+			'telescope'		:	'm.id IN (SELECT mt.mol_id FROM mol_telescopes mt JOIN telescopes t ON t.id = mt.scope_id WHERE t.shortname = ?)',
+			'wavelength'	:	'm.id IN (SELECT mol_id FROM mol_wavelengths WHERE wavelength = ?)',
+			}
+				
+		clauses = []
+		params = []
+		
+		for x in ops:
+		
+			if x in kwargs:
+			
+				clauses.append(ops[x])
+				params.append(kwargs[x])
+				
+		for x in members:
+		
+			if x in kwargs:
+			
+				clauses.append(members[x])
+				params.append(kwargs[x])
+				
+		for x in elements:
+		
+			clauses.append('m.id IN (SELECT mol_id FROM mol_elements WHERE element = ?)')
+			params.append(x)
+			
+		#the flags are stored as their detection_state, so 'Tentative' counts as detected here too
+			
+		for x in self.flags:
+		
+			if x in kwargs:
+			
+				clauses.append('m.{} {} 0' .format(x,'>' if bool(kwargs[x]) is True else '='))
+				
+		return ('WHERE ' + ' AND '.join(clauses)) if len(clauses) > 0 else '', params
+		
+	def query(self,**kwargs):
+	
+		'''
+		Returns the labels of the stored molecules that match all of the given filters, in the order they were written.  Takes the same filters as query(), e.g. db.query(source='TMC-1',syear=2010,element='N').
+		'''
+		
+		where, params = self.where(**kwargs)
+		
+		return [x[0] for x in self.get_connection().execute('SELECT m.label FROM molecules m {} ORDER BY m.id' .format(where),params)]
+		
+	def count(self,by=None,**kwargs):
+	
+		'''
+		Counts the stored molecules that match the given filters, which are the same as query()'s.  With by set to one of 'year', 'natoms', 'formula', 'source', 'source_type', 'telescope', 'wavelength', or 'element', returns a dictionary of {value : number of molecules} instead, e.g. db.count(by='year',source_type='Dark Cloud').  A molecule seen in several sources (or with several telescopes, and so on) is counted once under each.
+		'''
+		
+		where, params = self.where(**kwargs)
+		
+		conn = self.get_connection()
+		
+		if by is None:
+		
+			return conn.execute('SELECT COUNT(*) FROM molecules m {}' .format(where),params).fetchone()[0]
+			
+		if by not in self.groups:
+		
+			raise ValueError('can only count by one of {}, not {}' .format(', '.join(self.groups),by))
+			
+		column, joins = self.groups[by]
+		
+		return dict(conn.execute('SELECT {0}, COUNT(DISTINCT m.id) FROM molecules m {1} {2} GROUP BY {0} ORDER BY {0}' .format(column,joins,where),params).fetchall())
+		
+	def get_records(self,kind='molecules',**kwargs):
+	
+		'''
+		Returns the stored records of the given kind.  For molecules, only those matching the filters (the same as query()'s) are read.
+		'''
+		
+		conn = self.get_connection()
+		
+		if kind == 'molecules':
+		
+			where, params = self.where(**kwargs)
+		
+			rows = conn.execute('SELECT m.record FROM molecules m {} ORDER BY m.id' .format(where),params)
+			
+		elif kind in ['sources','telescopes']:
+		
+			rows = conn.execute('SELECT record FROM {} ORDER BY id' .format(kind))
+			
+		else:
+		
+			raise ValueError('kind must be molecules, sources, or telescopes, not {}' .format(kind))
+			
+		return [json.loads(x[0]) for x in rows]
+		
+	def get_molecules(self,**kwargs):
+	
+		'''
+		Returns new Molecule objects for just the stored molecules that match the given filters, along with new objects for only the sources and telescopes they refer to.
+		'''
+		
+		records = self.get_records(**kwargs)
+		
+		conn = self.get_connection()
+		
+		names = sorted(set(y for x in records for y in x['sources']))
+		shortnames = sorted(set(y for x in records for y in x['telescopes']))
+		
+		sources = {}
+		scopes = {}
+		
+		#sqlite only allows so many parameters in one statement
+		
+		for batch in batches(names,500):
+		
+			for x in conn.execute('SELECT record FROM sources WHERE name IN ({})' .format(','.join(['?']*len(batch))),batch):
 			
-				if credit_dict['Other'] is False:
+				source = from_record(json.loads(x[0]),'sources')
+				
+				sources[source.name] = source
+				
+		for batch in batches(shortnames,500):
+		
+			for x in conn.execute('SELECT record FROM telescopes WHERE shortname IN ({})' .format(','.join(['?']*len(batch))),batch):
 			
-					my_dict['Other'][0] += 1	
-					
-					credit_dict['Other'] = True
-	
-	nmols = len(my_list)
-	
-	for type in my_dict:
-	
-		my_dict[type].append(my_dict[type][0]/nmols)		
+				scope = from_record(json.loads(x[0]),'telescopes')
+				
+				scopes[scope.shortname] = scope
+				
+		return [from_record(x,'molecules',sources=sources,scopes=scopes) for x in records]
 		
-	labels = ['SFR','Carbon Star','Dark Cloud','Other','LOS Cloud']
-	
-	fracs = [my_dict[x][1] for x in labels]			
-
-	#set up a plot
-	
-	ax = plt.subplot(111)
-	
-	size = 0.1
-	
-	def getshift(x):
+	def load(self):
 	
-		return -(90-(360 - 360*x)/2)
+		'''
+		Reads the whole database back in as a new Census of new objects, with the source and telescope statistics updated.
+		'''
 		
-	def getper(x):
-	
-		return '{}' .format(int(100*x)) + r'\%'
-	
-	ax.pie([fracs[0],1.-fracs[0]],  colors=['dodgerblue','#EEEEEE'], radius=1, startangle=getshift(fracs[0]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
-	ax.pie([fracs[1],1.-fracs[1]],  colors=['darkorange','#EEEEEE'], radius=1-size-.02, startangle=getshift(fracs[1]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
-	ax.pie([fracs[2],1.-fracs[2]],  colors=['forestgreen','#EEEEEE'], radius=1-2*size-.04, startangle=getshift(fracs[2]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
-	ax.pie([fracs[3],1.-fracs[3]],  colors=['violet','#EEEEEE'], radius=1-3*size-.06, startangle=getshift(fracs[3]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
-	ax.pie([fracs[4],1.-fracs[4]],  colors=['red','#EEEEEE'], radius=1-4*size-.08, startangle=getshift(fracs[4]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+		return census_from_records(self.get_records('molecules'),self.get_records('sources'),self.get_records('telescopes'))
+		
+#############################################################
+#						Census Diff		 					#
+#############################################################
 
-	ax.annotate(r'\textbf{SFR}',xy=(0.5,0.11),xycoords='axes fraction',color='dodgerblue', ha='center',size=14)
-	ax.annotate(r'\textbf{Carbon Star}',xy=(0.5,0.16),xycoords='axes fraction',color='darkorange', ha='center',size=14)
-	ax.annotate(r'\textbf{Dark Cloud}',xy=(0.5,0.205),xycoords='axes fraction',color='forestgreen', ha='center',size=14)
-	ax.annotate(r'\textbf{Other}',xy=(0.5,0.255),xycoords='axes fraction',color='violet', ha='center',size=14)
-	ax.annotate(r'\textbf{LOS Cloud}',xy=(0.5,0.305),xycoords='axes fraction',color='red', ha='center',size=14)
-	
-	percents = ['\\textbf{' + '{:.1f}' .format((x*100)) + '}\%'  for x in fracs]
-	
-	ax.annotate(percents[4],xy=(0.51,0.68),xycoords='axes fraction',color='white', ha='center',size=12,)
-	ax.annotate(percents[3],xy=(0.51,0.725),xycoords='axes fraction',color='white', ha='center',size=12,)
-	ax.annotate(percents[2],xy=(0.51,0.775),xycoords='axes fraction',color='white', ha='center',size=12,)
-	ax.annotate(percents[1],xy=(0.51,0.825),xycoords='axes fraction',color='white', ha='center',size=12,)
-	ax.annotate(percents[0],xy=(0.51,0.87),xycoords='axes fraction',color='white', ha='center',size=12,)
-	
-	
-	plt.tight_layout()
-	plt.show()
-	
-	plt.savefig('source_pie_chart.pdf',format='pdf',transparent=True,bbox_inches='tight',pad_inches=-.65)
+#the field that pairs up records of each kind between two versions of the census
 
-	return	
-	
-def indiv_source_pie_chart(my_list):
+record_keys = {'molecules' : 'label', 'sources' : 'name', 'telescopes' : 'shortname'}
+
+def record_digest(record,fields):
 
 	'''
-	Makes a pie chart of the fraction of interstellar molecules detected in IRC+10216, TMC-1, Orion, and Sgr
+	Returns a sha1 digest of a record, taken over its fields in the given order (an itemgetter of them, see diff_records), so two records with the same contents always have the same digest no matter how they were made.
 	'''
-
-	#Close an old figure if it exists and initialize a new figure
 	
-	plt.close('Individual Source Pie Chart')
+	#marshal is much quicker than json here, and version 0 writes equal strings the same way whether or not they've been interned
 	
-	fig = plt.figure(num='Individual Source Pie Chart',figsize=(10,8))
+	return hashlib.sha1(marshal.dumps(fields(record),0)).digest()
 	
-	plt.ion()
-	
-	#set some font defaults
+def diff_records(old,new,kind='molecules',batch_size=10000):
+
+	'''
+	Compares two versions of the molecules, sources, or telescopes, given as any iterables of objects or records from to_record (including generators, e.g. from read_records).  Records are paired up by label, name, or shortname and compared by digest, so the work is linear in the number of records, and only records that actually changed get compared field by field.  Returns a dictionary of
 	
-	fontparams = {'size':24, 'family':'sans-serif','sans-serif':['Helvetica']}
+		'added'		:	{key : record} for records only in new
+		'removed'	:	{key : record} for records only in old
+		'changed'	:	{key : {field : [old value, new value]}} for records in both that differ
+	'''
 	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')
+	key = record_keys[kind]
+	fields = record_fields[kind] + (['sources','telescopes'] if kind == 'molecules' else [])
+	values = itemgetter(*fields)
 	
-	#gather the data
-
-	my_dict = {
+	old_index = {}
 	
-		'IRC+10216' 	: 	[0],
-		'TMC-1'	:	[0],
-		'Orion'	:	[0],
-		'Sgr B2'	:	[0],
-		'Other'		:	[0],		
-		}
-		
-	for mol in my_list:
+	for batch in batches(old,batch_size):
 	
-		for source in mol.sources:
-		
-			other = False
+		for x in batch:
 		
-			if source == IRC10216:
-				my_dict['IRC+10216'][0] += 1
-				other=True
-			if source == TMC1:
-				my_dict['TMC-1'][0] += 1
-				other=True
-			if source == Orion:
-				my_dict['Orion'][0] += 1
-				other=True
-			if source == SgrB2:
-				my_dict['Sgr B2'][0] += 1
-				other=True
-			if other is False:
-				my_dict['Other'][0] += 1		
-								
-	nmols = len(my_list)
+			x = x if isinstance(x,dict) else to_record(x,kind)
+			
+			old_index[x[key]] = (record_digest(x,values),x)
+			
+	added = {}
+	changed = {}
 	
-	for type in my_dict:
+	for batch in batches(new,batch_size):
 	
-		my_dict[type].append(my_dict[type][0]/nmols)		
+		for x in batch:
 		
-	labels = ['Other','Sgr B2','IRC+10216','TMC-1','Orion']
+			x = x if isinstance(x,dict) else to_record(x,kind)
+			
+			previous = old_index.pop(x[key],None)
+			
+			if previous is None:
+			
+				added[x[key]] = x
+				
+			elif previous[0] != record_digest(x,values):
+			
+				changes = {y : [previous[1][y],x[y]] for y in fields if previous[1][y] != x[y]}
+				
+				#things like 1 and True are the same to Python but not to the digest
+				
+				if len(changes) > 0:
+				
+					changed[x[key]] = changes
+				
+	removed = {x : old_index[x][1] for x in old_index}
 	
-	fracs = [my_dict[x][1] for x in labels]			
+	return {'added' : added, 'removed' : removed, 'changed' : changed}
 	
-	print(my_dict)
+def diff_figures(old,new):
 
-	#set up a plot
-	
-	ax = plt.subplot(111)
+	'''
+	Compares two sets of figure aggregates from figure_data.  Returns {figure : {key : [old, new, change]}} for every number that differs, with anything missing from one side counted as 0.  Cumulative detections are keyed by year.
+	'''
 	
-	size = 0.1
+	diffs = {}
 	
-	def getshift(x):
+	for fig in sorted(set(old) | set(new)):
 	
-		return -(90-(360 - 360*x)/2)
+		a = old.get(fig,{})
+		b = new.get(fig,{})
 		
-	def getper(x):
-	
-		return '{}' .format(int(100*x)) + r'\%'
+		if fig == 'cumulative_detections':
+		
+			a = dict(zip(a.get('years',[]),a.get('detections',[])))
+			b = dict(zip(b.get('years',[]),b.get('detections',[])))
+			
+		changes = {x : [a.get(x,0),b.get(x,0),b.get(x,0) - a.get(x,0)] for x in set(a) | set(b) if a.get(x,0) != b.get(x,0)}
+		
+		if len(changes) > 0:
+		
+			diffs[fig] = {x : changes[x] for x in sorted(changes,key=str)}
+			
+	return diffs
 	
-	ax.pie([fracs[0],1.-fracs[0]],  colors=['dodgerblue','#EEEEEE'], radius=1, startangle=getshift(fracs[0]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
-	ax.pie([fracs[1],1.-fracs[1]],  colors=['darkorange','#EEEEEE'], radius=1-size-.02, startangle=getshift(fracs[1]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
-	ax.pie([fracs[2],1.-fracs[2]],  colors=['forestgreen','#EEEEEE'], radius=1-2*size-.04, startangle=getshift(fracs[2]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
-	ax.pie([fracs[3],1.-fracs[3]],  colors=['violet','#EEEEEE'], radius=1-3*size-.06, startangle=getshift(fracs[3]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
-	ax.pie([fracs[4],1.-fracs[4]],  colors=['red','#EEEEEE'], radius=1-4*size-.08, startangle=getshift(fracs[4]), wedgeprops=dict(width=size,edgecolor='w',linewidth=1))
+def diff_census(old,new):
 
-	ax.annotate(r'\textbf{Other}',xy=(0.5,0.11),xycoords='axes fraction',color='dodgerblue', ha='center',size=14)
-	ax.annotate(r'\textbf{Sgr B2}',xy=(0.5,0.16),xycoords='axes fraction',color='darkorange', ha='center',size=14)
-	ax.annotate(r'\textbf{IRC+10216}',xy=(0.5,0.205),xycoords='axes fraction',color='forestgreen', ha='center',size=14)
-	ax.annotate(r'\textbf{TMC-1}',xy=(0.5,0.255),xycoords='axes fraction',color='violet', ha='center',size=14)
-	ax.annotate(r'\textbf{Orion}',xy=(0.5,0.305),xycoords='axes fraction',color='red', ha='center',size=14)
+	'''
+	Compares two versions of the census (Census objects, e.g. from import_census or CensusDatabase.load).  Returns a dictionary with the diff_records of the molecules, sources, and telescopes, and the diff_figures of the figure aggregates.  Turn it into something readable with changelog().
+	'''
 	
-	percents = ['\\textbf{' + '{:.1f}' .format((x*100)) + '}\%'  for x in fracs]
+	diff = {kind : diff_records(x,y,kind) for kind, x, y in [('molecules',old.mol_list,new.mol_list),('sources',old.source_list,new.source_list),('telescopes',old.scopes_list,new.scopes_list)]}
 	
-	ax.annotate(percents[4],xy=(0.51,0.68),xycoords='axes fraction',color='white', ha='center',size=12,)
-	ax.annotate(percents[3],xy=(0.51,0.725),xycoords='axes fraction',color='white', ha='center',size=12,)
-	ax.annotate(percents[2],xy=(0.51,0.775),xycoords='axes fraction',color='white', ha='center',size=12,)
-	ax.annotate(percents[1],xy=(0.51,0.825),xycoords='axes fraction',color='white', ha='center',size=12,)
-	ax.annotate(percents[0],xy=(0.51,0.87),xycoords='axes fraction',color='white', ha='center',size=12,)
+	if old.get_hash() == new.get_hash():
 	
+		diff['figures'] = {}
+		
+	else:
+		
+		diff['figures'] = diff_figures(figure_data(old.mol_list),figure_data(new.mol_list))
 	
-	plt.tight_layout()
-	plt.show()
+	return diff
 	
-	plt.savefig('indiv_source_pie_chart.pdf',format='pdf',transparent=True,bbox_inches='tight',pad_inches=-.65)
-
-	return		
-
-def mol_type_by_source_type(my_list):
+def changelog(diff):
 
 	'''
-	Generates four pie charts, one for each generalized source type, with the wedges for the types of molecules detected first in each type
+	Returns a list of lines describing a diff from diff_census or diff_records (of molecules): new and removed molecules, moved detection years, new and dropped isotopologues, other changed fields, and then the changes to the figure aggregates.
 	'''
-	#Close an old figure if it exists and initialize a new figure
-	
-	plt.close('Molecule Type by Source Type')
-	
-	fig,axs = plt.subplots(2,2,num='Molecule Type by Source Type',figsize=(15,12))
 	
-	plt.ion()
+	#a diff_records diff on its own is taken to be of molecules
 	
-	#set some font defaults
+	if 'added' in diff:
 	
-	fontparams = {'size':26, 'family':'sans-serif','sans-serif':['Helvetica']}
+		diff = {'molecules' : diff}
 	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')	
-
-	#collect the data
+	lines = []
 	
-	type_dict = {
+	for kind in ['molecules','sources','telescopes']:
 	
-		'Carbon Star' 	: 	{'Anion': 0, 'Cation': 0, 'Cyclic': 0, 'Neutral': 0, 'Radical': 0},
-		'Dark Cloud'	:	{'Anion': 0, 'Cation': 0, 'Cyclic': 0, 'Neutral': 0, 'Radical': 0},
-		'LOS Cloud'	:	{'Anion': 0, 'Cation': 0, 'Cyclic': 0, 'Neutral': 0, 'Radical': 0},
-		'SFR'	:	{'Anion': 0, 'Cation': 0, 'Cyclic': 0, 'Neutral': 0, 'Radical': 0},
+		if kind not in diff:
 		
-		}
-	
-	for mol in my_list:
+			continue
+			
+		key = record_keys[kind]
+		noun = kind[:-1]
 	
-		#we'll make a dictionary here to flag if we've credited things already
+		for x in diff[kind]['added'].values():
 		
-		credit_dict = {
-	
-			'Carbon Star' 	: 	False,
-			'Dark Cloud'	:	False,
-			'LOS Cloud'	:	False,
-			'SFR'	:	False,
+			lines.append('New {}: {}{}' .format(noun,x[key],' ({})' .format(x['year']) if kind == 'molecules' else ''))
 			
-			}		
-	
-		for source in mol.sources:
+		for x in diff[kind]['removed'].values():
 		
-			if source.type in type_dict:
+			lines.append('Removed {}: {}' .format(noun,x[key]))
 			
-				if credit_dict[source.type] is False:
+		for x, changes in diff[kind]['changed'].items():
+		
+			for field, (a, b) in changes.items():
+			
+				if field == 'year':
 				
-					if mol.anion is True:
+					lines.append('Moved {} from {} to {}' .format(x,a,b))
 					
-						type_dict[source.type]['Anion'] += 1
-						
-					if mol.cation is True:
+				elif field in ['isos','ppd_isos']:
+				
+					a = [y.strip() for y in (a or '').split(',') if y.strip() != '']
+					b = [y.strip() for y in (b or '').split(',') if y.strip() != '']
 					
-						type_dict[source.type]['Cation'] += 1
-
-					if mol.cyclic is True:
+					where = ' in protoplanetary disks' if field == 'ppd_isos' else ''
 					
-						type_dict[source.type]['Cyclic'] += 1	
-						
-					if mol.neutral is True:
+					if len([y for y in b if y not in a]) > 0:
 					
-						type_dict[source.type]['Neutral'] += 1
+						lines.append('New isotopologues of {}{}: {}' .format(x,where,', '.join([y for y in b if y not in a])))
 						
-					if mol.radical is True:
+					if len([y for y in a if y not in b]) > 0:
 					
-						type_dict[source.type]['Radical'] += 1																
-
-					credit_dict[source.type] = True
+						lines.append('Dropped isotopologues of {}{}: {}' .format(x,where,', '.join([y for y in a if y not in b])))
 					
-	#make the pie charts
-	
-	#Carbon Stars
-	
-	carbon_data = [
+				else:
+				
+					lines.append('Changed {} of {}: {} -> {}' .format(field,x,a,b))
+					
+	for fig, changes in diff.get('figures',{}).items():
 	
-		type_dict['Carbon Star']['Anion'], 
-		#type_dict['Carbon Star']['Cation'],
-		type_dict['Carbon Star']['Cyclic'], 
-		type_dict['Carbon Star']['Neutral'], 
-		type_dict['Carbon Star']['Radical'],
-		
-		]
+		for x, (a, b, change) in changes.items():
 		
-	carbon_colors = [
-	
-		'darkorange',
-		#'forestgreen',
-		'violet',
-		'dodgerblue',
-		'red',
+			lines.append('{} {}: {} -> {} ({:+})' .format(fig,x,a,b,change))
+			
+	return lines
 	
-		]		
-		
-	#Dark Clouds
+#############################################################
+#					Detection Statistics					#
+#############################################################
+
+def resample_detections(list,nboot=10000,seed=None,**fixed):
+
+	'''
+	Bootstraps the detection years of the molecules in list that match fixed (any of the DetectionCube axes, e.g. facility='GBT').  Each of the nboot resamples draws as many molecules as there are, with replacement, which comes down to one multinomial draw over the detections per year, so they're all made at once.  Returns the years of the cube and an array of cumulative detections by year, with the census itself in row 0 and one resample in each row after it.  seed is passed on to numpy's default_rng, so the same seed gives the same resamples.
+	'''
 	
-	dark_data = [
+	cube = get_census(list).get_cube()
 	
-		type_dict['Dark Cloud']['Anion'], 
-		type_dict['Dark Cloud']['Cation'], 
-		type_dict['Dark Cloud']['Cyclic'], 
-		type_dict['Dark Cloud']['Neutral'], 
-		type_dict['Dark Cloud']['Radical'],
-		
-		]
-		
-	dark_colors = [
+	dets = cube.counts(['year'],**fixed)
 	
-		'darkorange',
-		'forestgreen',
-		'violet',
-		'dodgerblue',
-		'red',
+	years = np.arange(cube.syear,cube.eyear+1)
 	
-		]		
-		
-	#LOS Clouds
+	total = int(dets.sum())
 	
-	los_data = [
+	if total == 0:
 	
-		#type_dict['LOS Cloud']['Anion'], 
-		type_dict['LOS Cloud']['Cation'], 
-		#type_dict['LOS Cloud']['Cyclic'], 
-		type_dict['LOS Cloud']['Neutral'], 
-		type_dict['LOS Cloud']['Radical'],
+		draws = np.zeros((nboot,len(dets)),dtype=np.int64)
 		
-		]
+	else:
+	
+		draws = np.random.default_rng(seed).multinomial(total,dets/total,size=nboot)
 		
-	los_colors = [
+	return years, np.cumsum(np.concatenate([dets[None,:],draws]),axis=1)
+	
+def rate_weights(years,syear,eyear):
+
+	'''
+	Returns a (years x windows) array of weights that turns cumulative detections by year into the slope of a linear least-squares fit over each window from syear to eyear (inclusive), with a single matrix product.  syear and eyear can be arrays of any matching shape; windows are clipped to years, and windows less than two years long get nan weights, as in DetectionCube.rate.
+	'''
 	
-		#'darkorange',
-		'forestgreen',
-		#'violet',
-		'dodgerblue',
-		'red',
+	syear, eyear = np.broadcast_arrays(np.asarray(syear),np.asarray(eyear))
 	
-		]		
+	s = np.clip(syear.ravel() - years[0],0,len(years))
+	e = np.maximum(s,np.clip(eyear.ravel() - years[0] + 1,0,len(years)))
+	
+	t = np.arange(len(years),dtype=float)[:,None]
+	
+	inside = (t >= s) & (t < e)
+	
+	n = e - s
+	
+	with np.errstate(divide='ignore',invalid='ignore'):
+	
+		centered = np.where(inside,t - (s + e - 1)/2.,0.)
 		
-	#SFRs
+		weights = centered/(centered**2).sum(axis=0)
 	
-	sfr_data = [
+	weights[:,n < 2] = np.nan
 	
-		#type_dict['SFR']['Anion'], 
-		type_dict['SFR']['Cation'], 
-		type_dict['SFR']['Cyclic'], 
-		type_dict['SFR']['Neutral'], 
-		type_dict['SFR']['Radical'],
+	return weights
+	
+def bootstrap_rates(list,syear,eyear=None,nboot=10000,ci=95,seed=None,**fixed):
+
+	'''
+	Returns the detection rate (detections/year) from syear to eyear (this year by default) for the molecules in list matching fixed, as DetectionCube.rate gives it, along with the lower and upper ends of its ci% confidence interval from nboot bootstrap resamples of the detection years (see resample_detections).  syear and eyear can be arrays to get many windows at once; all of them are fit to every resample with a single matrix product.  For example, the rates since 1968 and 2005 in cumu_det_plot:
+	
+		rate, low, high = bootstrap_rates(full_list,[1968,2005])
 		
-		]		
-						
-	sfr_colors = [
+	and the GBT's, as in cumu_det_facility:
 	
-		#'darkorange',
-		'forestgreen',
-		'violet',
-		'dodgerblue',
-		'red',
+		rate, low, high = bootstrap_rates(full_list,GBT.built,facility=GBT.shortname)
+	'''
 	
-		]
+	if ci <= 0 or ci >= 100:
 	
-	types = [
+		raise ValueError('ci is a percentage between 0 and 100, not {}' .format(ci))
 	
-		'Anion',
-		'Cation',
-		'Cyclic',
-		'Neutral',
-		'Radical',
+	years, cumulative = resample_detections(list,nboot=nboot,seed=seed,**fixed)
 	
-		]		
+	shape = np.broadcast(np.asarray(syear),np.asarray(eyear if eyear is not None else years[-1])).shape
 	
-	axs[0,0].pie(carbon_data,labels=carbon_data,colors=carbon_colors, labeldistance=0.8, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})	
-	axs[0,0].annotate(r'\textbf{Carbon Stars}',xy=(0.5,1.0),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
+	slopes = cumulative @ rate_weights(years,syear,eyear if eyear is not None else years[-1])
 	
-	wedges, texts = axs[0,1].pie(dark_data,labels=dark_data,colors=dark_colors, labeldistance=0.8, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})	
-	axs[0,1].annotate(r'\textbf{Dark Clouds}',xy=(0.5,1.0),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
+	low, high = np.percentile(slopes[1:],[(100-ci)/2.,(100+ci)/2.],axis=0)
+	
+	return slopes[0].reshape(shape)[()], low.reshape(shape)[()], high.reshape(shape)[()]
+	
+def fit_line(t,y,w=None):
 
-	axs[1,0].pie(los_data,labels=los_data,colors=los_colors, labeldistance=0.8, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})	
-	axs[1,0].annotate(r'\textbf{LOS Clouds}',xy=(0.5,1.0),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
+	'''
+	Fits y = a + b*t by least squares to every row of y at once, counting only the points where w (an array of booleans like y) is True, if it's given.  Returns arrays of a and b, which are nan for rows with fewer than two points to fit.
+	'''
 	
-	axs[1,1].pie(sfr_data,labels=sfr_data,colors=sfr_colors, labeldistance=0.8, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})		
-	axs[1,1].annotate(r'\textbf{SFRs}',xy=(0.5,1.0),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
+	w = np.ones(y.shape) if w is None else w.astype(float)
 	
+	n = w.sum(axis=1)
+	St = w @ t
+	Stt = w @ (t*t)
+	Sy = (w*y).sum(axis=1)
+	Sty = (w*y) @ t
 	
-	axs[0,1].legend(wedges, types,
-          title="Molecule Types",
-          loc="center left",
-          bbox_to_anchor=(1, 0, 0.5, 1))
+	den = n*Stt - St**2
 	
-	fig.tight_layout()
+	with np.errstate(divide='ignore',invalid='ignore'):
 	
-	fig.subplots_adjust(wspace=-0.3, hspace=0)
+		b = np.where(den > 0,(n*Sty - St*Sy)/den,np.nan)
+		a = np.where(den > 0,(Sy - b*St)/n,np.nan)
 	
-	plt.show()
+	return a, b
 	
-	plt.savefig('mol_type_by_source_type.pdf',format='pdf',transparent=True,bbox_inches='tight')			
+#the growth models forecast_detections fits, each as a function of the time since the start of the fit and the fitted parameters, one row of them per curve
 
-	return 	
+growth_models = {
+	'linear'		:	lambda t, p: p[:,0,None] + p[:,1,None]*t,
+	'exponential'	:	lambda t, p: p[:,0,None]*np.exp(p[:,1,None]*t),
+	'logistic'		:	lambda t, p: p[:,0,None]/(1 + np.exp(-p[:,1,None]*(t - p[:,2,None]))),
+	}
 	
-def du_by_source_type(my_list):
+def fit_growth(t,y,model='linear',niter=25):
 
 	'''
-	Makes a KDE plot of the dus in each source type
+	Fits one of growth_models to every row of y (cumulative detections at times t) at once, and returns the parameters as an array with one row per curve:
+	
+		linear			a, b		y = a + b*t
+		exponential		a, b		y = a*exp(b*t), fit as a line to log(y)
+		logistic		K, r, t0	y = K/(1 + exp(-r*(t - t0)))
+		
+	For a given K, the logistic model is also a line, in log(K/y - 1), so each curve's K (somewhere between just above its last value and a hundred times it) is found with a golden-section search on the squared error, and the fit is then refined with Levenberg-Marquardt, each run on all of the curves together for niter steps.
 	'''
 	
-	#gather the data
-
-	my_dict = {
+	y = y.astype(float)
 	
-		'Carbon Star' 	: 	[],
-		'Dark Cloud'	:	[],
-		'LOS Cloud'	:	[],
-		'SFR'	:	[],	
-		}
+	if model == 'linear':
+	
+		return np.stack(fit_line(t,y),axis=1)
 		
-	#we have to be a little careful here, because for a given source, there can be two SFRs listed, and we only want to credit it once
+	#the rest can only fit the years with some detections
 		
-	for mol in my_list:
+	w = y > 0
 	
-		#we'll make a dictionary here to flag if we've credited things already
+	logy = np.log(np.where(w,y,1.))
+	
+	if model == 'exponential':
+	
+		a, b = fit_line(t,logy,w)
 		
-		credit_dict = {
+		return np.stack([np.exp(a),b],axis=1)
+		
+	if model != 'logistic':
 	
-			'Carbon Star' 	: 	False,
-			'Dark Cloud'	:	False,
-			'LOS Cloud'	:	False,
-			'SFR'	:	False,	
-			}		
+		raise KeyError('{} is not one of the growth models ({})' .format(model,', '.join(growth_models)))
+		
+	def fit(u):
 	
-		if mol.du is None or mol.fullerene is True:
+		#fit the line for K = exp(u), and return the squared error along with the parameters
+	
+		K = np.exp(u)
+	
+		z = np.log(np.maximum(K[:,None] - y,1e-300)) - logy
 		
-			continue
+		a, b = fit_line(t,z,w)
 		
-		for source in mol.sources:
+		with np.errstate(divide='ignore',invalid='ignore'):
 		
-			if source.type in my_dict:
-			
-				if credit_dict[source.type] is False:
-			
-					my_dict[source.type].append(mol.du)
-					
-					credit_dict[source.type] = True
+			params = np.stack([K,-b,-a/b],axis=1)
+		
+		with np.errstate(over='ignore'):
+		
+			sse = ((growth_models['logistic'](t,params) - y)**2).sum(axis=1)
+		
+		return np.where(np.isnan(sse),np.inf,sse), params
+		
+	lo = np.log(np.maximum(y.max(axis=1),1.)*1.001)
+	hi = lo + np.log(100.)
 	
-	plt.close('DU by Source Type')
+	g = (np.sqrt(5.) - 1)/2.
 	
-	fig = plt.figure(num='DU by Source Type',figsize=(10,8))
+	u1 = hi - g*(hi - lo)
+	u2 = lo + g*(hi - lo)
+	f1 = fit(u1)[0]
+	f2 = fit(u2)[0]
 	
-	plt.ion()
+	for i in range(niter):
+	
+		#keep the side of the bracket with the smaller error, and try one new point inside it
+	
+		left = f1 < f2
+		
+		hi = np.where(left,u2,hi)
+		lo = np.where(left,lo,u1)
+		
+		u = np.where(left,hi - g*(hi - lo),lo + g*(hi - lo))
+		f = fit(u)[0]
+		
+		u1, f1, u2, f2 = np.where(left,u,u2), np.where(left,f,f2), np.where(left,u1,u), np.where(left,f1,f)
+		
+	sse, params = fit(np.where(f1 < f2,u1,u2))
 	
-	#set some font defaults
+	#that's the best K for the straight-line fit, which isn't quite the least-squares fit to y itself, so finish off with Levenberg-Marquardt steps on all three parameters, again for every curve at once
 	
-	fontparams = {'size':24, 'family':'sans-serif','sans-serif':['Helvetica']}
+	params = np.where(np.isfinite(params),params,0.)
+	damping = np.full(len(y),1e-3)
 	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')		
-
-	#load up an axis
+	for i in range(niter):
 	
-	ax = fig.add_subplot(111)
-
-	ax.tick_params(axis='x', which='both', direction='in',length=5,width=1)
-	ax.tick_params(axis='y', which='both', direction='in',length=5,width=1)	
+		with np.errstate(over='ignore'):
+		
+			s = 1/(1 + np.exp(-params[:,1,None]*(t - params[:,2,None])))
+			
+		K, r, t0 = params[:,0,None], params[:,1,None], params[:,2,None]
+		
+		#the derivatives of the model with respect to K, r, and t0, and from them the normal equations, one small system per curve
+		
+		q = K*s*(1-s)
+		
+		J = [s,q*(t - t0),-q*r]
+		
+		JTJ = np.array([[(x*z).sum(axis=1) for z in J] for x in J]).transpose(2,0,1)
+		JTr = np.array([(x*(y - K*s)).sum(axis=1) for x in J]).T
+		
+		A = JTJ + damping[:,None,None]*(JTJ*np.eye(3) + 1e-12*np.eye(3))
+		
+		step = np.linalg.solve(A,JTr[:,:,None])[:,:,0]
+		
+		with np.errstate(over='ignore',invalid='ignore'):
+		
+			trial = params + step
+			new_sse = ((growth_models['logistic'](t,trial) - y)**2).sum(axis=1)
+			
+		better = np.isfinite(new_sse) & (new_sse < sse)
+		
+		#stop once no curve is getting any better
+		
+		if (sse[better] - new_sse[better] <= 1e-10*sse[better]).all():
+		
+			break
+		
+		params = np.where(better[:,None],trial,params)
+		sse = np.where(better,new_sse,sse)
+		damping = np.where(better,damping/10.,damping*10.)
+		
+	return params
+	
+def forecast_detections(list,years,syear=1968,eyear=None,models=None,nboot=10000,ci=95,seed=None,**fixed):
 
-	#label the axes
+	'''
+	Fits growth models (any of growth_models, all of them by default) to the cumulative detections from syear to eyear (this year by default) for the molecules in list matching fixed, and projects them out to years (a year or an array of them).  Every model is also fit to nboot bootstrap resamples of the detection years (see resample_detections) to get a ci% confidence interval on the projections.  Returns a dictionary of
+	
+		model	:	{'params' : fit_growth's parameters for the census itself, with t counted in years since syear,
+					 'projected' : the projected cumulative detections in years,
+					 'low' : the lower end of the confidence interval,
+					 'high' : the upper end}
+					 
+	e.g. forecast_detections(full_list,2030)['logistic']['projected'].
+	'''
 	
-	plt.xlabel('Degree of Unsaturation')
-	plt.ylabel('Kernel Density Estimate')
+	if ci <= 0 or ci >= 100:
 	
-	#Do the estimates and plot them
+		raise ValueError('ci is a percentage between 0 and 100, not {}' .format(ci))
+		
+	models = [x for x in growth_models] if models is None else models
 	
-	xvals = np.arange(0,15,0.1)
+	for x in models:
 	
-	density_carbon = gkde(my_dict['Carbon Star'])
-	density_carbon.covariance_factor = lambda : 0.5
-	density_carbon._compute_covariance()
+		if x not in growth_models:
+		
+			raise KeyError('{} is not one of the growth models ({})' .format(x,', '.join(growth_models)))
 	
-	density_dark = gkde(my_dict['Dark Cloud'])
-	density_dark.covariance_factor = lambda : 0.5
-	density_dark._compute_covariance()
+	all_years, cumulative = resample_detections(list,nboot=nboot,seed=seed,**fixed)
 	
-	density_los = gkde(my_dict['LOS Cloud'])
-	density_los.covariance_factor = lambda : 0.5
-	density_los._compute_covariance()	
+	eyear = all_years[-1] if eyear is None else eyear
 	
-	density_sfr = gkde(my_dict['SFR'])
-	density_sfr.covariance_factor = lambda : 0.5
-	density_sfr._compute_covariance()	
+	inside = (all_years >= syear) & (all_years <= eyear)
 	
-	x_ann = 0.97
-	y_ann = 0.96
-	y_sep = 0.06	
+	t = (all_years[inside] - syear).astype(float)
+	
+	target = (np.asarray(years,dtype=float) - syear).ravel()
+	
+	results = {}
+	
+	for model in models:
+	
+		params = fit_growth(t,cumulative[:,inside],model)
 		
-	ax.plot(xvals,density_carbon(xvals),color='darkorange')
-	ax.fill_between(xvals,density_carbon(xvals),0,facecolor='darkorange',alpha=0.25,zorder=4)
-
-	ax.plot(xvals,density_dark(xvals),color='forestgreen')
-	ax.fill_between(xvals,density_dark(xvals),0,facecolor='forestgreen',alpha=0.25,zorder=4)
-
-	ax.plot(xvals,density_los(xvals),color='red')
-	ax.fill_between(xvals,density_los(xvals),0,facecolor='red',alpha=0.25,zorder=4)
-
-	ax.plot(xvals,density_sfr(xvals),color='dodgerblue')
-	ax.fill_between(xvals,density_sfr(xvals),0,facecolor='dodgerblue',alpha=0.25,zorder=4)
+		with np.errstate(over='ignore',invalid='ignore'):
 		
-	ax.annotate(r'\underline{Source Types}',xy=(x_ann,y_ann-0*y_sep),xycoords='axes fraction',color='black',ha='right',va='top')
-
-	ax.annotate('SFR',xy=(x_ann,y_ann-y_sep),xycoords='axes fraction',color='dodgerblue',ha='right',va='top')
-	ax.annotate('{}' .format(len(my_dict['SFR'])), xy=(2.7,0.3),xycoords='data',ha='left',va='bottom',color='dodgerblue')	
-
-	ax.annotate('Carbon Star',xy=(x_ann,y_ann-2*y_sep),xycoords='axes fraction',color='darkorange',ha='right',va='top')
-	ax.annotate('{}' .format(len(my_dict['Carbon Star'])), xy=(6,0.14),xycoords='data',ha='left',va='bottom',color='darkorange')	
+			projected = growth_models[model](target,params)
+		
+		low, high = np.percentile(projected[1:],[(100-ci)/2.,(100+ci)/2.],axis=0)
+		
+		results[model] = {
+			'params'	:	params[0],
+			'projected'	:	projected[0].reshape(np.shape(years))[()],
+			'low'		:	low.reshape(np.shape(years))[()],
+			'high'		:	high.reshape(np.shape(years))[()],
+			}
+			
+	return results
+	
+#############################################################
+#						Query Service	 					#
+#############################################################
 
-	ax.annotate('Dark Cloud',xy=(x_ann,y_ann-3*y_sep),xycoords='axes fraction',color='forestgreen',ha='right',va='top')
-	ax.annotate('{}' .format(len(my_dict['Dark Cloud'])), xy=(10.9,0.02),xycoords='data',ha='left',va='bottom',color='forestgreen')	
+class CensusIndex(object):
 
-	ax.annotate('LOS Cloud',xy=(x_ann,y_ann-4*y_sep),xycoords='axes fraction',color='red',ha='right',va='top')	
-	ax.annotate('{}' .format(len(my_dict['LOS Cloud'])), xy=(2.3,0.4),xycoords='data',ha='left',va='bottom',color='red')	
+	'''
+	An in-memory index of the census for answering lookups.  All of the fixed responses (every molecule, source, and telescope record, the listings, and the figure aggregates) are serialized to JSON once, up front, along with an ETag for each.  Filtered queries are serialized the first time they're asked for and cached after that.
+	'''
 
+	def __init__(self,mol_list,source_list,scopes_list,max_cached=1024):
 	
-	plt.show()
+		self.mol_list = mol_list
+		self.source_list = source_list
+		self.scopes_list = scopes_list
+		self.max_cached = max_cached
+		self.responses = {}
+		self.query_cache = {}
+		self.lock = threading.Lock()
+		
+		self.build()
+		
+		return
+		
+	def encode(self,obj,status=200):
 	
-	plt.savefig('du_by_source_type_kde.pdf',format='pdf',transparent=True,bbox_inches='tight',pad_inches=0)
+		'''
+		Serializes obj to JSON and returns [status,body,etag].
+		'''
 	
-	return			
-
-def rel_du_by_source_type(my_list):
+		body = json.dumps(obj,separators=(',',':'),default=str).encode('utf-8')
+		
+		etag = '"{}"' .format(hashlib.sha1(body).hexdigest()[:20])
+		
+		return [status,body,etag]
+		
+	def build(self):
+	
+		'''
+		Pre-serializes all of the fixed responses.
+		'''
+	
+		responses = {}
+		
+		responses['/'] = self.encode({
+			'version'		:	version,
+			'molecules'		:	len(self.mol_list),
+			'sources'		:	len(self.source_list),
+			'telescopes'	:	len(self.scopes_list),
+			'endpoints'		:	['/molecules','/molecules/<label>','/sources','/sources/<name>','/telescopes','/telescopes/<shortname>','/query?<filter>=<value>&...','/figures','/figures/<name>'],
+			})
+		
+		responses['/molecules'] = self.encode([{'label' : x.label, 'name' : x.name, 'formula' : x.formula, 'year' : x.year} for x in self.mol_list])
+		responses['/sources'] = self.encode([{'name' : x.name, 'type' : x.type, 'detects' : x.detects} for x in self.source_list])
+		responses['/telescopes'] = self.encode([{'shortname' : x.shortname, 'name' : x.name, 'ndetects' : x.ndetects} for x in self.scopes_list])
+		
+		for x in self.mol_list:
+		
+			responses['/molecules/' + x.label] = self.encode(mol_to_dict(x))
+			
+		for x in self.source_list:
+		
+			responses['/sources/' + x.name] = self.encode(source_to_dict(x))
+			
+		for x in self.scopes_list:
+		
+			responses['/telescopes/' + x.shortname] = self.encode(scope_to_dict(x))
+			
+		figs = figure_data(self.mol_list)
+		
+		responses['/figures'] = self.encode(sorted(figs))
+		
+		for x in figs:
+		
+			responses['/figures/' + x] = self.encode(figs[x])
+			
+		self.responses = responses
+		
+		return
+		
+	def run_query(self,query_str):
+	
+		'''
+		Runs a filtered query from a URL query string, e.g. 'source=TMC-1&syear=2010', and returns [status,body,etag].  Bad queries get a 400 and an error message.
+		'''
+		
+		try:
+		
+			matches = query(self.mol_list,**parse_filters(parse_qs(query_str)))
+			
+		except (TypeError,ValueError) as e:
+		
+			return self.encode({'error' : str(e)},status=400)
+			
+		return self.encode({'count' : len(matches), 'molecules' : [x.label for x in matches]})
+		
+	def get(self,path,query_str=''):
+	
+		'''
+		Returns [status,body,etag] for a request path and query string, or None if there's nothing there.
+		'''
+		
+		path = unquote(path).rstrip('/') or '/'
+	
+		if path != '/query':
+		
+			return self.responses.get(path)
+			
+		#canonicalize the query so that the same filters in a different order share a cache entry
+			
+		key = '&'.join(sorted(query_str.split('&')))
+			
+		with self.lock:
+		
+			cached = self.query_cache.get(key)
+			
+		if cached is not None:
+		
+			return cached
+			
+		response = self.run_query(query_str)
+		
+		with self.lock:
+		
+			if len(self.query_cache) >= self.max_cached:
+			
+				del self.query_cache[next(iter(self.query_cache))]
+				
+			self.query_cache[key] = response
+			
+		return response
+		
+class CensusRequestHandler(object):
 
 	'''
-	Makes a KDE plot of the relative dus in each source type
+	Answers GET requests from a CensusIndex, with ETags and conditional GET support.  The index is attached to the server as server.index.  serve() puts this together with http.server's BaseHTTPRequestHandler, which is only imported once there's a server to run.
 	'''
-	
-	#gather the data
 
-	my_dict = {
+	protocol_version = 'HTTP/1.1'
 	
-		'Carbon Star' 	: 	[],
-		'Dark Cloud'	:	[],
-		'LOS Cloud'	:	[],
-		'SFR'	:	[],	
-		}
-		
-	#we have to be a little careful here, because for a given source, there can be two SFRs listed, and we only want to credit it once
-		
-	for mol in my_list:
+	#keep-alive connections plus Nagle's algorithm would otherwise hold each small response back for a delayed ACK
 	
-		#we'll make a dictionary here to flag if we've credited things already
-		
-		credit_dict = {
+	disable_nagle_algorithm = True
 	
-			'Carbon Star' 	: 	False,
-			'Dark Cloud'	:	False,
-			'LOS Cloud'	:	False,
-			'SFR'	:	False,	
-			}		
+	def do_GET(self):
 	
-		if mol.du is None or mol.fullerene is True:
+		parts = urlsplit(self.path)
 		
-			continue
+		response = self.server.index.get(parts.path,parts.query)
 		
-		for source in mol.sources:
+		if response is None:
 		
-			if source.type in my_dict:
+			body = b'{"error":"not found"}'
+		
+			self.send_response(404)
+			self.send_header('Content-Type','application/json')
+			self.send_header('Content-Length',str(len(body)))
+			self.end_headers()
+			self.wfile.write(body)
 			
-				if credit_dict[source.type] is False:
+			return
 			
-					my_dict[source.type].append(mol.du/mol.maxdu)
-					
-					credit_dict[source.type] = True
+		status, body, etag = response
+		
+		#if the client already has this version, don't bother sending it again
+		
+		if etag in [x.strip() for x in self.headers.get('If-None-Match','').split(',')]:
+		
+			self.send_response(304)
+			self.send_header('ETag',etag)
+			self.end_headers()
+			
+			return
+			
+		self.send_response(status)
+		self.send_header('Content-Type','application/json')
+		self.send_header('Content-Length',str(len(body)))
+		self.send_header('ETag',etag)
+		self.send_header('Cache-Control','no-cache')
+		self.end_headers()
+		self.wfile.write(body)
+		
+		return
+		
+	def log_message(self,format,*args):
 	
-	plt.close('Relative DU by Source Type')
+		#logging every request to the terminal costs more than answering it
 	
-	fig,axs = plt.subplots(2,2,num='Relative DU by Source Type',figsize=(10,8))
+		return
+		
+def serve(host='127.0.0.1',port=8000,mol_list=None,sources=None,scopes=None,snapshots=None,request_queue_size=1024):
+
+	'''
+	Starts a read-only HTTP server that answers census lookups as JSON.  The census is loaded and indexed once, when the server starts, and each request is answered from that in-memory index on its own thread.  By default it serves full_list, source_list, and scopes_list on http://127.0.0.1:8000.  Try, e.g.:
 	
-	plt.ion()
+		curl http://127.0.0.1:8000/molecules/CH3CN
+		curl 'http://127.0.0.1:8000/query?source=TMC-1&syear=2010'
+		curl http://127.0.0.1:8000/figures/cumulative_detections
+		
+	Given snapshots (a CensusSnapshots), it serves the current snapshot instead, and picks up each new one as it's published: the new index is built off to the side and swapped in whole, so requests in flight finish against the version they started with.  Up to request_queue_size connections can be waiting to be accepted at once.  Stop it with Ctrl-C.
+	'''
 	
-	#set some font defaults
+	if snapshots is not None:
 	
-	fontparams = {'size':18, 'family':'sans-serif','sans-serif':['Helvetica']}
+		current = snapshots.get()
+		
+		index = CensusIndex(current.mol_list,current.source_list,current.scopes_list)
+		
+	else:
 	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')		
-
-	#axes ticks and limits
+		index = CensusIndex(mol_list if mol_list is not None else full_list,sources if sources is not None else source_list,scopes if scopes is not None else scopes_list)
 	
-	for ax in axs.flat:
-		ax.set_ylim([0,3.75])
-		ax.tick_params(axis='y', which='both', direction='in',length=5,width=1)
-		ax.tick_params(axis='x', which='both', direction='in',length=5,width=1)
-		
-	axs[0,0].set_yticklabels(axs[0,0].get_yticklabels(), visible=False)			
-	axs[0,0].set_xticklabels(axs[0,0].get_xticklabels(), visible=False)	
-
-	axs[1,1].set_yticklabels(axs[1,0].get_yticklabels(), visible=False)	
-	axs[1,1].set_xticklabels(axs[1,0].get_xticklabels(), visible=False)	
+	from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 	
-	axs[0,1].set_yticklabels(axs[1,0].get_yticklabels(), visible=False)	
-	axs[0,1].set_xticklabels(axs[1,0].get_xticklabels(), visible=False)				
-		
-
-	#label the axes
+	#the default listen backlog of 5 turns away connections long before a few hundred clients are waiting on answers
 	
-	axs[1,0].set(xlabel = 'Relative Degree of Unsaturation')
-	axs[1,0].set(ylabel = 'Kernel Density Estimate')	
+	server = type('CensusServer',(ThreadingHTTPServer,),{'request_queue_size' : request_queue_size, 'daemon_threads' : True})((host,port),type('CensusRequestHandler',(CensusRequestHandler,BaseHTTPRequestHandler),{}))
+	server.index = index
 	
-	#Do the estimates and plot them
+	if snapshots is not None:
 	
-	xvals = np.arange(0,1,0.01)
+		snapshots.subscribe(lambda x: setattr(server,'index',CensusIndex(x.mol_list,x.source_list,x.scopes_list)))
 	
-	density_carbon = gkde(my_dict['Carbon Star'])
-	density_carbon.covariance_factor = lambda : 0.5
-	density_carbon._compute_covariance()
+	print('Serving the census on http://{}:{}' .format(host,port))
 	
-	density_dark = gkde(my_dict['Dark Cloud'])
-	density_dark.covariance_factor = lambda : 0.5
-	density_dark._compute_covariance()
+	try:
 	
-	density_los = gkde(my_dict['LOS Cloud'])
-	density_los.covariance_factor = lambda : 0.5
-	density_los._compute_covariance()	
+		server.serve_forever()
+		
+	except KeyboardInterrupt:
 	
-	density_sfr = gkde(my_dict['SFR'])
-	density_sfr.covariance_factor = lambda : 0.5
-	density_sfr._compute_covariance()	
+		pass
+		
+	finally:
 	
-	x_ann = 0.97
-	y_ann = 0.96
-	y_sep = 0.06	
+		server.server_close()
 		
-	axs[0,0].plot(xvals,density_carbon(xvals),color='darkorange')
-	axs[0,0].fill_between(xvals,density_carbon(xvals),0,facecolor='darkorange',alpha=0.25,zorder=4)
-	axs[0,0].annotate('Carbon Star',xy=[0.04,0.96],xycoords='axes fraction',ha='left',va='top',size=24,color='darkorange')
+	return
 
-	axs[1,0].plot(xvals,density_dark(xvals),color='forestgreen')
-	axs[1,0].fill_between(xvals,density_dark(xvals),0,facecolor='forestgreen',alpha=0.25,zorder=4)
-	axs[1,0].annotate('Dark Cloud',xy=[0.04,0.96],xycoords='axes fraction',ha='left',va='top',size=24,color='forestgreen')
+#############################################################
+#					Figure Rendering Service				#
+#############################################################
 
+class RenderBusy(Exception):
 
-	axs[0,1].plot(xvals,density_los(xvals),color='red')
-	axs[0,1].fill_between(xvals,density_los(xvals),0,facecolor='red',alpha=0.25,zorder=4)
-	axs[0,1].annotate('LOS Cloud',xy=[0.04,0.96],xycoords='axes fraction',ha='left',va='top',size=24,color='red')
+	'''
+	Raised when the rendering service already has as many jobs in flight as it's allowed.
+	'''
+	
+	pass
+	
+class RenderTimeout(Exception):
+
+	'''
+	Raised when a render job (usually a LaTeX run) takes longer than the service allows.
+	'''
+	
+	pass
+	
+def _render_alarm(signum,frame):
 
+	raise RenderTimeout('render job timed out')
 
-	axs[1,1].plot(xvals,density_sfr(xvals),color='dodgerblue')
-	axs[1,1].fill_between(xvals,density_sfr(xvals),0,facecolor='dodgerblue',alpha=0.25,zorder=4)
-	axs[1,1].annotate('SFR',xy=[0.04,0.96],xycoords='axes fraction',ha='left',va='top',size=24,color='dodgerblue')
+def _init_render_worker():
 
+	'''
+	Sets up a rendering worker process: no windows, and a SIGALRM handler so that stuck jobs can be interrupted.
+	'''
+
+	matplotlib.use('Agg',force=True)
 	
-	plt.subplots_adjust(wspace=0, hspace=0)
-	plt.show()
-	
-	plt.savefig('relative_du_by_source_type_kde.pdf',format='pdf',transparent=True,bbox_inches='tight',pad_inches=0)
+	if hasattr(signal,'SIGALRM'):
 	
-	return		
+		signal.signal(signal.SIGALRM,_render_alarm)
+		
+	return
 	
-def mass_by_source_type(my_list):
+def render_job(name,syear=None,eyear=None,formats=None,timeout=None,mol_list=None):
 
 	'''
-	Makes a KDE plot of the masses in each source type
+	Renders one figure from figure_functions in a scratch directory and returns a dictionary of {filename : file contents}.  The figure is drawn from mol_list (full_list if it's None), which is pickled over to the worker along with the job.  cumu_det_plot and cumu_det_natoms_plot use syear and eyear as their axis range; every other figure is drawn from only the molecules detected between syear and eyear.  Runs in a rendering worker process, where a timeout (in seconds) interrupts the job, including any LaTeX run it's waiting on.
 	'''
 	
-	#gather the data
-
-	my_dict = {
+	if mol_list is None:
 	
-		'Carbon Star' 	: 	[],
-		'Dark Cloud'	:	[],
-		'LOS Cloud'	:	[],
-		'SFR'	:	[],	
-		}
+		mol_list = full_list
+	
+	kwargs = {'formats' : formats}
+	
+	if name in ['cumu_det_plot','cumu_det_natoms_plot']:
+	
+		mols = mol_list
+		kwargs['syear'] = syear
+		kwargs['eyear'] = eyear
 		
-	#we have to be a little careful here, because for a given source, there can be two SFRs listed, and we only want to credit it once
+	else:
+	
+		years = {}
 		
-	masses = []
+		if syear is not None:
+			years['syear'] = syear
+		if eyear is not None:
+			years['eyear'] = eyear
 	
-	for mol in my_list:
+		mols = query(mol_list,**years)
 		
-		#we'll make a dictionary here to flag if we've credited things already
+	cwd = os.getcwd()
+	tmp_dir = tempfile.mkdtemp(prefix='census_render_')
+	
+	if timeout is not None and hasattr(signal,'SIGALRM'):
+	
+		signal.alarm(int(ceil(timeout)))
 		
-		credit_dict = {
+	try:
 	
-			'Carbon Star' 	: 	False,
-			'Dark Cloud'	:	False,
-			'LOS Cloud'	:	False,
-			'SFR'	:	False,	
-			}		
+		#the figure functions write to the working directory, and each worker only does one job at a time
 	
-		#drop the fullerenes
+		os.chdir(tmp_dir)
+	
+		figure_functions[name](mols,**kwargs)
 		
-		if mol.fullerene is True:
+		files = {}
 		
-			continue
+		for x in os.listdir(tmp_dir):
+		
+			with open(os.path.join(tmp_dir,x),'rb') as input:
 			
-		#add the mass to the list for axis limit purposes
+				files[x] = input.read()
+				
+	finally:
+	
+		if timeout is not None and hasattr(signal,'SIGALRM'):
 		
-		masses.append(mol.mass)	
+			signal.alarm(0)
+	
+		os.chdir(cwd)
 		
-		for source in mol.sources:
+		shutil.rmtree(tmp_dir,ignore_errors=True)
 		
-			if source.type in my_dict:
-			
-				if credit_dict[source.type] is False:
-			
-					my_dict[source.type].append(mol.mass)
-					
-					credit_dict[source.type] = True
+	return files
 	
-	plt.close('Mass by Source Type')
+class FigureRenderer(object):
+
+	'''
+	An asyncio front end to a bounded pool of rendering worker processes that draws figures from census (the module census if it's None).  Identical requests that arrive while a render is still running (same figure, syear, eyear, and format, against a census with the same contents hash) share that one job instead of each starting their own.  At most max_pending distinct jobs are allowed in flight, counting any that are stuck; past that, render() raises RenderBusy so that callers can back off.  Jobs that run longer than timeout seconds are interrupted and raise RenderTimeout.  A worker that can't be interrupted is killed a few seconds later, along with the rest of its pool, which is replaced with a fresh one; anything else that was running there is run again on the new pool.
+	'''
+
+	def __init__(self,nworkers=2,max_pending=16,timeout=120,census=None):
+	
+		self.census = census
+		self.nworkers = nworkers
+		self.max_pending = max_pending
+		self.timeout = timeout
+		self.pool = None
+		self.inflight = {}
+		self.hung = set()
+		
+		return
+		
+	def start(self):
 	
-	fig = plt.figure(num='Mass by Source Type',figsize=(10,8))
+		self.pool = ProcessPoolExecutor(max_workers=self.nworkers,initializer=_init_render_worker)
+		
+		return
+		
+	def stop(self):
 	
-	plt.ion()
+		if self.pool is not None:
+		
+			self.pool.shutdown(wait=False,cancel_futures=True)
+			
+			self.pool = None
+			
+		return
+		
+	def restart(self,pool):
 	
-	#set some font defaults
+		'''
+		Replaces pool with a fresh one, if it's still the current pool, and kills its workers, so that whatever else was running there fails with BrokenProcessPool.
+		'''
+		
+		if pool is not self.pool:
+		
+			return
+			
+		self.pool = None
+		
+		self.start()
+		
+		for x in list((getattr(pool,'_processes',None) or {}).values()):
+		
+			x.kill()
+			
+		pool.shutdown(wait=False)
+		
+		return
+		
+	async def _run(self,name,syear,eyear,fmt,census):
 	
-	fontparams = {'size':24, 'family':'sans-serif','sans-serif':['Helvetica']}
+		from concurrent.futures.process import BrokenProcessPool
 	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')		
-
-	#axes ticks and limits
+		loop = asyncio.get_running_loop()
+		
+		while True:
+		
+			pool = self.pool
+		
+			job = pool.submit(render_job,name,syear,eyear,[fmt],self.timeout,census.mol_list)
+			
+			result = asyncio.wrap_future(job)
+			
+			#the worker interrupts itself at the timeout; this is just a backstop in case it can't
+			
+			try:
+			
+				return await asyncio.wait_for(asyncio.shield(result),self.timeout+5)
+				
+			except asyncio.TimeoutError:
+			
+				#the worker is stuck, and keeps its place against max_pending until it's gone, which restarting the pool sees to
+			
+				self.hung.add(job)
+				
+				job.add_done_callback(lambda x: loop.call_soon_threadsafe(self.hung.discard,x))
+				
+				#nobody's waiting on it any more, but it'll still finish (with BrokenProcessPool), and asyncio complains about results that are never looked at
+				
+				result.add_done_callback(lambda x: x.cancelled() or x.exception())
+				
+				self.restart(pool)
+			
+				raise RenderTimeout('render job timed out')
+				
+			except BrokenProcessPool:
+			
+				#if the pool was replaced because some other job got stuck, this one just needs running again; otherwise a worker died on it
+			
+				if pool is self.pool:
+				
+					self.restart(pool)
+					
+					raise
+		
+	async def render(self,name,syear=None,eyear=None,fmt='pdf',census=None):
 	
-	ax = plt.subplot(111)
+		'''
+		Renders figure name from census (self.census if it's None) and returns a dictionary of {filename : file contents}.
+		'''
 	
-	ax.set_xlim([min(masses),max(masses)])
-	ax.tick_params(axis='y', which='both', direction='in',length=5,width=1,labelleft='off')
-	ax.tick_params(axis='x', which='both', direction='in',length=5,width=1,labelbottom='off')		
+		if name not in figure_functions:
+		
+			raise KeyError(name)
+			
+		if self.pool is None:
+		
+			self.start()
+			
+		if census is None:
+		
+			census = self.census if self.census is not None else globals()['census']
+	
+		key = (name,syear,eyear,fmt,census.get_hash())
+		
+		task = self.inflight.get(key)
+		
+		if task is None:
+		
+			if len(self.inflight) + len(self.hung) >= self.max_pending:
+			
+				raise RenderBusy('{} render jobs already in flight' .format(len(self.inflight) + len(self.hung)))
+				
+			task = asyncio.ensure_future(self._run(name,syear,eyear,fmt,census))
+			
+			self.inflight[key] = task
+			
+			task.add_done_callback(lambda x: self.inflight.pop(key,None))
+			
+		#shielded, so one impatient caller giving up doesn't cancel the job for everyone else sharing it
+			
+		return await asyncio.shield(task)
+		
+async def _handle_render_request(reader,writer,renderer):
 
-	#label the axes
+	'''
+	Answers one HTTP request of the form GET /figures/<name>?syear=1970&eyear=2000&format=png@150
+	'''
 	
-	ax.set(xlabel = 'Molecular Mass (amu)')
-	ax.set(ylabel = 'Kernel Density Estimate')	
+	content_types = {'pdf' : 'application/pdf', 'png' : 'image/png', 'svg' : 'image/svg+xml', 'json' : 'application/json'}
 	
-	#Do the estimates and plot them
+	status = 200
+	ctype = 'json'
+	body = b''
 	
-	xvals = np.arange(0,max(masses),1)
+	try:
 	
-	density_carbon = gkde(my_dict['Carbon Star'])
-	density_carbon.covariance_factor = lambda : 0.5
-	density_carbon._compute_covariance()
+		request_line = await reader.readline()
+		
+		#skip past the headers
+		
+		while True:
+		
+			line = await reader.readline()
+			
+			if line in [b'\r\n',b'\n',b'']:
+			
+				break
+				
+		method, target = request_line.decode('latin-1').split()[:2]
+		
+		parts = urlsplit(target)
+		params = parse_qs(parts.query)
+		path = unquote(parts.path).strip('/').split('/')
+		
+		if method != 'GET':
+		
+			status, body = 405, b'{"error":"only GET is supported"}'
+			
+		elif path == ['figures']:
+		
+			body = json.dumps(sorted(figure_functions)).encode('utf-8')
+			
+		elif len(path) != 2 or path[0] != 'figures' or path[1] not in figure_functions:
+		
+			status, body = 404, b'{"error":"not found"}'
+			
+		else:
+		
+			syear = int(params['syear'][-1]) if 'syear' in params else None
+			eyear = int(params['eyear'][-1]) if 'eyear' in params else None
+			fmt = params['format'][-1] if 'format' in params else 'pdf'
+			
+			if fmt.partition('@')[0] not in content_types or fmt == 'json':
+			
+				status, body = 400, b'{"error":"format must be pdf, svg, or png"}'
+				
+			else:
+			
+				files = await renderer.render(path[1],syear,eyear,fmt)
+				
+				#export_figure writes name.pdf, or name_150dpi.png for png@150
+				
+				ext, at, res = fmt.partition('@')
+				
+				suffix = '_{}dpi.{}' .format(res,ext) if at == '@' else '.{}' .format(ext)
+				
+				matches = sorted([x for x in files if x.endswith(suffix)])
+				
+				if len(matches) == 0:
+				
+					status, body = 500, json.dumps({'error' : '{} did not write a {} file (it wrote {})' .format(path[1],fmt,', '.join(sorted(files)) or 'nothing')}).encode('utf-8')
+					
+				else:
+				
+					ctype = ext
+					body = files[matches[0]]
+				
+	except ValueError:
 	
-	density_dark = gkde(my_dict['Dark Cloud'])
-	density_dark.covariance_factor = lambda : 0.5
-	density_dark._compute_covariance()
+		status, ctype, body = 400, 'json', b'{"error":"bad request"}'
+		
+	except RenderBusy:
 	
-	density_los = gkde(my_dict['LOS Cloud'])
-	density_los.covariance_factor = lambda : 0.5
-	density_los._compute_covariance()	
+		status, ctype, body = 503, 'json', b'{"error":"too many render jobs in flight, try again shortly"}'
+		
+	except RenderTimeout:
 	
-	density_sfr = gkde(my_dict['SFR'])
-	density_sfr.covariance_factor = lambda : 0.5
-	density_sfr._compute_covariance()	
+		status, ctype, body = 504, 'json', b'{"error":"render timed out"}'
 		
-	ax.plot(xvals[min(masses):max(masses)],density_carbon(xvals[min(masses):max(masses)]),color='darkorange')
-	ax.fill_between(xvals[min(masses):max(masses)],density_carbon(xvals[min(masses):max(masses)]),0,facecolor='darkorange',alpha=0.25,zorder=4)
+	except Exception as e:
 	
-	ax.plot(xvals[min(masses):max(masses)],density_dark(xvals[min(masses):max(masses)]),color='forestgreen')
-	ax.fill_between(xvals[min(masses):max(masses)],density_dark(xvals[min(masses):max(masses)]),0,facecolor='forestgreen',alpha=0.25,zorder=4)
+		status, ctype, body = 500, 'json', json.dumps({'error' : str(e)}).encode('utf-8')
+		
+	reasons = {200 : 'OK', 400 : 'Bad Request', 404 : 'Not Found', 405 : 'Method Not Allowed', 500 : 'Internal Server Error', 503 : 'Service Unavailable', 504 : 'Gateway Timeout'}
+		
+	header = 'HTTP/1.1 {} {}\r\nContent-Type: {}\r\nContent-Length: {}\r\nConnection: close\r\n' .format(status,reasons[status],content_types[ctype],len(body))
 	
-	ax.plot(xvals[min(masses):max(masses)],density_los(xvals[min(masses):max(masses)]),color='red')
-	ax.fill_between(xvals[min(masses):max(masses)],density_los(xvals[min(masses):max(masses)]),0,facecolor='red',alpha=0.25,zorder=4)
-
-	ax.plot(xvals[min(masses):max(masses)],density_sfr(xvals[min(masses):max(masses)]),color='dodgerblue')
-	ax.fill_between(xvals[min(masses):max(masses)],density_sfr(xvals[min(masses):max(masses)]),0,facecolor='dodgerblue',alpha=0.25,zorder=4)
+	if status == 503:
 	
-	x_ann = 0.97
-	y_ann = 0.96
-	y_sep = 0.06	
+		header += 'Retry-After: 5\r\n'
+	
+	try:
+	
+		writer.write(header.encode('latin-1') + b'\r\n' + body)
 		
-	ax.annotate(r'\underline{Source Types}',xy=(x_ann,y_ann-0*y_sep),xycoords='axes fraction',color='black',ha='right',va='top')
-	ax.annotate('SFR',xy=(x_ann,y_ann-y_sep),xycoords='axes fraction',color='dodgerblue',ha='right',va='top')
-	ax.annotate('Carbon Star',xy=(x_ann,y_ann-2*y_sep),xycoords='axes fraction',color='darkorange',ha='right',va='top')	
-	ax.annotate('Dark Cloud',xy=(x_ann,y_ann-3*y_sep),xycoords='axes fraction',color='forestgreen',ha='right',va='top')
-	ax.annotate('LOS Cloud',xy=(x_ann,y_ann-4*y_sep),xycoords='axes fraction',color='red',ha='right',va='top')	
-
-	plt.show()
+		await writer.drain()
+		
+	finally:
 	
-	plt.savefig('mass_by_source_type_kde.pdf',format='pdf',transparent=True,bbox_inches='tight',pad_inches=0)
+		writer.close()
 	
-	return		
-
-def waves_by_source_type(my_list):
+	return
+	
+def serve_figures(host='127.0.0.1',port=8001,nworkers=2,max_pending=16,timeout=120,census=None):
 
 	'''
-	Generates four pie charts, one for each generalized source type, with the wedges for the wavelengths used for first detections in those sources
-	'''
-	#Close an old figure if it exists and initialize a new figure
+	Starts an asyncio HTTP server that renders figures on demand in a pool of nworkers processes, e.g.:
 	
-	plt.close('Wavelength by Source Type')
+		curl -o cumu.png 'http://127.0.0.1:8001/figures/cumu_det_plot?syear=1960&format=png@150'
+		
+	Figures are drawn from census, or the module census if it's None.  Concurrent identical requests share one render.  When more than max_pending different renders are in flight the server answers 503 with a Retry-After header, and renders that take longer than timeout seconds get a 504.  Stop it with Ctrl-C.
+	'''
 	
-	fig,axs = plt.subplots(2,2,num='Wavelength by Source Type',figsize=(15,12))
+	renderer = FigureRenderer(nworkers=nworkers,max_pending=max_pending,timeout=timeout,census=census)
 	
-	plt.ion()
+	async def main():
 	
-	#set some font defaults
+		renderer.start()
 	
-	fontparams = {'size':26, 'family':'sans-serif','sans-serif':['Helvetica']}
+		server = await asyncio.start_server(lambda r, w: _handle_render_request(r,w,renderer),host,port)
+		
+		print('Rendering figures on http://{}:{}' .format(host,port))
+		
+		async with server:
+		
+			await server.serve_forever()
+			
+	try:
 	
-	plt.rc('font',**fontparams)
-	plt.rc('mathtext', fontset='stixsans')	
-
-	#collect the data
+		asyncio.run(main())
+		
+	except KeyboardInterrupt:
 	
-	type_dict = {
+		pass
+		
+	finally:
 	
-		'Carbon Star' 	: 	{'cm': 0, 'mm': 0, 'sub-mm': 0, 'IR': 0, 'UV': 0, 'Vis': 0},
-		'Dark Cloud'	:	{'cm': 0, 'mm': 0, 'sub-mm': 0, 'IR': 0, 'UV': 0, 'Vis': 0},
-		'LOS Cloud'		:	{'cm': 0, 'mm': 0, 'sub-mm': 0, 'IR': 0, 'UV': 0, 'Vis': 0},
-		'SFR'			:	{'cm': 0, 'mm': 0, 'sub-mm': 0, 'IR': 0, 'UV': 0, 'Vis': 0},
+		renderer.stop()
 		
-		}
+	return
+
+#############################################################
+#						Command Line	 					#
+#############################################################
+
+def find_entry(name,db=None):
+
+	'''
+	Returns the molecule or source called name: a variable name (e.g. SgrB2LOS), a molecule label or formula, or a source name.  With db (a CensusDatabase), only the molecules needed are read from it.  Returns None if there's nothing by that name.
+	'''
 	
-	for mol in my_list:
+	if db is None:
 	
-		#we'll make a dictionary here to flag if we've credited things already
+		entry = globals().get(name)
 		
-		credit_dict = {
-	
-			'Carbon Star' 	: 	False,
-			'Dark Cloud'	:	False,
-			'LOS Cloud'		:	False,
-			'SFR'			:	False,
+		if isinstance(entry,(Molecule,Source)):
+		
+			return entry
 			
-			}		
-	
-		for source in mol.sources:
+		for x in full_list:
 		
-			if source.type in type_dict:
+			if name in [x.label,x.formula]:
 			
-				if credit_dict[source.type] is False:
+				return x
 				
-					for wave in mol.wavelengths:
-					
-						type_dict[source.type][wave] += 1													
-
-					credit_dict[source.type] = True
-					
-	#make the pie charts
-	
-	#Carbon Stars
+		for x in source_list:
+		
+			if name == x.name:
+			
+				return x
+				
+		return None
+		
+	mols = db.get_molecules(label=name) or db.get_molecules(formula=name)
 	
-	carbon_data = [
+	if len(mols) > 0:
 	
-		type_dict['Carbon Star']['cm'], 
-		type_dict['Carbon Star']['mm'],
-		type_dict['Carbon Star']['sub-mm'], 
-		type_dict['Carbon Star']['IR'], 
-		#type_dict['Carbon Star']['UV'] + type_dict['Carbon Star']['Vis'],
-		]
+		return mols[0]
 		
-	carbon_colors = [
+	#a source gets its statistics from just its own molecules
+		
+	mols = db.get_molecules(source=name)
 	
-		'dodgerblue',
-		'darkorange',
-		'forestgreen',
-		'black',
-		#'violet',
+	if len(mols) == 0:
 	
-		]		
+		return None
 		
-	#Dark Clouds
+	source = [x for x in mols[0].sources if x.name == name][0]
 	
-	dark_data = [
+	source.update_stats(mols)
 	
-		type_dict['Dark Cloud']['cm'], 
-		type_dict['Dark Cloud']['mm'],
-		#type_dict['Dark Cloud']['sub-mm'], 
-		#type_dict['Dark Cloud']['IR'], 
-		#type_dict['Dark Cloud']['UV'] + type_dict['Dark Cloud']['Vis'],
-		]
-		
-	dark_colors = [
+	return source
 	
-		'dodgerblue',
-		'darkorange',
-		#'forestgreen',
-		#'black',
-		#'violet',
+def main(argv=None):
+
+	'''
+	The census command line, e.g.
 	
-		]			
+		census summary CH3CN
+		census query source=TMC-1 syear=2010 element=N
+		census query --by year source_type='Dark Cloud'
+		census stats
+		census export csv -o census_2019
+		census figures cumu_det_plot periodic_heatmap --formats pdf png@150
 		
-	#LOS Clouds
+	Everything runs on the census in this file, or with --snapshot on a census database written by 'census export sqlite' (see CensusDatabase), which summary, query, and stats answer from with SQL rather than from the objects in this file.  Either way the module is imported first, so the census in this file is still defined and checked (which takes a few tens of milliseconds); --snapshot changes where the answers come from, not how long startup takes.  Nothing slow to import (numpy, matplotlib, scipy) is loaded unless the command needs it.  Returns the exit status.
+	'''
 	
-	los_data = [
+	parser = argparse.ArgumentParser(prog='census',description='Look things up in the census of interstellar molecules, and write out its data and figures.')
+	parser.add_argument('--snapshot',metavar='FILE',help='a census database (from census export sqlite) to use instead of the census in main_database.py')
 	
-		type_dict['LOS Cloud']['cm'], 
-		type_dict['LOS Cloud']['mm'],
-		type_dict['LOS Cloud']['sub-mm'], 
-		type_dict['LOS Cloud']['IR'], 
-		type_dict['LOS Cloud']['UV'] + type_dict['LOS Cloud']['Vis'],
-		]
-		
-	los_colors = [
+	commands = parser.add_subparsers(dest='command',metavar='command')
+	commands.required = True
 	
-		'dodgerblue',
-		'darkorange',
-		'forestgreen',
-		'black',
-		'violet',
+	cmd = commands.add_parser('summary',help='print the summary of molecules or sources')
+	cmd.add_argument('names',nargs='+',metavar='id',help='a variable name, molecule label or formula, or source name')
+	cmd.add_argument('--refs',action='store_true',help='print the references and notes instead')
 	
-		]
-		
-	#SFRs
+	cmd = commands.add_parser('query',help='list the molecules matching some filters')
+	cmd.add_argument('filters',nargs='*',metavar='filter=value',help="any of query()'s filters, e.g. source=TMC-1 syear=2010 element=N (or joined with '&')")
+	cmd.add_argument('--count',action='store_true',help='print how many molecules match instead')
+	cmd.add_argument('--by',choices=list(CensusDatabase.groups),help='print how many match for each value of this instead')
 	
-	sfr_data = [
+	cmd = commands.add_parser('export',help='write out the molecules, sources, and telescopes')
+	cmd.add_argument('format',choices=['csv','jsonl','sqlite'])
+	cmd.add_argument('-o','--output',default='.',metavar='PATH',help='the directory to write to (for sqlite, the database file; the default is census.db)')
 	
-		type_dict['SFR']['cm'], 
-		type_dict['SFR']['mm'],
-		type_dict['SFR']['sub-mm'], 
-		#type_dict['SFR']['IR'], 
-		#type_dict['SFR']['UV'] + type_dict['SFR']['Vis'],
-		]
-		
-	sfr_colors = [
+	cmd = commands.add_parser('figures',help='draw figures')
+	cmd.add_argument('names',nargs='*',metavar='name',help='which figures to draw (the default is all of them): {}' .format(', '.join(figure_functions)))
+	cmd.add_argument('--formats',nargs='+',default=['pdf'],metavar='FORMAT',help="e.g. pdf svg png@150 (the default is pdf)")
+	cmd.add_argument('-o','--output',default='.',metavar='DIR',help='the directory to write to')
+	cmd.add_argument('--workers',type=int,default=1,help='how many figures to draw at once')
 	
-		'dodgerblue',
-		'darkorange',
-		'forestgreen',
-		#'black',
-		#'violet',
+	cmd = commands.add_parser('stats',help='print counts of the molecules, by number of atoms, source type, wavelength, and more')
+	cmd.add_argument('--by',nargs='+',choices=list(CensusDatabase.groups),default=['natoms','source_type','wavelength'],help='what to count by')
 	
-		]
+	args = parser.parse_args(argv)
 	
-	types = [
+	if args.snapshot is not None and os.path.isfile(args.snapshot) is False:
 	
-		'cm',
-		'mm',
-		'sub-mm',
-		'IR',
-		'UV/Vis',
+		parser.error('no census database at {}' .format(args.snapshot))
+		
+	db = CensusDatabase(args.snapshot) if args.snapshot is not None else None
 	
-		]
+	if args.command == 'summary':
+	
+		status = 0
+	
+		for name in args.names:
 		
-	def make_labels(list):
+			entry = find_entry(name,db)
+			
+			if entry is None:
+			
+				print('census: no molecule or source called {}' .format(name),file=sys.stderr)
+				
+				status = 1
+				
+			elif args.refs is True and isinstance(entry,Molecule):
+			
+				refs(entry)
+				
+			else:
+			
+				summary(entry)
+				
+		return status
+		
+	if args.command in ['query','stats']:
 	
-		new_labels = []
+		try:
 		
-		total = sum(list)
+			kwargs = parse_filters(parse_qs('&'.join(args.filters))) if args.command == 'query' else {}
+			
+		except ValueError as e:
 		
-		for i in list:
+			parser.error(str(e))
+			
+		#without a snapshot, counting still goes through sqlite, on a copy of the census in memory
 		
-			percent = 100*i/total
+		if db is None and (args.command == 'stats' or args.by is not None):
+		
+			db = CensusDatabase(':memory:')
 			
-			new_labels.append('{:.1f}\%' .format(percent))
+			db.write(census)
 			
-		return new_labels			
-	
-	axs[0,0].pie(carbon_data,labels=make_labels(carbon_data), colors=carbon_colors, labeldistance=1.1, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})	
-	axs[0,0].annotate(r'\textbf{Carbon Stars}',xy=(0.5,1.05),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
-	
-	axs[0,1].pie(dark_data,labels=make_labels(dark_data),colors=dark_colors, labeldistance=1.1, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})	
-	axs[0,1].annotate(r'\textbf{Dark Clouds}',xy=(0.5,1.05),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
-
-	wedges, texts = axs[1,0].pie(los_data,labels=make_labels(los_data),colors=los_colors, labeldistance=1.1, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})	
-	axs[1,0].annotate(r'\textbf{LOS Clouds}',xy=(0.5,1.05),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
-	
-	axs[1,1].pie(sfr_data,labels=make_labels(sfr_data),colors=sfr_colors, labeldistance=1.1, wedgeprops = {'linewidth' : 1.0, 'edgecolor' : 'black', 'alpha' : 0.5})		
-	axs[1,1].annotate(r'\textbf{SFRs}',xy=(0.5,1.05),xycoords='axes fraction',color='black', ha='center',va='top',size=30)
+		try:
+		
+			if args.command == 'stats':
+			
+				print('{} molecules, {} sources, {} telescopes' .format(db.count(),*[db.get_connection().execute('SELECT COUNT(*) FROM {}' .format(x)).fetchone()[0] for x in ['sources','telescopes']]))
+				
+				for by in args.by:
+				
+					print('\nby {}:' .format(by))
+					
+					for x, n in db.count(by=by).items():
+					
+						print('\t{}\t{}' .format(x,n))
+						
+			elif args.by is not None:
+			
+				for x, n in db.count(by=args.by,**kwargs).items():
+				
+					print('{}\t{}' .format(x,n))
+					
+			else:
+			
+				labels = db.query(**kwargs) if db is not None else [x.label for x in query(full_list,**kwargs)]
+				
+				print(len(labels) if args.count is True else '\n'.join(labels))
+				
+		except TypeError as e:
+		
+			parser.error(str(e))
+			
+		return 0
+		
+	snapshot = db.load() if db is not None else census
+		
+	if args.command == 'export':
 	
+		if args.format == 'sqlite':
+		
+			filename = os.path.join(args.output,'census.db') if os.path.isdir(args.output) else args.output
+			
+			CensusDatabase(filename).write(snapshot)
+			
+			files = [filename]
+			
+		else:
+		
+			files = export_census(args.output,snapshot,format=args.format)
+			
+		print('\n'.join(files))
+		
+		return 0
+		
+	if args.command == 'figures':
 	
-	axs[0,1].legend(wedges, types,
-          title="Wavelengths",
-          loc="center left",
-          bbox_to_anchor=(1, 0, 0.5, 1))
+		for x in args.names:
+		
+			if x not in figure_functions:
+			
+				parser.error('no figure called {} (choose from {})' .format(x,', '.join(figure_functions)))
+				
+		#the figure functions write to the working directory
+			
+		if os.path.isdir(args.output) is False:
+		
+			os.makedirs(args.output)
+			
+		cwd = os.getcwd()
+		
+		os.chdir(args.output)
+		
+		try:
+		
+			with ThreadPoolExecutor(max_workers=args.workers) as pool:
+			
+				jobs = [pool.submit(figure_functions[x],snapshot.mol_list,formats=args.formats) for x in (args.names or figure_functions)]
+				
+			for x in jobs:
+			
+				x.result()
+				
+		except ValueError as e:
+		
+			parser.error(str(e))
+				
+		finally:
+		
+			os.chdir(cwd)
+			
+		return 0
+		
+	return 0
 	
-	fig.tight_layout()
+if __name__ == '__main__':
+
+	try:
 	
-	fig.subplots_adjust(wspace=0.1, hspace=0.1)
+		status = main()
+		
+	except BrokenPipeError:
 	
-	plt.show()
+		#the output was cut short (e.g. piped into head), which isn't an error
 	
-	plt.savefig('waves_by_source_type.pdf',format='pdf',transparent=True,bbox_inches='tight')			
-
-	return 									
\ No newline at end of file
+		os.dup2(os.open(os.devnull,os.O_WRONLY),sys.stdout.fileno())
+		
+		status = 0
+		
+	sys.exit(status)